@@ -0,0 +1,47 @@
+# communications/consumers.py
+import json
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from .outbox import user_group_name
+from .unread import get_unread_count
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Kullanıcıya özel bildirim kanalı (ws/notifications/?token=<JWT access token>).
+    Yeni bildirimler ve okunmamış sayısı anlık olarak itilir; istemcinin
+    bildirim listesini periyodik olarak sorgulamasına gerek kalmaz.
+    """
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+
+        self.group_name = user_group_name(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        # Bağlanır bağlanmaz rozeti güncelle
+        unread_count = await database_sync_to_async(get_unread_count)(user.pk)
+        await self.send(text_data=json.dumps({
+            'type': 'notifications.unread_count',
+            'unread_count': unread_count,
+        }))
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    # Outbox worker'ı yeni bildirimleri alıcı başına tek mesajda gönderir
+    async def notifications_new(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'notifications.new',
+            'notifications': event['notifications'],
+            'unread_count': event.get('unread_count'),
+        }))
+
+    async def notifications_unread_count(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'notifications.unread_count',
+            'unread_count': event['unread_count'],
+        }))
@@ -0,0 +1,41 @@
+# communications/management/commands/archive_notifications.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from communications.retention import (
+    archive_notifications, drop_empty_partitions, ensure_partitions, purge_archive,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bildirim saklama bakımı: okunmuş eski bildirimleri arşive taşır, süresi dolan arşiv "
+        "satırlarını siler; PostgreSQL'de gelecek ayların bölümlerini açar ve boşalan eski "
+        "bölümleri düşürür. Günde bir çalıştırılması yeterlidir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help="Bu günden eski okunmuş bildirimleri arşivle (varsayılan: NOTIFICATION_RETENTION['ARCHIVE_AFTER_DAYS'])",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        before = timezone.now() - timedelta(days=options['days']) if options['days'] is not None else None
+
+        created = ensure_partitions()
+        moved = archive_notifications(before)
+        purged = purge_archive()
+        dropped = drop_empty_partitions(before)
+        for name in created:
+            self.stdout.write(f'Bölüm açıldı: {name}')
+        for name in dropped:
+            self.stdout.write(f'Boş bölüm silindi: {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{moved} bildirim arşive taşındı, {purged} arşiv satırı silindi '
+            f'({time.perf_counter() - started:.1f} sn).'
+        ))
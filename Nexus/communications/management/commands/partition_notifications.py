@@ -0,0 +1,31 @@
+# communications/management/commands/partition_notifications.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from communications.retention import PartitioningError, convert_table
+
+
+class Command(BaseCommand):
+    help = (
+        "PostgreSQL'de bildirim tablosunu `timestamp` üzerinden aylık bölümlenmiş tabloya çevirir "
+        "(--revert ile düz tabloya geri döndürür). Tablo yeniden yazılır ve işlem boyunca kilitlidir; "
+        "bakım penceresinde bir kez çalıştırın. Tabloya bağlı FK veya view varsa hiçbir şey yapmaz."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--revert', action='store_true',
+            help='Bölümlenmiş tabloyu düz tabloya geri çevir',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            convert_table(partitioned=not options['revert'])
+        except PartitioningError as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(self.style.SUCCESS(
+            f"Bildirim tablosu {'düz tabloya' if options['revert'] else 'aylık bölümlü tabloya'} çevrildi "
+            f'({time.perf_counter() - started:.1f} sn).'
+        ))
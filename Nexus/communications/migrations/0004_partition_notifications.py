@@ -0,0 +1,16 @@
+# Bildirim tablosunun aylık bölümlenmiş tabloya dönüşümü bu migration'dan çıkarıldı:
+# tabloyu yeniden yazan, kilitleyen bu işlem otomatik `migrate` yolunda çalışmamalı.
+# PostgreSQL'de bakım penceresinde elle çalıştırılır: `manage.py partition_notifications`
+# (bkz. communications/retention.py). Migration, daha önce uygulanmış kurulumlarla
+# geçmişin tutarlı kalması için boş olarak duruyor.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0003_notification_retention'),
+    ]
+
+    operations = []
@@ -19,7 +19,44 @@ class Notification(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-timestamp']
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            # Bildirim akışı: alıcının bildirimleri (timestamp, id) sırasıyla, keyset sayfalama
+            models.Index(fields=['recipient', '-timestamp', '-id'], name='notification_feed_idx'),
+            # ?unread=true akışı ve okunmamış sayacı (recipient, is_read=False)
+            models.Index(fields=['recipient', 'is_read', '-timestamp', '-id'], name='notification_unread_idx'),
+            # Arşivleme: okunmuş eski satırlar (bkz. communications/retention.py)
+            models.Index(fields=['timestamp'], condition=models.Q(is_read=True), name='notification_archivable_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.actor} -> {self.recipient}: {self.verb}'
\ No newline at end of file
+        return f'{self.actor} -> {self.recipient}: {self.verb}'
+
+
+class NotificationArchive(models.Model):
+    """
+    Okunmuş ve ARCHIVE_AFTER_DAYS'ten eski bildirimler (bkz. communications/retention.py).
+    Dar tutulur: id orijinal bildirimin id'sidir, FK kısıtı yoktur ve tek indeksi vardır.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+',
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+',
+    )
+    verb = models.CharField(max_length=255)
+    content_type = models.ForeignKey(
+        ContentType, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+',
+    )
+    object_id = models.PositiveIntegerField()
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['recipient', '-timestamp'], name='notificationarchive_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.actor_id} -> {self.recipient_id}: {self.verb} (arşiv)'
@@ -0,0 +1,174 @@
+# communications/outbox.py
+"""
+Bildirimler için süreç içi giden kutusu (outbox).
+
+Sinyal handler'ları bildirimleri doğrudan yazmak yerine `enqueue_notifications` ile
+kuyruğa bırakır. Kuyruğa ekleme `transaction.on_commit` ile yapılır; yani işlem geri
+alınırsa bildirim de gitmez. Arka plandaki worker thread biriken bildirimleri tek
+`bulk_create` ile yazar ve WebSocket bildirimlerini alıcı başına tek mesajda birleştirir.
+
+Modlar (settings.NOTIFICATION_OUTBOX['MODE']):
+  'async': arka plan worker'ı (varsayılan)
+  'sync' : commit anında aynı thread'de yazılır (testler ve yönetim komutları için)
+
+Not: kuyruk bellektedir; süreç commit ile yazım arasında çökerse bekleyen bildirimler
+kaybolur. Bildirimler bilgilendirme amaçlı olduğundan bu kabul edilebilir bir ödünleşimdir.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import prefetch_related_objects
+
+from .unread import increment_unread
+
+logger = logging.getLogger(__name__)
+
+_DEFAULTS = {
+    'MODE': 'async',
+    'BATCH_SIZE': 500,        # Tek INSERT'te yazılacak en fazla bildirim
+    'FLUSH_INTERVAL': 0.05,   # İlk bildirimden sonra batch'in dolmasını bekleme süresi (sn)
+}
+
+
+def _conf(name):
+    return getattr(settings, 'NOTIFICATION_OUTBOX', {}).get(name, _DEFAULTS[name])
+
+
+def user_group_name(user_id):
+    """ Kullanıcıya özel WebSocket grubunun adı. """
+    return f'notifications_{user_id}'
+
+
+def notification_payloads(notifications):
+    """
+    WebSocket gövdeleri REST API ile aynı şekildedir (NotificationSerializer).
+    actor ve content_object tüm batch için toplu yüklenir:
+    1 sorgu kullanıcılar + içerik tipi başına 1 sorgu.
+    """
+    from .serializers import NotificationSerializer, target_prefetch
+
+    prefetch_related_objects(notifications, 'actor', target_prefetch())
+    return NotificationSerializer(notifications, many=True).data
+
+
+def publish_notifications(notifications):
+    """
+    Yeni bildirimleri alıcı başına TEK mesajda birleştirerek gönderir ve
+    alıcının okunmamış sayacını günceller.
+    """
+    by_recipient = defaultdict(list)
+    for notification, payload in zip(notifications, notification_payloads(notifications)):
+        by_recipient[notification.recipient_id].append(dict(payload))
+
+    channel_layer = get_channel_layer()
+    send = async_to_sync(channel_layer.group_send) if channel_layer is not None else None
+    for recipient_id, payloads in by_recipient.items():
+        unread_count = increment_unread(recipient_id, len(payloads))
+        if send is None:
+            continue
+        try:
+            send(user_group_name(recipient_id), {
+                'type': 'notifications.new',
+                'notifications': payloads,
+                'unread_count': unread_count,
+            })
+        except Exception:
+            logger.exception('Bildirim yayını başarısız oldu (alıcı=%s)', recipient_id)
+
+
+class NotificationOutbox:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def enqueue(self, notifications):
+        """
+        Bildirim alanlarını içeren sözlükleri kuyruğa ekler
+        (recipient_id, actor_id, verb, content_type_id, object_id).
+        """
+        items = list(notifications)
+        if items:
+            transaction.on_commit(lambda: self._submit(items))
+
+    def flush(self, timeout=5.0):
+        """ Kuyruktaki her şey yazılana kadar bekler (kapanışta ve testlerde kullanışlı). """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    # -- İç işleyiş -----------------------------------------------------------------
+    def _submit(self, items):
+        if _conf('MODE') == 'sync':
+            self._process(items)
+            return
+        self._ensure_worker()
+        for item in items:
+            self._queue.put(item)
+
+    def _ensure_worker(self):
+        with self._lock:
+            # fork edilen worker süreçlerinde thread kopyalanmaz, yeniden başlat
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='notification-outbox', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + _conf('FLUSH_INTERVAL')
+            while len(batch) < _conf('BATCH_SIZE'):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                close_old_connections()
+                self._process(batch)
+            except Exception:
+                logger.exception('%d bildirim yazılamadı', len(batch))
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _process(self, items):
+        from .models import Notification
+
+        from operations.changelog import log_changes
+        from operations.models import ChangeLog
+
+        with transaction.atomic():
+            created = Notification.objects.bulk_create(
+                [Notification(**item) for item in items], batch_size=_conf('BATCH_SIZE')
+            )
+            # Çevrimdışı senkronizasyon günlüğü (bkz. operations/changelog.py)
+            log_changes(
+                ChangeLog.Kind.NOTIFICATION,
+                [notification.pk for notification in created],
+                recipient_ids=[notification.recipient_id for notification in created],
+            )
+        publish_notifications(created)
+
+
+outbox = NotificationOutbox()
+enqueue_notifications = outbox.enqueue
+
+# Süreç kapanırken kuyrukta bekleyenleri yazmaya çalış
+atexit.register(outbox.flush)
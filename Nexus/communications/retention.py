@@ -0,0 +1,272 @@
+# communications/retention.py
+"""
+Bildirimlerin saklama süresi, arşivlenmesi ve (PostgreSQL'de) tablo bölümlemesi.
+
+- Okunmuş ve ARCHIVE_AFTER_DAYS'ten eski bildirimler BATCH_SIZE'lık parçalarla
+  NotificationArchive'a taşınır. Her parça kendi kısa işlemindedir (INSERT + DELETE);
+  kilitler ve WAL parça boyutuyla sınırlıdır. Arşivde ARCHIVE_RETENTION_DAYS'ten
+  eski satırlar aynı şekilde parça parça silinir.
+- PostgreSQL'de bildirim tablosu `timestamp` üzerinden aylık bölümlenebilir. Dönüşüm
+  otomatik migration'da yapılmaz; bakım penceresinde bir kez elle çalıştırılır:
+  `manage.py partition_notifications` (geri almak için `--revert`). Akış sorguları en
+  yeni bölümlerin indekslerinden okunur.
+  Arşivlemeden sonra tamamen boşalan eski bölümler DELETE yerine DROP TABLE ile atılır.
+  Gelecek aylar için bölümler PARTITIONS_AHEAD kadar önceden açılır; aralık dışında
+  kalan satırlar varsayılan (default) bölüme düşer. Varsayılan bölümde satırı olan bir
+  ay açılamaz; o ay loglanıp atlanır, bakımın geri kalanı yine çalışır.
+
+Sonuç olarak tablo ve indeks boyutları toplam geçmişle değil, saklama süresiyle orantılıdır.
+Periyodik çalıştırma (örn. günde bir): `manage.py archive_notifications`
+
+Ayarlar: settings.NOTIFICATION_RETENTION = {'ARCHIVE_AFTER_DAYS': ..., ...}
+"""
+import logging
+import re
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+_DEFAULTS = {
+    'ARCHIVE_AFTER_DAYS': 90,        # Okunmuş bildirimler bu süreden sonra arşive taşınır
+    'ARCHIVE_RETENTION_DAYS': 730,   # Arşivdeki satırların ömrü
+    'BATCH_SIZE': 5000,              # Tek işlemde taşınan/silinen en fazla satır
+    'PARTITIONS_AHEAD': 3,           # Önceden açılacak aylık bölüm sayısı (PostgreSQL)
+}
+TABLE = Notification._meta.db_table
+ARCHIVE_FIELDS = ['id', 'recipient_id', 'actor_id', 'verb', 'content_type_id', 'object_id', 'timestamp']
+
+logger = logging.getLogger(__name__)
+
+
+def _conf(name):
+    return getattr(settings, 'NOTIFICATION_RETENTION', {}).get(name, _DEFAULTS[name])
+
+
+# -- Arşivleme ------------------------------------------------------------------------
+def archive_notifications(before=None):
+    """ Okunmuş eski bildirimleri arşive taşır; taşınan satır sayısını döndürür. """
+    before = before or timezone.now() - timedelta(days=_conf('ARCHIVE_AFTER_DAYS'))
+    candidates = Notification.objects.filter(is_read=True, timestamp__lt=before).order_by('timestamp')
+    moved = 0
+    while True:
+        with transaction.atomic():
+            # Başka bir çalıştırmanın işlediği satırlar atlanır
+            rows = list(
+                candidates.select_for_update(skip_locked=True)
+                          .values_list(*ARCHIVE_FIELDS)[:_conf('BATCH_SIZE')]
+            )
+            if not rows:
+                return moved
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**dict(zip(ARCHIVE_FIELDS, row))) for row in rows],
+                ignore_conflicts=True,
+            )
+            Notification.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        moved += len(rows)
+
+
+def purge_archive(before=None):
+    """ Saklama süresi dolan arşiv satırlarını siler; silinen satır sayısını döndürür. """
+    before = before or timezone.now() - timedelta(days=_conf('ARCHIVE_RETENTION_DAYS'))
+    expired = NotificationArchive.objects.filter(timestamp__lt=before).order_by('timestamp')
+    purged = 0
+    while True:
+        ids = list(expired.values_list('id', flat=True)[:_conf('BATCH_SIZE')])
+        if not ids:
+            return purged
+        purged += NotificationArchive.objects.filter(pk__in=ids).delete()[0]
+
+
+# -- Bölümler (PostgreSQL) ----------------------------------------------------------------
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def _partitions():
+    """ Aylık bölümler: ay -> tablo adı (varsayılan bölüm hariç). """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = to_regclass(%s)',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f'{TABLE}_p'
+    return {
+        date(int(name[-6:-2]), int(name[-2:]), 1): name
+        for name in names if name.startswith(prefix) and name[len(prefix):].isdigit()
+    }
+
+
+def _create_partition(cursor, start):
+    name = f'{TABLE}_p{start:%Y%m}'
+    cursor.execute(
+        f'CREATE TABLE {name} PARTITION OF {TABLE} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_add_months(start, 1).isoformat()}')"
+    )
+    return name
+
+
+def ensure_partitions():
+    """ Bu ay ve sonraki PARTITIONS_AHEAD ay için eksik bölümleri açar; açılanların adları. """
+    if not is_partitioned():
+        return []
+    existing = _partitions()
+    month = timezone.localdate().replace(day=1)
+    created = []
+    for offset in range(_conf('PARTITIONS_AHEAD') + 1):
+        start = _add_months(month, offset)
+        if start in existing:
+            continue
+        name = f'{TABLE}_p{start:%Y%m}'
+        # Varsayılan bölümde bu aya ait satır varsa PostgreSQL bölümü açmayı reddeder;
+        # bölümlerin önceden açılması bu yüzden gereklidir. Reddedilen ay kendi
+        # savepoint'inde geri alınır, diğer aylar ve bakımın geri kalanı etkilenmez.
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                _create_partition(cursor, start)
+        except DatabaseError:
+            logger.exception('Bildirim bölümü açılamadı (%s); satırlar varsayılan bölümde kalıyor', name)
+            continue
+        created.append(name)
+    return created
+
+
+def drop_empty_partitions(before=None):
+    """
+    Tamamen `before`'dan eski ve boşalmış aylık bölümleri siler; silinenlerin adları.
+    Yeni bildirimler her zaman şimdiki zamanla yazıldığından eski bölümlere satır eklenmez.
+    """
+    if not is_partitioned():
+        return []
+    before = before or timezone.now() - timedelta(days=_conf('ARCHIVE_AFTER_DAYS'))
+    dropped = []
+    with connection.cursor() as cursor:
+        for month, name in sorted(_partitions().items()):
+            if _add_months(month, 1) > before.date():
+                break
+            cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {name})')
+            if cursor.fetchone()[0]:
+                # Okunmamış eski bildirimler arşivlenmez, bölüm kalır
+                continue
+            cursor.execute(f'DROP TABLE {name}')
+            dropped.append(name)
+    return dropped
+
+
+# -- Tablo dönüşümü (PostgreSQL) ----------------------------------------------------------
+class PartitioningError(Exception):
+    pass
+
+
+def dependent_objects():
+    """
+    Bildirim tablosuna dışarıdan bağlı nesneler: onu gösteren FK'ler ve view'lar.
+    Dönüşüm eski tabloyu sildiği için bunlar varken çalışmaz (CASCADE kullanılmaz).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, conrelid::regclass::text FROM pg_constraint "
+            "WHERE confrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+        objects = [f'FK {name} ({table})' for name, table in cursor.fetchall()]
+        cursor.execute(
+            'SELECT DISTINCT rewrite.ev_class::regclass::text FROM pg_depend '
+            'JOIN pg_rewrite rewrite ON rewrite.oid = pg_depend.objid '
+            "WHERE pg_depend.classid = 'pg_rewrite'::regclass AND pg_depend.refobjid = to_regclass(%s) "
+            'AND rewrite.ev_class <> pg_depend.refobjid',
+            [TABLE],
+        )
+        objects += [f'view {name}' for (name,) in cursor.fetchall()]
+    return objects
+
+
+def convert_table(partitioned=True):
+    """
+    Bildirim tablosunu aylık bölümlenmiş tabloya (partitioned=False ise düz tabloya)
+    çevirir; tek bir işlemdedir, hata olursa tablo olduğu gibi kalır.
+
+    Tablo yeniden yazılır ve işlem boyunca ACCESS EXCLUSIVE kilitlidir. Bölümlenmiş
+    tabloda birincil anahtar bölüm anahtarını içermelidir: (id, timestamp). id'ler hâlâ
+    tek bir sequence'tan gelir; indeksler ve FK kısıtları aynı adlarla yeniden oluşturulur.
+    Geçmiş aylar için bölümler verinin en eski ayından itibaren açılır, bu ay ve sonrası
+    ensure_partitions() ile PARTITIONS_AHEAD ayarına göre açılır.
+    """
+    if connection.vendor != 'postgresql':
+        raise PartitioningError('Tablo bölümleme yalnızca PostgreSQL\'de desteklenir.')
+    if is_partitioned() == partitioned:
+        raise PartitioningError('Tablo zaten bölümlü.' if partitioned else 'Tablo zaten bölümsüz.')
+
+    old = f'{TABLE}_{"plain" if partitioned else "partitioned"}'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+        dependents = dependent_objects()
+        if dependents:
+            raise PartitioningError(
+                'Bildirim tablosuna bağlı nesneler var, önce bunları kaldırın ve dönüşümden '
+                f'sonra yeniden oluşturun: {", ".join(dependents)}'
+            )
+
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {old}')
+        cursor.execute(
+            f'CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+            + (' PARTITION BY RANGE ("timestamp")' if partitioned else '')
+        )
+        # id'nin varsayılanı (identity/sequence) eski tabloya aittir; aşağıda yeniden bağlanır
+        cursor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN id DROP DEFAULT')
+
+        if partitioned:
+            cursor.execute(f"SELECT min(date_trunc('month', \"timestamp\")) FROM {old}")
+            first = cursor.fetchone()[0]
+            this_month = timezone.localdate().replace(day=1)
+            month = first.date().replace(day=1) if first else this_month
+            while month < this_month:
+                _create_partition(cursor, month)
+                month = _add_months(month, 1)
+            ensure_partitions()
+            cursor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {old}')
+
+        cursor.execute(
+            'SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s',
+            [old, f'{TABLE}_pkey'],
+        )
+        indexes = [
+            re.sub(rf'\bON (ONLY )?(\w+\.)?{old}\b', f'ON {TABLE}', row[0]) for row in cursor.fetchall()
+        ]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [old],
+        )
+        foreign_keys = cursor.fetchall()
+
+        # Dış bağımlılık yok (yukarıda kontrol edildi); eski tabloyla birlikte yalnızca
+        # kendi indeksleri, kısıtları, bölümleri ve sequence'ı silinir
+        cursor.execute(f'DROP TABLE {old}')
+        primary_key = '(id, "timestamp")' if partitioned else '(id)'
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY {primary_key}')
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+        for definition in indexes:
+            cursor.execute(definition)
+
+        cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {TABLE}_id_seq OWNED BY {TABLE}.id')
+        cursor.execute(f"SELECT setval('{TABLE}_id_seq', coalesce(max(id), 0) + 1, false) FROM {TABLE}")
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')")
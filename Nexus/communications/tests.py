@@ -1,3 +1,416 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from nexus_backend.channels_auth import JWTAuthMiddleware
+from operations.broadcast import background
+from operations.models import Task, TaskComment
+from users.models import User
+from users.permission_cache import clear_local_cache
+from .models import Notification, NotificationArchive
+from .outbox import NotificationOutbox, enqueue_notifications, publish_notifications, user_group_name
+from .retention import ensure_partitions, is_partitioned, purge_archive
+from .unread import get_unread_count, increment_unread, mark_all_read
+from . import routing
+from .views import NotificationViewSet
+
+
+@override_settings(NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class NotificationFeedTests(TestCase):
+    """ Bildirim akışı: sabit sorgu sayısı, (timestamp, id) cursor'ı ve okunmamış filtresi. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alici@nexus.local', 'parola')
+        actors = [User.objects.create_user(f'aktor{i}@nexus.local', 'parola') for i in range(3)]
+        task_type = ContentType.objects.get_for_model(Task)
+        comment_type = ContentType.objects.get_for_model(TaskComment)
+        rows = []
+        for i in range(30):
+            task = Task.objects.create(title=f'Görev {i}', creator=actors[i % 3])
+            comment = TaskComment.objects.create(task=task, author=actors[i % 3], content=f'Yorum {i}')
+            rows.append(Notification(recipient=cls.user, actor=actors[i % 3], verb='size bir görev atadı:',
+                                     content_type=task_type, object_id=task.pk, is_read=i % 2 == 0))
+            rows.append(Notification(recipient=cls.user, actor=actors[i % 3], verb='yorumunda sizden bahsetti:',
+                                     content_type=comment_type, object_id=comment.pk))
+        # Başka kullanıcının bildirimi akışta görünmez
+        rows.append(Notification(recipient=actors[0], actor=cls.user, verb='x',
+                                 content_type=task_type, object_id=task.pk))
+        Notification.objects.bulk_create(rows)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _feed(self, **params):
+        request = APIRequestFactory().get('/api/notifications/', params)
+        force_authenticate(request, user=self.user)
+        return NotificationViewSet.as_view({'get': 'list'})(request)
+
+    def test_page_takes_a_fixed_number_of_queries(self):
+        self._feed()
+        # Bildirimler + actor (JOIN), görev hedefleri, yorum hedefleri (yazar ve görevle)
+        with self.assertNumQueries(3):
+            response = self._feed(page_size=50)
+        self.assertEqual(len(response.data['results']), 50)
+        targets = {item['target'] for item in response.data['results']}
+        self.assertIn('Görev 29', targets)
+        self.assertIn('Comment by aktor2@nexus.local on Görev 29', targets)
+        self.assertEqual(response.data['results'][0]['actor']['email'], 'aktor2@nexus.local')
+
+    def test_cursor_walks_the_feed_once_in_order(self):
+        expected = list(self.user.notifications.order_by('-timestamp', '-id').values_list('id', flat=True))
+        seen, params = [], {'page_size': 25}
+        while True:
+            response = self._feed(**params)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            params['cursor'] = response.data['next'].split('cursor=')[1].split('&')[0]
+        self.assertEqual(seen, expected)
+
+    def test_unread_filter(self):
+        response = self._feed(unread='true', page_size=100)
+        self.assertEqual(len(response.data['results']), 45)
+        self.assertTrue(all(not item['is_read'] for item in response.data['results']))
+
+
+@override_settings(NOTIFICATION_RETENTION={'ARCHIVE_AFTER_DAYS': 30, 'ARCHIVE_RETENTION_DAYS': 365, 'BATCH_SIZE': 2})
+class NotificationRetentionTests(TestCase):
+    """ Arşivleme parça parça ve sadece okunmuş eski satırlarda; "tümünü okundu yap" sınırlı. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alici@nexus.local', 'parola')
+        cls.actor = User.objects.create_user('aktor@nexus.local', 'parola')
+        cls.task = Task.objects.create(title='Görev', creator=cls.actor)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _notify(self, days_ago, is_read):
+        notification = Notification.objects.create(
+            recipient=self.user, actor=self.actor, verb='size bir görev atadı:',
+            content_type=ContentType.objects.get_for_model(Task), object_id=self.task.pk, is_read=is_read,
+        )
+        Notification.objects.filter(pk=notification.pk).update(timestamp=timezone.now() - timedelta(days=days_ago))
+        return notification.pk
+
+    def test_archives_only_old_read_notifications(self):
+        archived = [self._notify(40 + i, is_read=True) for i in range(5)]
+        kept = [self._notify(40, is_read=False), self._notify(1, is_read=True)]
+
+        call_command('archive_notifications', stdout=io.StringIO())
+        self.assertCountEqual(Notification.objects.values_list('pk', flat=True), kept)
+        self.assertCountEqual(NotificationArchive.objects.values_list('pk', flat=True), archived)
+        row = NotificationArchive.objects.get(pk=archived[0])
+        self.assertEqual((row.recipient_id, row.object_id), (self.user.pk, self.task.pk))
+
+        NotificationArchive.objects.filter(pk=archived[0]).update(timestamp=timezone.now() - timedelta(days=400))
+        self.assertEqual(purge_archive(), 1)
+        # Sqlite'ta bölüm yoktur
+        self.assertEqual(ensure_partitions(), [])
+
+    def test_partition_failure_does_not_stop_maintenance(self):
+        archived = self._notify(40, is_read=True)
+        # Sqlite CREATE TABLE ... PARTITION OF'u reddeder; PostgreSQL'de varsayılan bölümde
+        # o aya ait satır olduğunda alınan hatayla aynı yoldan geçer
+        with patch('communications.retention.is_partitioned', return_value=True), \
+                patch('communications.retention._partitions', return_value={}), \
+                self.assertLogs('communications.retention', 'ERROR') as logs:
+            call_command('archive_notifications', stdout=io.StringIO())
+        self.assertEqual(len(logs.records), 4) # Bu ay + PARTITIONS_AHEAD
+        self.assertCountEqual(NotificationArchive.objects.values_list('pk', flat=True), [archived])
+
+    def test_mark_all_as_read_touches_only_unread_rows(self):
+        for _ in range(3):
+            self._notify(1, is_read=False)
+        self._notify(100, is_read=True)
+        request = APIRequestFactory().post('/api/notifications/mark_all_as_read/')
+        force_authenticate(request, user=self.user)
+        with patch('communications.unread.MARK_READ_BATCH_SIZE', 2), CaptureQueriesContext(connection) as queries:
+            response = NotificationViewSet.as_view({'post': 'mark_all_as_read'})(request)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        # 3 okunmamış satır, 2'lik parçalar: okunmuş eski satıra dokunulmaz
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(mark_all_read(self.user.pk), 0)
+
+
+class NotificationPartitioningTests(TestCase):
+    """ partition_notifications: elle çalıştırılan, geri alınabilen tablo dönüşümü. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alici@nexus.local', 'parola')
+        cls.task = Task.objects.create(title='Görev', creator=cls.user)
+
+    def _notify(self, days_ago):
+        notification = Notification.objects.create(
+            recipient=self.user, actor=self.user, verb='size bir görev atadı:',
+            content_type=ContentType.objects.get_for_model(Task), object_id=self.task.pk,
+        )
+        Notification.objects.filter(pk=notification.pk).update(timestamp=timezone.now() - timedelta(days=days_ago))
+        return notification.pk
+
+    @skipIf(connection.vendor == 'postgresql', 'PostgreSQL dışı veritabanları')
+    def test_refuses_outside_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('partition_notifications', stdout=io.StringIO())
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL gerekli')
+    def test_partition_and_revert_keep_rows(self):
+        ids = [self._notify(days) for days in (0, 40, 400)]
+        call_command('partition_notifications', stdout=io.StringIO())
+        self.assertTrue(is_partitioned())
+        self.assertCountEqual(Notification.objects.values_list('pk', flat=True), ids)
+        ids.append(self._notify(0))
+        self.assertGreater(ids[-1], max(ids[:-1]))
+
+        call_command('partition_notifications', '--revert', stdout=io.StringIO())
+        self.assertFalse(is_partitioned())
+        self.assertCountEqual(Notification.objects.values_list('pk', flat=True), ids)
+        self.assertGreater(self._notify(0), ids[-1])
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL gerekli')
+    def test_dependent_view_blocks_conversion(self):
+        self._notify(0)
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE VIEW notification_view AS SELECT id FROM {Notification._meta.db_table}')
+        with self.assertRaisesMessage(CommandError, 'view notification_view'):
+            call_command('partition_notifications', stdout=io.StringIO())
+        # İşlem geri alındı: tablo ve view yerinde
+        self.assertFalse(is_partitioned())
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM notification_view')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(NOTIFICATION_OUTBOX={'MODE': 'sync'}, CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class NotificationOutboxTests(TestCase):
+    """ Giden kutusu: commit sonrası yazım, toplu INSERT ve alıcı başına tek WebSocket mesajı. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.actor = User.objects.create_user('aktor@nexus.local', 'parola')
+        cls.recipients = [User.objects.create_user(f'alici{i}@nexus.local', 'parola') for i in range(2)]
+        cls.task = Task.objects.create(title='Görev', creator=cls.actor)
+        cls.content_type_id = ContentType.objects.get_for_model(Task).pk
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _items(self, recipients):
+        return [
+            dict(recipient_id=recipient.pk, actor_id=self.actor.pk, verb='size bir görev atadı:',
+                 content_type_id=self.content_type_id, object_id=self.task.pk)
+            for recipient in recipients
+        ]
+
+    def test_sync_mode_writes_after_commit_in_one_insert(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            enqueue_notifications(self._items(self.recipients * 3))
+            # Commit'ten önce yazılmaz
+            self.assertFalse(Notification.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(Notification.objects.count(), 6)
+
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            enqueue_notifications(self._items(self.recipients))
+        inserts = [query for query in ctx if query['sql'].startswith('INSERT INTO "communications_notification"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_rolled_back_notifications_are_not_written(self):
+        try:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                enqueue_notifications(self._items(self.recipients))
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(Notification.objects.exists())
+
+    def test_pushes_are_coalesced_per_recipient(self):
+        layer = get_channel_layer()
+        channels = {}
+        for recipient in self.recipients:
+            channels[recipient.pk] = async_to_sync(layer.new_channel)()
+            async_to_sync(layer.group_add)(user_group_name(recipient.pk), channels[recipient.pk])
+
+        first, second = self.recipients
+        notifications = Notification.objects.bulk_create(
+            Notification(**item) for item in self._items([first, first, first, second])
+        )
+        publish_notifications(notifications)
+
+        message = async_to_sync(layer.receive)(channels[first.pk])
+        self.assertEqual((message['type'], len(message['notifications']), message['unread_count']),
+                         ('notifications.new', 3, 3))
+        self.assertEqual(message['notifications'][0]['actor']['email'], 'aktor@nexus.local')
+        self.assertEqual(async_to_sync(layer.receive)(channels[second.pk])['unread_count'], 1)
+        # Alıcı başına tek mesaj
+        self.assertEqual(len(layer.channels.get(channels[first.pk], [])), 0)
+
+
+@override_settings(NOTIFICATION_OUTBOX={'MODE': 'async', 'BATCH_SIZE': 2, 'FLUSH_INTERVAL': 0.5})
+class NotificationOutboxWorkerTests(SimpleTestCase):
+    """ Arka plan worker'ı: batch'leme ve fork sonrası yeniden başlatma (veritabanına dokunmaz). """
+
+    def _outbox(self):
+        outbox = NotificationOutbox()
+        outbox.batches = []
+        outbox._process = outbox.batches.append
+        return outbox
+
+    def test_worker_batches_up_to_batch_size(self):
+        outbox = self._outbox()
+        # Ayrı ayrı commit edilen bildirimler aynı pencere içinde tek batch'te toplanır
+        for item in range(5):
+            outbox._submit([item])
+        self.assertTrue(outbox.flush())
+        self.assertEqual(outbox.batches, [[0, 1], [2, 3], [4]])
+
+    def test_worker_is_restarted_after_fork(self):
+        outbox = self._outbox()
+        outbox._ensure_worker()
+        worker = outbox._thread
+        outbox._ensure_worker()
+        self.assertIs(outbox._thread, worker)
+
+        # fork edilen süreçte thread kopyalanmaz: pid değişince yeni worker başlar
+        outbox._pid = -1
+        outbox._submit(['fork sonrası'])
+        self.assertIsNot(outbox._thread, worker)
+        self.assertTrue(outbox._thread.is_alive())
+        self.assertTrue(outbox.flush())
+        self.assertEqual(outbox.batches, [['fork sonrası']])
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class UnreadCounterTests(TestCase):
+    """ Okunmamış sayacı: tek COUNT, artımlı güncelleme ve "tümünü okundu yap" yarışı. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alici@nexus.local', 'parola')
+        cls.actor = User.objects.create_user('aktor@nexus.local', 'parola')
+        cls.task = Task.objects.create(title='Görev', creator=cls.actor)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _notify(self):
+        Notification.objects.create(
+            recipient=self.user, actor=self.actor, verb='size bir görev atadı:',
+            content_type=ContentType.objects.get_for_model(Task), object_id=self.task.pk,
+        )
+        return increment_unread(self.user.pk)
+
+    def _post(self, action):
+        request = APIRequestFactory().post(f'/api/notifications/{action}/')
+        force_authenticate(request, user=self.user)
+        return NotificationViewSet.as_view({'post': action})(request)
+
+    def test_count_is_computed_once_then_kept_up_to_date(self):
+        self._notify()
+        self._notify()
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_count(self.user.pk), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 2)
+        self.assertEqual(self._notify(), 3)
+
+    def test_notification_arriving_during_mark_all_is_kept(self):
+        for _ in range(3):
+            self._notify()
+        self.assertEqual(get_unread_count(self.user.pk), 3)
+
+        def mark_then_notify(user_id):
+            marked = mark_all_read(user_id)
+            # Okundu işaretleme ile sayaç güncellemesi arasında yeni bildirim gelir
+            self._notify()
+            return marked
+
+        with patch('communications.views.mark_all_read', side_effect=mark_then_notify):
+            self.assertEqual(self._post('mark_all_as_read').status_code, 204)
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class NotificationConsumerTests(TransactionTestCase):
+    """ ws/notifications/: JWT ile doğrulama, kullanıcı grubu ve anlık bildirimler. """
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+        self.user = User.objects.create_user('alici@nexus.local', 'parola')
+
+    def _client(self, query='', headers=None):
+        application = JWTAuthMiddleware(URLRouter(routing.websocket_urlpatterns))
+        return WebsocketCommunicator(application, f'/ws/notifications/{query}', headers=headers or [])
+
+    async def test_rejects_missing_and_invalid_tokens(self):
+        inactive = await database_sync_to_async(User.objects.create_user)('pasif@nexus.local', 'parola',
+                                                                          is_active=False)
+        for query in ('', '?token=bozuk', f'?token={AccessToken.for_user(inactive)}'):
+            connected, code = await self._client(query).connect()
+            self.assertFalse(connected)
+            self.assertEqual(code, 4401)
+
+    async def test_pushes_unread_count_and_new_notifications(self):
+        token = AccessToken.for_user(self.user)
+        client = self._client(headers=[(b'authorization', f'Bearer {token}'.encode())])
+        connected, _ = await client.connect()
+        self.assertTrue(connected)
+        self.assertEqual(await client.receive_json_from(), {'type': 'notifications.unread_count', 'unread_count': 0})
+
+        other = self._client(f'?token={token}')
+        self.assertTrue((await other.connect())[0])
+        await other.receive_json_from()
+
+        # Outbox'ın alıcı grubuna gönderdiği mesaj kullanıcının tüm bağlantılarına gider
+        layer = get_channel_layer()
+        await layer.group_send(user_group_name(self.user.pk), {
+            'type': 'notifications.new', 'notifications': [{'id': 1}], 'unread_count': 1,
+        })
+        for connection_ in (client, other):
+            self.assertEqual(await connection_.receive_json_from(),
+                             {'type': 'notifications.new', 'notifications': [{'id': 1}], 'unread_count': 1})
+        await client.disconnect()
+        await other.disconnect()
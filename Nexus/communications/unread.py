@@ -0,0 +1,61 @@
+# communications/unread.py
+"""
+Okunmamış bildirim sayacı. Rozet (badge) için her seferinde COUNT(*) atmak yerine
+sayaç önbellekte tutulur; sadece önbellekte yoksa bir kez veritabanından sayılır.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+UNREAD_TIMEOUT = 7 * 24 * 60 * 60 # Bir hafta dokunulmayan sayaç düşer, sonra yeniden sayılır
+MARK_READ_BATCH_SIZE = 1000       # "Tümünü okundu yap"ta tek UPDATE'in kilitleyeceği en fazla satır
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    count = cache.get(_key(user_id))
+    if count is None:
+        from .models import Notification
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        # add: bu arada artırılmış bir sayacın üzerine yazma
+        if not cache.add(_key(user_id), count, UNREAD_TIMEOUT):
+            count = cache.get(_key(user_id), count)
+    return count
+
+
+def increment_unread(user_id, amount=1):
+    """ Yeni sayacı döndürür; sayaç önbellekte yoksa veritabanından hesaplar. """
+    try:
+        return cache.incr(_key(user_id), amount)
+    except ValueError:
+        return get_unread_count(user_id)
+
+
+def refresh_unread(user_id):
+    """
+    Sayacı veritabanından yeniden hesaplar ve döndürür ("tümünü okundu yap" sonrası).
+    0'a ayarlamak, okundu işaretleme ile bu çağrı arasında gelen bildirimlerin artışını silerdi.
+    """
+    cache.delete(_key(user_id))
+    return get_unread_count(user_id)
+
+
+def mark_all_read(user_id):
+    """
+    Alıcının şu ana kadarki okunmamış bildirimlerini okundu yapar; değişen satır sayısını döndürür.
+    Sadece okunmamış satırlara dokunur (notification_unread_idx) ve her UPDATE kendi kısa
+    işleminde en fazla MARK_READ_BATCH_SIZE satır kilitler; maliyet geçmişin boyutundan bağımsızdır.
+    """
+    from .models import Notification
+
+    unread = Notification.objects.filter(recipient_id=user_id, is_read=False, timestamp__lte=timezone.now())
+    marked = 0
+    while True:
+        with transaction.atomic():
+            ids = list(unread.values_list('id', flat=True)[:MARK_READ_BATCH_SIZE])
+            if not ids:
+                return marked
+            marked += Notification.objects.filter(pk__in=ids, is_read=False).update(is_read=True)
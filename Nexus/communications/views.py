@@ -1,3 +1,59 @@
-from django.shortcuts import render
+# communications/views.py
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from nexus_backend.pagination import KeysetCursorPagination
+from operations.changelog import log_change
+from operations.models import ChangeLog
+from .models import Notification
+from .outbox import user_group_name
+from .serializers import NotificationSerializer, target_prefetch
+from .unread import get_unread_count, mark_all_read, refresh_unread
 
-# Create your views here.
+
+class NotificationCursorPagination(KeysetCursorPagination):
+    # Notification.Meta.ordering ve notification_feed_idx ile aynı sırada
+    ordering = ('-timestamp', '-id')
+
+
+class NotificationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Bildirim akışı. Sayfa başına sabit sorgu: bildirimler (actor JOIN ile) + hedeflerin
+    içerik tipi başına birer sorgusu. ?unread=true sadece okunmamışları döndürür.
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+
+    def get_queryset(self):
+        # Sadece giriş yapmış kullanıcının bildirimlerini listele
+        queryset = Notification.objects.filter(recipient_id=self.request.user.pk)\
+                                       .select_related('actor')\
+                                       .prefetch_related(target_prefetch())
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """ Rozet için okunmamış bildirim sayısı (önbellekten, COUNT(*) atmadan). """
+        return Response({'unread_count': get_unread_count(request.user.pk)})
+
+    @action(detail=False, methods=['post'])
+    def mark_all_as_read(self, request):
+        if mark_all_read(request.user.pk):
+            # Tek günlük satırı: çevrimdışı istemciler tüm bildirimleri okundu yapar
+            log_change(ChangeLog.Kind.NOTIFICATIONS_READ, request.user.pk, recipient_id=request.user.pk)
+        # Bu arada gelen bildirimler okunmamış kalır; sayaç onlarla birlikte yeniden sayılır
+        unread_count = refresh_unread(request.user.pk)
+        # Kullanıcının diğer cihazlarındaki rozetleri de güncelle
+        channel_layer = get_channel_layer()
+        if channel_layer is not None:
+            async_to_sync(channel_layer.group_send)(
+                user_group_name(request.user.pk),
+                {'type': 'notifications.unread_count', 'unread_count': unread_count},
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,17 +1,25 @@
 # nexus_backend/asgi.py (Bu dosya Django projesiyle birlikte gelir)
 import os
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-import operations.routing # Birazdan oluşturacağımız dosya
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nexus_backend.settings')
+# Uygulamalar, routing modülleri modelleri import etmeden önce yüklenmiş olmalı
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.auth import AuthMiddlewareStack
+from nexus_backend.channels_auth import JWTAuthMiddleware
+import operations.routing
+import communications.routing
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
-        URLRouter(
-            operations.routing.websocket_urlpatterns
+        JWTAuthMiddleware(
+            URLRouter(
+                operations.routing.websocket_urlpatterns
+                + communications.routing.websocket_urlpatterns
+            )
         )
     ),
-})
\ No newline at end of file
+})
@@ -0,0 +1,37 @@
+# nexus_backend/authentication.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.permission_cache import get_user_snapshot
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Token imzasını doğrular, kullanıcıyı veritabanı yerine önbellekteki anlık
+    görüntüden alır (bkz. users/permission_cache.py). Yetki seti de önbellekten
+    geldiği için salt okunur istekler doğrulama için hiç sorgu atmaz.
+    Görüntü kullanıcı veya rolleri değişince sinyallerle silinir.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_user_snapshot(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Şifre özeti önbelleğe konmaz: bu kontrol açıksa her istekte yüklenir
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,40 @@
+# nexus_backend/channels_auth.py
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed, TokenError
+
+from .authentication import CachedJWTAuthentication
+
+
+@database_sync_to_async
+def _user_for_token(raw_token):
+    authentication = CachedJWTAuthentication()
+    try:
+        validated = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated)
+    except (InvalidToken, AuthenticationFailed, TokenError):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    WebSocket bağlantılarını REST API ile aynı JWT access token'ı ile doğrular.
+    Tarayıcılar WebSocket'e header ekleyemediği için token `?token=` ile de verilebilir;
+    `Authorization: Bearer <token>` header'ı da desteklenir.
+    Token yoksa scope['user'] olduğu gibi (oturum doğrulaması) bırakılır.
+    """
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+        if token is None:
+            headers = dict(scope.get('headers', []))
+            authorization = headers.get(b'authorization', b'').decode()
+            if authorization.lower().startswith('bearer '):
+                token = authorization[7:].strip()
+
+        if token:
+            scope = dict(scope, user=await _user_for_token(token.encode()))
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,123 @@
+# nexus_backend/file_serving.py
+"""
+Yetki kontrolünden geçmiş dosyaların (örn. görev ekleri) sunulması.
+
+Dosya içeriği Python üzerinden geçmesin diye üç mod vardır:
+- 'nginx':    `X-Accel-Redirect` başlığı döner, dosyayı nginx gönderir (Range dahil).
+              nginx'te ACCEL_PREFIX için `internal;` bir location MEDIA_ROOT'a bakmalıdır.
+- 'sendfile': `X-Sendfile` başlığı döner (Apache mod_xsendfile, lighttpd).
+- 'django':   FileResponse; tek aralıklı `Range` istekleri 206 ile karşılanır. Dosya blok
+              blok okunur; WSGI sunucusu destekliyorsa tam dosyalar sendfile ile gider.
+              ASGI altında içerik event loop'tan geçer, üretimde ilk iki mod tercih edilmelidir.
+
+Ayarlar: settings.FILE_SERVING = {'BACKEND': ..., 'ACCEL_PREFIX': ...}
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+_DEFAULTS = {
+    'BACKEND': 'django',              # 'django', 'nginx' veya 'sendfile'
+    'ACCEL_PREFIX': '/protected-media/',
+}
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _conf(name):
+    return getattr(settings, 'FILE_SERVING', {}).get(name, _DEFAULTS[name])
+
+
+def serve_file(request, name, storage=None, filename=None, as_attachment=False, max_age=0):
+    """
+    `name`: depolamadaki dosya adı (örn. attachment.file.name). Yetki kontrolü çağırana aittir.
+    `max_age`: içeriği değişmeyen dosyalar (örn. içerik adresli küçük resimler) için
+    istemcinin kendi önbelleğinde tutabileceği süre (sn).
+    """
+    storage = storage or default_storage
+    filename = filename or name.rsplit('/', 1)[-1]
+    backend = _conf('BACKEND')
+    if backend in ('nginx', 'sendfile'):
+        response = HttpResponse(content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        if backend == 'nginx':
+            response['X-Accel-Redirect'] = _conf('ACCEL_PREFIX').rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = storage.path(name)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    else:
+        response = _file_response(request, storage, name, filename, as_attachment)
+    # Yetkiye bağlı içerik: paylaşılan önbelleklerde tutulmasın
+    response['Cache-Control'] = f'private, max-age={max_age}'
+    return response
+
+
+def _file_response(request, storage, name, filename, as_attachment):
+    size = storage.size(name)
+    last_modified = http_date(storage.get_modified_time(name).timestamp())
+    byte_range = _requested_range(request, size, last_modified)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = FileResponse(storage.open(name, 'rb'), as_attachment=as_attachment, filename=filename)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(storage.open(name, 'rb'), start, end - start + 1, FileResponse.block_size),
+            status=206,
+            content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = last_modified
+    return response
+
+
+def _requested_range(request, size, last_modified):
+    """ (başlangıç, bitiş) dahil; None: tüm dosya; False: karşılanamaz (416). """
+    header = request.META.get('HTTP_RANGE', '')
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Çoklu aralıklar desteklenmez; tüm dosya gönderilir
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and parse_http_date_safe(if_range) != parse_http_date_safe(last_modified):
+        # Dosya istemcinin elindekinden farklı: parça yerine tamamı
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            # "bytes=5-3" sözdizimsel olarak geçersizdir; başlık yok sayılır (RFC 7233 2.1)
+            return None
+        if start >= size:
+            return False
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # "bytes=-500": son 500 bayt
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        start, end = max(0, size - length), size - 1
+    return start, end
+
+
+def _read_range(file, start, length, block_size):
+    try:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file.close()
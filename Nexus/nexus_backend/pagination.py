@@ -0,0 +1,122 @@
+# nexus_backend/pagination.py
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    (created_at, id) gibi bir alan demetine göre keyset (seek) sayfalama.
+
+    DRF'nin CursorPagination'ı yalnızca ilk sıralama alanını kullanıp eşitlikleri
+    OFFSET ile çözer. Burada tüm demet cursor'a yazılır ve bir sonraki sayfa
+    `(created_at, id) < (:c, :i)` demet karşılaştırmasıyla getirilir:
+
+        WHERE created_at <= :c AND (created_at < :c OR (created_at = :c AND id < :i))
+
+    Baştaki `created_at <= :c` koşulu indeksin aralık sınırıdır (OR tek başına indeks
+    aralığına çevrilemez); derin sayfalar da bir indeks taramasıyla O(sayfa) maliyetindedir.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Geçersiz cursor değeri.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        # Bir fazla satır çekerek sonraki sayfa olup olmadığını anlarız (COUNT yok)
+        rows = list(self.page_queryset(queryset, request))
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def page_queryset(self, queryset, request):
+        """ İstenen sayfanın satırlarını (+1 fazlası) getirecek, henüz çalıştırılmamış queryset. """
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(position))
+        return queryset[:self.page_size + 1]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, self._field_name(term)) for term in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    # -- Cursor kodlama ---------------------------------------------------------
+    def encode_cursor(self, values):
+        raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if not isinstance(raw, list) or len(raw) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(self._field_name(term)).to_python(value)
+                for term, value in zip(self.ordering, raw)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    # -- Yardımcılar ------------------------------------------------------------
+    @staticmethod
+    def _field_name(term):
+        return term.lstrip('-')
+
+    def _seek_filter(self, position):
+        """
+        Demet karşılaştırmasını Q nesnelerine açar:
+        (a, b) < (x, y)  ==>  a <= x AND (a < x OR (a = x AND b < y))
+        `a <= x` mantıksal olarak gereksizdir ama indeksin kullanabildiği aralık koşuludur.
+        """
+        first = self.ordering[0]
+        bound = Q(**{f"{self._field_name(first)}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        condition = Q()
+        equal_prefix = {}
+        for term, value in zip(self.ordering, position):
+            name = self._field_name(term)
+            lookup = 'lt' if term.startswith('-') else 'gt'
+            condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+        return bound & condition
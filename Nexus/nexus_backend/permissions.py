@@ -1,5 +1,6 @@
 # nexus_backend/permissions.py (Proje kökünde yeni bir dosya)
 from rest_framework.permissions import BasePermission
+from users.permission_cache import user_has_permissions, user_is_admin
 
 class HasPermission(BasePermission):
     """
@@ -9,25 +10,28 @@ class HasPermission(BasePermission):
     def __init__(self, required_permissions=None):
         self.required_permissions = required_permissions or []
 
+    def __call__(self):
+        # DRF permission_classes içindeki her öğeyi çağırarak örnek üretir.
+        # Örnek olarak verildiğinde de çalışabilmesi için kendimizi döndürüyoruz.
+        return self
+
     def has_permission(self, request, view):
         user = request.user
         if not user or not user.is_authenticated:
             return False
-        
-        # Kullanıcının rollerine bağlı tüm yetkileri bir sette toplayalım
-        user_permissions = set()
-        for role in user.roles.all():
-            for perm in role.permissions.all():
-                user_permissions.add(perm.name)
-        
-        # Gerekli tüm yetkilerin kullanıcıda olup olmadığını kontrol et
-        return all(perm in user_permissions for perm in self.required_permissions)
+
+        # Yetki seti önbellekten gelir (bkz. users/permission_cache.py)
+        return user_has_permissions(user, self.required_permissions)
 
 class IsTaskOwnerOrAdmin(BasePermission):
     """ Sadece görevin sahibi veya yöneticinin işlem yapabilmesini sağlar. """
     def has_object_permission(self, request, view, obj):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
         # Yöneticiler her zaman yetkilidir (yönetici rolünü kontrol et)
-        if request.user.roles.filter(name='Yönetici').exists():
+        if user_is_admin(user):
             return True
         # Görevi oluşturan veya görevin atandığı kişi ise yetkilidir
-        return obj.creator == request.user or obj.assignee == request.user
\ No newline at end of file
+        # (_id alanlarıyla karşılaştırarak ekstra kullanıcı sorgusundan kaçınıyoruz)
+        return obj.creator_id == user.pk or obj.assignee_id == user.pk
@@ -0,0 +1,137 @@
+# nexus_backend/response_cache.py
+"""
+API yanıtları için etiket (tag) tabanlı önbellek.
+
+- Anahtar: view + handler + kapsam (örn. yetki kapsamı veya kullanıcı) + query string.
+- Her kayıt, oluşturulduğu andaki etiket sürümlerini saklar. `invalidate_tags('tasks')`
+  etiketin sürümünü değiştirir; eski kayıtlar tek tek silinmeden geçersiz olur.
+- Aynı anahtar için yalnızca bir istek yeniden hesaplama yapar (single-flight); diğerleri
+  varsa eski kaydı döner, yoksa kısa bir süre yeni kaydı bekler.
+- Kayıtlar bir ETag taşır; `If-None-Match` eşleşirse veritabanına gidilmeden 304 döner.
+
+Kullanım:
+    @cached_response(tags=['tasks'], scope=lambda request: f'user:{request.user.pk}')
+    def get(self, request, *args, **kwargs): ...
+"""
+import hashlib
+import json
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+_DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,        # Kayıtların en uzun ömrü (sn)
+    'LOCK_TIMEOUT': 30,    # Yeniden hesaplama kilidinin ömrü (sn)
+    'WAIT_TIMEOUT': 2.0,   # Kilidi alamayan isteğin yeni kaydı bekleme süresi (sn)
+    'KEY_PREFIX': 'rc',
+}
+
+
+def _conf(name):
+    return getattr(settings, 'RESPONSE_CACHE', {}).get(name, _DEFAULTS[name])
+
+
+def _cache():
+    return caches[_conf('CACHE_ALIAS')]
+
+
+def _tag_key(tag):
+    return f"{_conf('KEY_PREFIX')}:tag:{tag}"
+
+
+def invalidate_tags(*tags):
+    """ Verilen etiketlere bağlı tüm önbellek kayıtlarını geçersiz kılar. """
+    if tags:
+        _cache().set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+
+def _tag_versions(cache, tags, found):
+    """ Etiketlerin güncel sürümleri; hiç yoksa yeni bir sürüm oluşturulur. """
+    versions = []
+    for tag in tags:
+        version = found.get(_tag_key(tag))
+        if version is None:
+            # Etiket hiç yoksa (veya önbellekten düştüyse) yeni sürüm; eski kayıtlar eşleşmez
+            cache.add(_tag_key(tag), uuid.uuid4().hex, timeout=None)
+            version = cache.get(_tag_key(tag))
+        versions.append(version)
+    return versions
+
+
+def _etag(data):
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return '"%s"' % hashlib.sha1(payload).hexdigest()
+
+
+def _if_none_match(request):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return {value.strip().removeprefix('W/') for value in header.split(',') if value.strip()}
+
+
+def _respond(request, entry):
+    headers = {'ETag': entry['etag'], 'Cache-Control': 'private, no-cache'}
+    if entry['etag'] in _if_none_match(request):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry['data'], headers=headers)
+
+
+def cached_response(tags, scope=None, timeout=None):
+    """
+    APIView GET handler'ları için dekoratör.
+    scope: request alıp kapsam anahtarı döndüren fonksiyon (varsayılan: herkes için ortak).
+    Yetki kontrolleri handler'dan önce çalıştığı için kapsam, yetkisi olanlar arasında
+    paylaşılabilir.
+    """
+    tags = list(tags)
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            cache = _cache()
+            scope_key = scope(request) if scope else 'shared'
+            query = hashlib.sha1(request.META.get('QUERY_STRING', '').encode()).hexdigest()[:12]
+            entry_key = (
+                f"{_conf('KEY_PREFIX')}:{view.__class__.__module__}.{view.__class__.__name__}."
+                f"{handler.__name__}:{scope_key}:{query}"
+            )
+
+            found = cache.get_many([entry_key, *(_tag_key(tag) for tag in tags)])
+            versions = _tag_versions(cache, tags, found)
+            entry = found.get(entry_key)
+            if entry is not None and entry['versions'] == versions:
+                return _respond(request, entry)
+
+            lock_key = f'{entry_key}:lock'
+            if not cache.add(lock_key, 1, _conf('LOCK_TIMEOUT')):
+                # Başka bir istek zaten hesaplıyor: eskimiş de olsa elimizdekini dön
+                if entry is not None:
+                    return _respond(request, entry)
+                deadline = time.monotonic() + _conf('WAIT_TIMEOUT')
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    entry = cache.get(entry_key)
+                    if entry is not None and entry['versions'] == versions:
+                        return _respond(request, entry)
+                # Lider çok yavaş veya düştü: önbelleğe yazmadan kendimiz hesaplayalım
+                return handler(view, request, *args, **kwargs)
+
+            try:
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                # Sürümler hesaplamadan ÖNCE okundu; bu sırada gelen bir geçersiz kılma
+                # kaydı bir sonraki okumada otomatik olarak eskitir
+                entry = {'versions': versions, 'etag': _etag(response.data), 'data': response.data}
+                cache.set(entry_key, entry, timeout or _conf('TIMEOUT'))
+            finally:
+                cache.delete(lock_key)
+            return _respond(request, entry)
+
+        return wrapper
+    return decorator
@@ -55,6 +55,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Görev geçmişi satırları istek sonunda tek INSERT ile yazılır (bkz. operations/activity.py)
+    'operations.activity.ActivityLogMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -84,7 +86,8 @@ AUTH_USER_MODEL = 'users.User' # users uygulamasındaki User modelimiz
 # Django REST Framework Ayarları
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Kullanıcıyı önbellekteki anlık görüntüden alır (bkz. users/permission_cache.py)
+        'nexus_backend.authentication.CachedJWTAuthentication',
     )
 }
 
@@ -162,4 +165,113 @@ CHANNEL_LAYERS = {
             "hosts": [('127.0.0.1', 6379)], # Redis sunucu adresimiz
         },
     },
-}
\ No newline at end of file
+}
+
+# Önbellek (cache) ayarları - kanal katmanıyla aynı Redis sunucusunu kullanıyoruz
+# (testlerde 'django.core.cache.backends.locmem.LocMemCache' kullanılabilir)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    }
+}
+
+# Kullanıcı yetki seti ve JWT kullanıcı anlık görüntüsü önbelleği (bkz. users/permission_cache.py)
+PERMISSION_CACHE = {
+    'LOCAL_MAXSIZE': 2048, # Worker başına süreç içi LRU'da tutulacak kullanıcı sayısı
+    'LOCAL_TTL': 5,        # Süreç içi kopyanın ömrü (sn) - diğer worker'lardaki değişiklikler en geç bu sürede görünür
+    'SHARED_TTL': 300,     # Redis'teki kopyanın ömrü (sn)
+}
+
+# API yanıt önbelleği (bkz. nexus_backend/response_cache.py)
+RESPONSE_CACHE = {
+    'TIMEOUT': 300,      # Kayıtların en uzun ömrü (sn); etiketler zaten yazımlarda geçersiz kılınır
+    'LOCK_TIMEOUT': 30,  # Yeniden hesaplama kilidinin ömrü (sn)
+    'WAIT_TIMEOUT': 2.0, # Kilidi alamayan isteğin bekleme süresi (sn)
+}
+
+# Bildirim giden kutusu (bkz. communications/outbox.py)
+NOTIFICATION_OUTBOX = {
+    'MODE': 'async',        # Testlerde 'sync' kullanın: bildirimler commit anında yazılır
+    'BATCH_SIZE': 500,      # Tek INSERT'te yazılacak en fazla bildirim
+    'FLUSH_INTERVAL': 0.05, # Batch'in dolmasını bekleme süresi (sn)
+}
+
+# Bildirimlerin arşivlenmesi ve bölümleri (bkz. communications/retention.py)
+NOTIFICATION_RETENTION = {
+    'ARCHIVE_AFTER_DAYS': 90,        # Okunmuş bildirimler bu süreden sonra arşive taşınır
+    'ARCHIVE_RETENTION_DAYS': 730,   # Arşiv satırlarının ömrü
+    'BATCH_SIZE': 5000,              # Tek işlemde taşınan/silinen en fazla satır
+    'PARTITIONS_AHEAD': 3,           # PostgreSQL'de önceden açılan aylık bölüm sayısı
+}
+
+# Görev odalarına yapılan WebSocket yayınları (bkz. operations/broadcast.py)
+TASK_BROADCAST = {
+    'WINDOW': 0.1,          # Değişiklikleri tek olayda birleştirme penceresi (sn)
+    'MIN_INTERVAL': 0.5,    # Aynı göreve iki yayın arasındaki en kısa süre (sn)
+    'MAX_CHANGES': 100,     # Tek olayda taşınacak en fazla değişiklik
+}
+
+# Görev delta'larının yeniden oynatma tamponu (bkz. operations/deltas.py)
+TASK_DELTAS = {
+    'REPLAY_SIZE': 200,     # Görev başına yeniden oynatılabilecek en fazla delta
+    'TIMEOUT': 60 * 60,     # Delta'ların önbellekte kalma süresi (sn)
+}
+
+# Son teslim tarihi hatırlatmaları ve SLA yükseltmeleri (bkz. operations/deadlines.py);
+# worker: python manage.py run_deadline_scheduler
+TASK_DEADLINES = {
+    'REMIND_BEFORE': 24 * 60 * 60,   # Son teslim tarihinden ne kadar önce hatırlatılır (sn)
+    'ESCALATE_AFTER': 0,             # Son teslim tarihi ne kadar aşılınca yükseltilir (sn)
+    'HORIZON': 6 * 60 * 60,          # Worker belleğine yüklenen zaman penceresi (sn)
+    'CATCH_UP': 24 * 60 * 60,        # Worker kapalıyken kaçırılanlardan en fazla bu kadar eskisi gönderilir (sn)
+    'BATCH_SIZE': 500,               # Tek seferde işlenen en fazla zamanlayıcı
+}
+
+# Çevrimdışı istemciler için delta senkronizasyonu (bkz. operations/changelog.py)
+SYNC = {
+    'PAGE_SIZE': 500,       # Tek yanıtta işlenecek en fazla değişiklik
+    'SETTLE_SECONDS': 5,    # Henüz commit edilmemiş olabilecek yeni satırlar beklenir
+    'RETENTION_DAYS': 30,   # Günlüğün ve token'ların ömrü; daha eski token'lar baştan yükler
+}
+
+# Parçalı ek yüklemeleri (bkz. operations/uploads.py)
+ATTACHMENT_UPLOADS = {
+    'CHUNK_SIZE': 5 * 1024 * 1024,   # Parça boyutu (bayt)
+    'MAX_SIZE': 1024 * 1024 * 1024,  # Tek ekin en büyük boyutu (bayt)
+    'TEMP_DIR': None,                # None: MEDIA_ROOT/attachment_uploads (worker'lar arasında paylaşılmalı)
+    'EXPIRE_HOURS': 24,              # Yarım kalan yüklemelerin ömrü
+}
+
+# Görsel eklerin küçük resimleri ve meta verisi (bkz. operations/previews.py)
+ATTACHMENT_PREVIEWS = {
+    'MODE': 'async',              # Testlerde 'sync' kullanın
+    'WORKERS': 2,                 # Süreç başına worker thread sayısı
+    'SIZES': [128, 512, 1024],    # Küçük resimlerin uzun kenarı (px)
+    'QUALITY': 80,                # WebP kalitesi
+    'MAX_PIXELS': 50_000_000,     # Bundan büyük görseller işlenmez
+}
+
+# Yüklenen dosyaların SHA-256 özeti okunurken hesaplanır (bkz. operations/blobs.py)
+FILE_UPLOAD_HANDLERS = [
+    'nexus_backend.upload_handlers.HashingMemoryFileUploadHandler',
+    'nexus_backend.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+
+# Yetki kontrollü dosya sunumu (bkz. nexus_backend/file_serving.py)
+FILE_SERVING = {
+    'BACKEND': 'django',                  # Üretimde 'nginx' (X-Accel-Redirect) veya 'sendfile' (X-Sendfile)
+    'ACCEL_PREFIX': '/protected-media/',  # nginx'te MEDIA_ROOT'a bakan `internal` location
+}
+
+# Görev/yorum tam metin araması (bkz. operations/search.py)
+TASK_SEARCH = {
+    'PG_CONFIG': 'simple',  # Metin Türkçe kurallarıyla normalleştirilir; terimler önek olarak aranır
+    'MAX_TERMS': 8,         # Sorguda dikkate alınan en fazla kelime
+}
+
+# Görev listesinin akışla dışa aktarımı (bkz. operations/exports.py)
+TASK_EXPORT = {
+    'CHUNK_SIZE': 2000,         # Veritabanından tek seferde okunan satır (PostgreSQL'de sunucu taraflı cursor)
+    'BUFFER_SIZE': 64 * 1024,   # İstemciye gönderilen parçaların yaklaşık boyutu (bayt)
+}
@@ -0,0 +1,40 @@
+# nexus_backend/sparse_fields.py
+from rest_framework.serializers import ListSerializer
+
+FIELDS_QUERY_PARAM = 'fields'
+
+
+def get_requested_fields(request, available):
+    """
+    `?fields=id,title,status` parametresini okur ve `available` ile kesiştirir.
+    Parametre yoksa, istek GET değilse veya geçerli alan kalmıyorsa None döner,
+    yani tüm alanlar.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    raw = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not raw:
+        return None
+    requested = {name.strip() for name in raw.split(',')} & set(available)
+    return requested or None
+
+
+class SparseFieldsetMixin:
+    """
+    Serileştiriciye `?fields=` desteği ekler (sparse fieldsets).
+    Yalnızca en dıştaki serileştiriciye uygulanır; iç içe serileştiriciler
+    kendi alanlarını korur. Bilinmeyen alan adları yok sayılır.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # many=True ise bizi saran ListSerializer kök olur
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+        requested = get_requested_fields(self.context.get('request'), fields)
+        if requested is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in requested}
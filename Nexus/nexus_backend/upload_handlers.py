@@ -0,0 +1,35 @@
+# nexus_backend/upload_handlers.py
+"""
+Yüklenen dosyaların SHA-256 özetini gövde okunurken hesaplayan upload handler'lar.
+Django'nun varsayılan handler'larının yerine geçer; oluşan dosyada `sha256` bulunur
+(bkz. operations/blobs.py). Dosya, özet için ikinci kez okunmaz.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self._sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    def receive_data_chunk(self, raw_data, start):
+        # Bellekte tutulmayacak kadar büyük dosyalar sonraki handler'a geçer
+        if self.activated:
+            self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
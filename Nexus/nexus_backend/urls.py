@@ -7,6 +7,7 @@ from rest_framework_simplejwt.views import (
 )
 from django.conf import settings
 from django.conf.urls.static import static
+from operations.views import SyncView
 
 
 urlpatterns = [
@@ -16,6 +17,12 @@ urlpatterns = [
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     # Kullanıcı API'ları
     path('api/users/', include('users.urls')),
+    # Görev, departman, dashboard ve raporlama API'ları
+    path('api/operations/', include('operations.urls')),
+    # Bildirim API'ları
+    path('api/communications/', include('communications.urls')),
+    # Çevrimdışı istemciler için delta senkronizasyonu
+    path('api/sync/', SyncView.as_view(), name='sync'),
 ]
 
 if settings.DEBUG:
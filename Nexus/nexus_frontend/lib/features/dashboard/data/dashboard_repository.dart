@@ -9,7 +9,7 @@ class DashboardRepository {
   DashboardRepository(this._dio);
 
   Future<DashboardSummary> getSummary() async {
-    final response = await _dio.get('/dashboard/summary/');
+    final response = await _dio.get('/operations/dashboard/summary/');
     return DashboardSummary.fromJson(response.data);
   }
 }
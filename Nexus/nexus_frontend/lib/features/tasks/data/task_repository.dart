@@ -16,8 +16,9 @@ class TaskRepository {
   }
 
   Future<List<Task>> getTasks() async {
+    // Liste cursor ile sayfalanır: {"next": ..., "results": [...]}
     final response = await _dio.get('/operations/tasks/');
-    return (response.data as List)
+    return (response.data['results'] as List)
         .map((taskJson) => Task.fromJson(taskJson))
         .toList();
   }
@@ -1,4 +1,5 @@
 import 'package:flutter_riverpod/flutter_riverpod.dart';
+import 'package:nexus_frontend/core/storage/token_storage_service.dart';
 import 'package:nexus_frontend/features/tasks/data/models/task_model.dart';
 import 'package:nexus_frontend/features/tasks/data/task_repository.dart';
 import 'package:web_socket_channel/web_socket_channel.dart';
@@ -7,14 +8,15 @@ final taskDetailProvider = FutureProvider.family<Task, int>((ref, taskId) async
   return ref.watch(taskRepositoryProvider).getTaskById(taskId);
 });
 
-final taskChannelProvider = StreamProvider.family<dynamic, int>((ref, taskId) {
-  // TODO: Token'ı alıp URL'e eklemek gerekebilir (güvenlik için)
+final taskChannelProvider = StreamProvider.family<dynamic, int>((ref, taskId) async* {
+  // Sunucu görev odasına sadece görevi görebilen kullanıcıları alır
+  final token = await ref.read(tokenStorageProvider).getAccessToken();
   final channel = WebSocketChannel.connect(
-    Uri.parse('ws://127.0.0.1:8000/ws/tasks/$taskId/'),
+    Uri.parse('ws://127.0.0.1:8000/ws/tasks/$taskId/?token=$token'),
   );
   
   // Provider dispose olduğunda kanalın kapanmasını sağla
   ref.onDispose(() => channel.sink.close());
 
-  return channel.stream;
+  yield* channel.stream;
 });
\ No newline at end of file
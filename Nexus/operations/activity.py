@@ -0,0 +1,177 @@
+# operations/activity.py
+"""
+Görev geçmişi (TaskActivity): kim, ne zaman, neyi değiştirdi.
+
+Kayıt:
+- Görev kaydedildiğinde ve silindiğinde (operations/signals.py), durum geçişlerinde
+  (operations/transitions.py) ve toplu güncellemede (operations/bulk.py) satır üretilir.
+  Satırlar sadece eklenir; güncellenmez ve silinmez.
+- Farklar sıkıştırılmış saklanır: `fields` değişen alanların LOGGED_FIELDS sırasındaki
+  bitleri, `values` aynı sırada [eski, yeni] çiftleridir. Alan adları satırlara yazılmaz;
+  açıklama gibi uzun metinlerin sadece değiştiği kaydedilir.
+- Satırlar commit sonrası toplanır; bir istekte üretilenlerin hepsi istek sonunda tek
+  INSERT ile yazılır (ActivityLogMiddleware). İstek dışında (komutlar, shell) commit
+  sonrası hemen yazılır. Geri alınan işlemlerin satırları hiç yazılmaz.
+  İşlemi yapan belirtilmemişse isteğin (kimliği doğrulanmış) kullanıcısıdır.
+
+Analiz: durum, sorumlu ve son teslim tarihi her satırda olaydan sonraki değerleriyle
+ayrı sütunlardadır. Tamamlanma süresi, yeniden atamalar ve gecikmeler Task tablosu
+taranmadan, TaskActivity indeksleri üzerinden hesaplanır (aşağıdaki sorgular).
+"""
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Task, TaskActivity
+
+# Bit sırası kalıcıdır: yeni alanlar sadece sona eklenir
+LOGGED_FIELDS = ('status', 'assignee_id', 'department_id', 'priority', 'due_date', 'title', 'description')
+# Değeri saklanmayan, sadece "değişti" olarak işaretlenen alanlar
+CONTENT_OMITTED = frozenset({'description'})
+BITS = {field: 1 << index for index, field in enumerate(LOGGED_FIELDS)}
+
+# İstek süresince toplanan satırlar (ActivityLogMiddleware); istek dışında None
+_pending = ContextVar('task_activity_pending', default=None)
+
+
+def task_values(task):
+    return {field: getattr(task, field) for field in LOGGED_FIELDS}
+
+
+def encode_changes(old, new):
+    """ Eski ve yeni değerlerden (bit maskesi, values) çifti; eksik alanlar boş sayılır. """
+    mask, values = 0, []
+    for field in LOGGED_FIELDS:
+        if old.get(field) != new.get(field):
+            mask |= BITS[field]
+            if field not in CONTENT_OMITTED:
+                values.append([old.get(field), new.get(field)])
+    return mask, values
+
+
+def decode_changes(activity):
+    """ {alan: (eski, yeni)}; değeri saklanmayan alanlar için (None, None). """
+    changes, values = {}, iter(activity.values)
+    for field in LOGGED_FIELDS:
+        if activity.fields & BITS[field]:
+            changes[field] = (None, None) if field in CONTENT_OMITTED else tuple(next(values))
+    return changes
+
+
+def task_activity(task_id, kind, old, new, actor_id=None, timestamp=None):
+    """
+    Kaydedilmemiş bir TaskActivity. `new`: olaydan sonraki değerler (en az status,
+    assignee_id ve due_date); `old`: öncekiler (oluşturmada None, silmede `new`).
+    """
+    mask, values = encode_changes(old or {}, new)
+    return TaskActivity(
+        task_id=task_id, actor_id=actor_id, timestamp=timestamp or timezone.now(), kind=kind,
+        fields=mask, values=values,
+        status=new['status'], assignee_id=new.get('assignee_id'), due_date=new.get('due_date'),
+    )
+
+
+def record_activity(entries):
+    """ Satırları commit sonrası isteğin tamponuna, istek dışındaysa doğrudan veritabanına yazar. """
+    entries = [entry for entry in entries if entry.kind != TaskActivity.Kind.CHANGED or entry.fields]
+    if entries:
+        transaction.on_commit(partial(_collect, entries))
+
+
+def _collect(entries):
+    pending = _pending.get()
+    if pending is None:
+        TaskActivity.objects.bulk_create(entries)
+    else:
+        pending.extend(entries)
+
+
+def _flush(pending, request):
+    if not pending:
+        return
+    # DRF, kimlik doğrulamadan sonra kullanıcıyı alttaki HttpRequest'e de yazar
+    user = getattr(request, 'user', None)
+    actor_id = user.pk if user is not None and user.is_authenticated else None
+    for entry in pending:
+        if entry.actor_id is None:
+            entry.actor_id = actor_id
+    TaskActivity.objects.bulk_create(pending)
+
+
+class ActivityLogMiddleware:
+    """ Bir istekte üretilen geçmiş satırlarını istek sonunda tek INSERT ile yazar. """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        pending = []
+        token = _pending.set(pending)
+        try:
+            return self.get_response(request)
+        finally:
+            _pending.reset(token)
+            _flush(pending, request)
+
+    async def __acall__(self, request):
+        # Senkron view'lar kopyalanmış context'te çalışır; liste aynı nesnedir
+        pending = []
+        token = _pending.set(pending)
+        try:
+            return await self.get_response(request)
+        finally:
+            _pending.reset(token)
+            if pending:
+                await sync_to_async(_flush)(pending, request)
+
+
+# -- Analiz sorguları --------------------------------------------------------------
+def changed(queryset, field):
+    """ `field` alanının değiştiği satırlar. """
+    return queryset.alias(changed_bits=F('fields').bitand(BITS[field])).filter(changed_bits=BITS[field])
+
+
+def _between(queryset, since, until):
+    if since is not None:
+        queryset = queryset.filter(timestamp__gte=since)
+    if until is not None:
+        queryset = queryset.filter(timestamp__lt=until)
+    return queryset
+
+
+def completions(since=None, until=None):
+    """ Tamamlanma olayları; `assignee` tamamlandığı andaki sorumludur. """
+    queryset = TaskActivity.objects.filter(kind=TaskActivity.Kind.CHANGED, status=Task.Status.COMPLETED)
+    return _between(changed(queryset, 'status'), since, until)
+
+
+def completion_times(since=None, until=None):
+    """ Tamamlanan görevlerin oluşturulmalarından tamamlanmalarına geçen süre (`duration`). """
+    created = TaskActivity.objects.filter(task=OuterRef('task'), kind=TaskActivity.Kind.CREATED)\
+                                  .order_by()\
+                                  .values('timestamp')[:1]
+    return completions(since, until).annotate(
+        duration=ExpressionWrapper(F('timestamp') - Subquery(created), output_field=DurationField()),
+    ).values('task', 'assignee', 'timestamp', 'duration')
+
+
+def reassignments(since=None, until=None):
+    """ Görev başına sorumlu değişikliği sayısı (oluşturma sırasındaki atama hariç). """
+    queryset = changed(TaskActivity.objects.filter(kind=TaskActivity.Kind.CHANGED), 'assignee_id')
+    return _between(queryset, since, until).order_by().values('task').annotate(count=Count('id'))
+
+
+def overdue_completions(since=None, until=None):
+    """ Son teslim tarihinden sonra tamamlananlar (SLA ihlalleri). """
+    return completions(since, until).filter(due_date__isnull=False, due_date__lt=F('timestamp'))
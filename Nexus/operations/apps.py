@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OperationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'operations'
+
+    def ready(self):
+        # Bildirim ve raporlama sinyallerini kaydet
+        from . import signals  # noqa: F401
@@ -0,0 +1,167 @@
+# operations/blobs.py
+"""
+Görev ekleri için içerik adresli depolama.
+
+- Her dosya SHA-256 özetiyle `blobs/ab/cd/<özet>` altında bir kez saklanır; aynı fotoğraf
+  veya kılavuz 50 göreve eklense de diskte (ve yedekte) tek kopyadır.
+- Özet yükleme sırasında hesaplanır (bkz. nexus_backend/upload_handlers.py ve
+  operations/uploads.py); dosya ikinci kez okunmaz.
+- İçerik zaten varsa dosya yazılmaz, sadece yeni bir TaskAttachment satırı eklenir.
+  Parçalı yüklemede istemci özeti baştan verirse hiç parça göndermeden biter.
+- Görsellerin küçük resimleri blob başına bir kez üretilir (bkz. operations/previews.py).
+- AttachmentBlob.ref_count TaskAttachment sinyalleriyle güncellenir; sayacı sıfır olan
+  blob'lar ve hiçbir kayda ait olmayan dosyalar `manage.py gc_attachment_blobs` ile silinir.
+
+Not: özeti bilmek içeriğe sahip olmak demek değildir. Parça göndermeden ekleme sadece
+blob kullanıcının görebildiği bir göreve zaten ekliyse yapılır; aksi halde içerik normal
+şekilde yüklenir ve özeti doğrulanır. Böylece görünmeyen görevlerdeki dosyalar ne
+indirilebilir ne de varlıkları öğrenilebilir.
+"""
+import hashlib
+import os
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .models import AttachmentBlob, TaskAttachment, blob_path
+from .previews import delete_thumbnails
+
+BLOCK_SIZE = 64 * 1024
+# Dosyası yazılmış ama satırı henüz commit edilmemiş olabilecek blob'lar için bekleme
+ORPHAN_GRACE = timedelta(hours=1)
+# Çöp toplamanın taradığı depolama dizinleri (eski ekler dahil)
+SCANNED_DIRS = ['blobs', 'tasks']
+
+
+def file_digest(content):
+    """ Dosya benzeri nesnenin SHA-256 özeti; nesne başa sarılır. """
+    digest = hashlib.sha256()
+    content.seek(0)
+    while block := content.read(BLOCK_SIZE):
+        digest.update(block)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def store_blob(content, digest=None):
+    """
+    İçeriği (yoksa) depolamaya yazar ve kilitli AttachmentBlob satırını döndürür.
+    Çağıran aynı işlemde ona bir TaskAttachment bağlamalıdır.
+    """
+    digest = digest or getattr(content, 'sha256', None) or file_digest(content)
+    blob = AttachmentBlob.objects.select_for_update().filter(pk=digest).first()
+    if blob is not None:
+        return blob
+
+    blob = AttachmentBlob(sha256=digest, size=content.size)
+    name = blob_path(blob, None)
+    # Aynı ad her zaman aynı içeriktir; eşzamanlı yazımda storage ad sonuna ek koyarsa kopyayı at
+    saved = default_storage.save(name, content)
+    if saved != name:
+        default_storage.delete(saved)
+    blob.file.name = name
+    try:
+        with transaction.atomic():
+            blob.save(force_insert=True)
+    except IntegrityError:
+        # Aynı içerik eşzamanlı olarak kaydedildi
+        return AttachmentBlob.objects.select_for_update().get(pk=digest)
+    return blob
+
+
+def attach_blob(task, uploader, blob, filename, description=''):
+    return TaskAttachment.objects.create(
+        task=task, uploader=uploader, blob=blob, file=blob.file.name,
+        filename=filename, description=description,
+    )
+
+
+def attach_file(task, uploader, content, filename, description='', digest=None):
+    """ Dosyayı içerik adresli olarak saklar ve göreve ekler. """
+    with transaction.atomic():
+        blob = store_blob(content, digest)
+        return attach_blob(task, uploader, blob, filename, description)
+
+
+def attach_existing(task, uploader, digest, filename, visible_tasks, description=''):
+    """
+    İçerik `visible_tasks` içindeki bir göreve zaten ekliyse dosya gönderilmeden eki
+    oluşturur; değilse (blob hiç olmasa da, başka görevlerde olsa da) None.
+    """
+    with transaction.atomic():
+        attached = TaskAttachment.objects.filter(blob=OuterRef('pk'), task__in=visible_tasks)
+        blob = AttachmentBlob.objects.select_for_update()\
+                                     .filter(Exists(attached), pk=digest.lower())\
+                                     .first()
+        if blob is None:
+            return None
+        return attach_blob(task, uploader, blob, filename, description)
+
+
+def adjust_ref_count(blob_id, delta):
+    AttachmentBlob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') + delta)
+
+
+# -- Çöp toplama --------------------------------------------------------------------
+def collect_garbage():
+    """
+    Referansı kalmamış blob'ları ve kayıtsız dosyaları siler.
+    (silinen blob sayısı, silinen yetim dosya sayısı)
+    """
+    with transaction.atomic():
+        # Satırlar kilitliyken dosyalar silinir: aynı içeriği yeniden yükleyen istek
+        # kilidi bekler, sonra satırı bulamaz ve dosyayı yeniden yazar
+        unreferenced = list(
+            AttachmentBlob.objects.select_for_update(skip_locked=True)
+                                  .filter(ref_count=0)
+                                  .filter(~Exists(TaskAttachment.objects.filter(blob=OuterRef('pk'))))
+        )
+        for blob in unreferenced:
+            delete_thumbnails(blob)
+            default_storage.delete(blob.file.name)
+        AttachmentBlob.objects.filter(pk__in=[blob.pk for blob in unreferenced]).delete()
+
+    referenced = set()
+    for name, thumbnails in AttachmentBlob.objects.values_list('file', 'thumbnails').iterator():
+        referenced.add(name)
+        referenced.update(thumbnails.values())
+    referenced.update(TaskAttachment.objects.values_list('file', flat=True))
+    cutoff = timezone.now() - ORPHAN_GRACE
+    orphans = 0
+    for name in _walk(SCANNED_DIRS):
+        if name not in referenced and default_storage.get_modified_time(name) < cutoff:
+            default_storage.delete(name)
+            orphans += 1
+    return len(unreferenced), orphans
+
+
+def adopt_legacy_attachments(batch_size=200):
+    """ Blob'u olmayan eski ekleri hash'leyip içerik adresli blob'lara bağlar. """
+    adopted = 0
+    legacy = TaskAttachment.objects.filter(blob__isnull=True).exclude(file='').order_by('pk')
+    for attachment in legacy.iterator(chunk_size=batch_size):
+        if not default_storage.exists(attachment.file.name):
+            continue
+        with transaction.atomic(), attachment.file.open('rb') as content:
+            blob = store_blob(content, file_digest(content))
+            TaskAttachment.objects.filter(pk=attachment.pk).update(
+                blob=blob, file=blob.file.name,
+                filename=attachment.filename or os.path.basename(attachment.file.name),
+            )
+            adjust_ref_count(blob.pk, 1)
+        adopted += 1
+    return adopted
+
+
+def _walk(directories):
+    for directory in directories:
+        try:
+            subdirs, files = default_storage.listdir(directory)
+        except FileNotFoundError:
+            continue
+        for name in files:
+            yield f'{directory}/{name}'
+        yield from _walk([f'{directory}/{subdir}' for subdir in subdirs])
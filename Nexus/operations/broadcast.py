@@ -0,0 +1,194 @@
+# operations/broadcast.py
+"""
+Görev odalarına (task_<id>) yapılan WebSocket yayınları için birleştirici katman.
+
+- Kısa bir pencere (WINDOW) içinde aynı gruba gelen değişiklikler tek bir
+  `task.update` olayında, `changes` listesi olarak gönderilir.
+- Her grup en fazla MIN_INTERVAL saniyede bir yayın alır (grup başına hız sınırı);
+  bu arada gelen değişiklikler bir sonraki yayına eklenir.
+- Bekleyen değişiklik sayısı MAX_CHANGES'i aşarsa en eskileri atılır ve olay
+  `truncated: True` ile işaretlenir; istemci görevi yeniden çekmelidir.
+- Birleştirilmemesi gereken olaylar (ör. son teslim tarihi değişiklikleri, bkz.
+  operations/deadlines.py) `send` ile hız sınırı ve kırpma olmadan, sırayla gönderilir.
+- Yayınlar istek thread'inde yapılmaz: `broadcast_task_change` commit sonrası değişikliği
+  kendi event loop'u olan arka plan thread'ine bırakır ve hemen döner.
+
+Ayarlar: settings.TASK_BROADCAST = {'WINDOW': ..., 'MIN_INTERVAL': ..., 'MAX_CHANGES': ...}
+"""
+import asyncio
+import atexit
+import logging
+import os
+import threading
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_DEFAULTS = {
+    'WINDOW': 0.1,         # İlk değişiklikten sonra birleştirme için bekleme süresi (sn)
+    'MIN_INTERVAL': 0.5,   # Aynı gruba iki yayın arasındaki en kısa süre (sn)
+    'MAX_CHANGES': 100,    # Tek olayda taşınacak en fazla değişiklik
+}
+
+
+def _conf(name):
+    return getattr(settings, 'TASK_BROADCAST', {}).get(name, _DEFAULTS[name])
+
+
+def task_group_name(task_id):
+    """ Göreve özel WebSocket grubunun adı. """
+    return f'task_{task_id}'
+
+
+class TaskBroadcaster:
+    """
+    Birleştirme ve hız sınırlama mantığı. Tüm metotlar aynı event loop içinde
+    çağrılmalıdır; thread'ler arası kullanım için `broadcast_task_change` kullanın.
+    """
+
+    def __init__(self, channel_layer=None, window=None, min_interval=None, max_changes=None):
+        self.channel_layer = channel_layer
+        self.window = _conf('WINDOW') if window is None else window
+        self.min_interval = _conf('MIN_INTERVAL') if min_interval is None else min_interval
+        self.max_changes = _conf('MAX_CHANGES') if max_changes is None else max_changes
+        self._pending = {}     # grup -> [değişiklikler]
+        self._truncated = set()
+        self._scheduled = {}   # grup -> zamanlanmış yayın (TimerHandle)
+        self._last_sent = {}   # grup -> son yayın zamanı (loop.time())
+        self._inflight = set()
+        self._sending = None   # send() ile gönderilen son olay; sıra korunur
+
+    def publish(self, group, change):
+        """ Değişikliği sıraya alır; yayın en geç pencere/hız sınırı dolunca yapılır. """
+        changes = self._pending.setdefault(group, [])
+        changes.append(change)
+        if len(changes) > self.max_changes:
+            del changes[:len(changes) - self.max_changes]
+            self._truncated.add(group)
+
+        if group not in self._scheduled:
+            loop = asyncio.get_running_loop()
+            delay = max(self.window, self._last_sent.get(group, float('-inf')) + self.min_interval - loop.time())
+            self._scheduled[group] = loop.call_later(delay, self._start_flush, group)
+
+    def send(self, group, event):
+        """ Olayı birleştirme, hız sınırı ve kırpma olmadan gönderir; olaylar geliş sırasıyla gider. """
+        self._sending = self._track(self._send_after(self._sending, group, event))
+
+    async def drain(self):
+        """ Bekleyen tüm yayınları beklemeden hemen gönderir. """
+        for group, handle in list(self._scheduled.items()):
+            handle.cancel()
+            self._start_flush(group)
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+    # -- İç işleyiş -----------------------------------------------------------------
+    def _start_flush(self, group):
+        self._track(self._flush(group))
+
+    def _track(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        return task
+
+    async def _send_after(self, previous, group, event):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        await self._send(group, event)
+
+    async def _flush(self, group):
+        loop = asyncio.get_running_loop()
+        self._scheduled.pop(group, None)
+        changes = self._pending.pop(group, [])
+        if not changes:
+            return
+        event = {'type': 'task.update', 'changes': changes}
+        if group in self._truncated:
+            self._truncated.discard(group)
+            event['truncated'] = True
+
+        sent_at = loop.time()
+        self._last_sent[group] = sent_at
+        # Hız sınırı penceresi geçince kaydı sil; sözlük sadece aktif grupları tutar
+        loop.call_later(self.min_interval, self._forget, group, sent_at)
+
+        await self._send(group, event)
+
+    async def _send(self, group, event):
+        channel_layer = self.channel_layer or get_channel_layer()
+        try:
+            await channel_layer.group_send(group, event)
+        except Exception:
+            logger.exception('Görev yayını başarısız oldu (grup=%s)', group)
+
+    def _forget(self, group, sent_at):
+        if self._last_sent.get(group) == sent_at:
+            del self._last_sent[group]
+
+
+class _BackgroundBroadcaster:
+    """ TaskBroadcaster'ı kendi event loop'u olan bir daemon thread'de çalıştırır. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._broadcaster = None
+        self._pid = None
+
+    def submit(self, group, change):
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(self._broadcaster.publish, group, change)
+
+    def send(self, group, event):
+        loop = self._ensure_loop()
+        loop.call_soon_threadsafe(self._broadcaster.send, group, event)
+
+    def flush(self, timeout=5.0):
+        """ Bekleyen yayınları hemen gönderir (kapanışta ve testlerde kullanışlı). """
+        if self._loop is None or self._pid != os.getpid():
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._broadcaster.drain(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def _ensure_loop(self):
+        with self._lock:
+            # fork edilen worker süreçlerinde thread kopyalanmaz, yeniden başlat
+            if self._loop is not None and self._pid == os.getpid():
+                return self._loop
+            self._pid = os.getpid()
+            self._loop = asyncio.new_event_loop()
+            self._broadcaster = TaskBroadcaster()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            threading.Thread(target=run, name='task-broadcast', daemon=True).start()
+            ready.wait()
+            return self._loop
+
+
+background = _BackgroundBroadcaster()
+
+# Süreç kapanırken bekleyen yayınları göndermeye çalış
+atexit.register(background.flush)
+
+
+def broadcast_task_change(task_id, change):
+    """
+    Göreve ait bir değişikliği commit sonrası yayın kuyruğuna bırakır.
+    İstek thread'i kanal katmanını beklemez.
+    """
+    group = task_group_name(task_id)
+    transaction.on_commit(lambda: background.submit(group, change))
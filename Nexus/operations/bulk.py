@@ -0,0 +1,184 @@
+# operations/bulk.py
+"""
+Çok sayıda göreve aynı alan değişikliğini uygulayan toplu güncelleme.
+
+Tek tek `save()` yerine:
+- görevler tek sorguda kilitlenerek okunur, yetki kontrolü küme üzerinde yapılır,
+- durum değişiklikleri görev başına geçiş kurallarıyla (bkz. operations/transitions.py)
+  denetlenir; geçersizler `invalid_transition` sonucu alır, diğerleri yine de yazılır,
+- değişiklik tek bir UPDATE ile yazılır (completed_at CASE ile satır bazında),
+- sürümler tek UPDATE + tek SELECT ile artırılır,
+- rollup sayaçları, delta yayınları, senkronizasyon günlüğü, görev geçmişi, bildirimler,
+  son teslim tarihi zamanlayıcıları ve önbellek geçersiz kılma toplu yapılır.
+Sorgu sayısı görev sayısından bağımsızdır.
+
+Not: QuerySet.update() sinyal tetiklemez; sinyallerin yaptığı işler burada elle yapılır.
+"""
+from collections import Counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from communications.outbox import enqueue_notifications
+from nexus_backend.response_cache import invalidate_tags
+from users.permission_cache import user_is_admin
+from . import deltas
+from .deltas import PATCH_FIELDS, publish_task_deltas, task_patch, task_serializer_fields
+from .activity import record_activity, task_activity, task_values
+from .deadlines import publish_deadlines
+from .changelog import log_changes
+from .models import ChangeLog, Task, TaskActivity
+from .rollups import TRACKED_FIELDS, apply_task_changes, task_state
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+FORBIDDEN = 'forbidden'
+
+
+def _completed_at(status, now):
+    """ task_pre_save ile aynı kural: tamamlanmış görev eski tarihini korur. """
+    if status != Task.Status.COMPLETED:
+        return Value(None)
+    return Case(
+        When(status=Task.Status.COMPLETED, completed_at__isnull=False, then=F('completed_at')),
+        default=Value(now),
+    )
+
+
+def bulk_update_tasks(user, ids, changes):
+    """
+    `changes`: alan -> yeni değer (status, priority, due_date, assignee, department).
+    İlişkiler model örneği olarak verilir. Her id için bir sonuç döndürür.
+    """
+    from .transitions import INVALID_TRANSITION, transition_error
+    from .views import visible_tasks
+
+    ids = list(dict.fromkeys(ids))
+    results = {task_id: NOT_FOUND for task_id in ids}
+    is_admin = user_is_admin(user)
+    # Model alanı (attname) -> yeni değer
+    values = {
+        Task._meta.get_field(name).attname: getattr(value, 'pk', value)
+        for name, value in changes.items()
+    }
+
+    with transaction.atomic():
+        tasks = list(
+            visible_tasks(user).filter(pk__in=ids)
+                               .select_for_update()
+                               .only('id', 'creator_id', 'version', *dict.fromkeys([*TRACKED_FIELDS, *PATCH_FIELDS]))
+        )
+        changed = []
+        for task in tasks:
+            if not (is_admin or task.creator_id == user.pk or task.assignee_id == user.pk):
+                results[task.pk] = FORBIDDEN
+            elif all(getattr(task, field) == value for field, value in values.items()):
+                results[task.pk] = UNCHANGED
+            elif 'status' in values and task.status != values['status'] and transition_error(
+                    task.status, values['status'], {'assignee_id': values.get('assignee_id', task.assignee_id)}):
+                # Koşul yeni sorumluya göre denetlenir (ör. atama ile ASSIGNED aynı istekte)
+                results[task.pk] = INVALID_TRANSITION
+            else:
+                results[task.pk] = UPDATED
+                changed.append(task)
+
+        if changed:
+            _apply(user, changed, changes, values)
+
+    return [{'id': task_id, 'result': results[task_id]} for task_id in ids]
+
+
+def _apply(user, tasks, changes, values):
+    now = timezone.now()
+    update = dict(values, updated_at=now)
+    if 'status' in values:
+        update['completed_at'] = _completed_at(values['status'], now)
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).update(**update)
+
+    # Bellekteki örnekleri yazılanla aynı hale getir (delta'lar ve rollup'lar için)
+    previous = {}
+    for task in tasks:
+        previous[task.pk] = {
+            **task_state(task), **{field: getattr(task, field) for field in PATCH_FIELDS},
+        }
+        for name, value in changes.items():
+            setattr(task, name, value)
+        task.updated_at = now
+        if 'status' in values:
+            if values['status'] != Task.Status.COMPLETED:
+                task.completed_at = None
+            elif previous[task.pk]['status'] != Task.Status.COMPLETED or not task.completed_at:
+                task.completed_at = now
+
+    apply_task_changes((previous[task.pk], task_state(task)) for task in tasks)
+
+    # Delta'lar: görev başına status_changed ve/veya field_patch
+    serializer_fields = task_serializer_fields()
+    planned = {}
+    for task in tasks:
+        old = previous[task.pk]
+        entries = []
+        if old['status'] != task.status:
+            entries.append((deltas.STATUS_CHANGED, {
+                'from': old['status'], 'to': task.status,
+                **task_patch(task, ['completed_at'], serializer_fields),
+            }))
+        patched = [name for field, name in PATCH_FIELDS.items() if old[field] != getattr(task, field)]
+        if patched:
+            entries.append((deltas.FIELD_PATCH, task_patch(task, patched, serializer_fields)))
+        planned[task.pk] = entries
+
+    # Değişen her görevin en az bir delta'sı vardır
+    versions = _bump_versions({task_id: len(entries) for task_id, entries in planned.items()})
+    published = []
+    for task in tasks:
+        task.version = versions[task.pk]
+        first = task.version - len(planned[task.pk]) + 1
+        published.extend(
+            {'type': delta_type, 'task_id': task.pk, 'version': first + offset, 'data': data}
+            for offset, (delta_type, data) in enumerate(planned[task.pk])
+        )
+    publish_task_deltas(published)
+    if 'due_date' in values:
+        publish_deadlines(
+            (task.pk, task.due_date) for task in tasks if previous[task.pk]['due_date'] != task.due_date
+        )
+
+    # Yeni atanan kişilere tek batch'te bildirim (outbox alıcı başına tek mesaj yayınlar)
+    if 'assignee_id' in values and values['assignee_id'] and values['assignee_id'] != user.pk:
+        content_type_id = ContentType.objects.get_for_model(Task).pk
+        enqueue_notifications([
+            dict(
+                recipient_id=values['assignee_id'],
+                actor_id=user.pk,
+                verb='size bir görev atadı:',
+                content_type_id=content_type_id,
+                object_id=task.pk,
+            )
+            for task in tasks if previous[task.pk]['assignee_id'] != values['assignee_id']
+        ])
+
+    log_changes(ChangeLog.Kind.TASK, [task.pk for task in tasks], recipient_ids=[
+        (task.creator_id, task.assignee_id, previous[task.pk]['assignee_id']) for task in tasks
+    ])
+    record_activity([
+        task_activity(task.pk, TaskActivity.Kind.CHANGED, previous[task.pk], task_values(task),
+                      actor_id=user.pk, timestamp=now)
+        for task in tasks
+    ])
+    transaction.on_commit(lambda: invalidate_tags('tasks'))
+
+
+def _bump_versions(counts):
+    """ task_id -> artış miktarı; tek UPDATE ve tek SELECT ile yeni sürümleri döndürür. """
+    if not counts:
+        return {}
+    common = Counter(counts.values()).most_common(1)[0][0]
+    Task.objects.filter(pk__in=list(counts)).update(version=F('version') + Case(
+        *[When(pk=task_id, then=Value(count)) for task_id, count in counts.items() if count != common],
+        default=Value(common),
+    ))
+    return dict(Task.objects.filter(pk__in=list(counts)).values_list('id', 'version'))
@@ -0,0 +1,146 @@
+# operations/changelog.py
+"""
+Çevrimdışı istemciler için delta senkronizasyonu.
+
+Görev, yorum, ek ve bildirim yazımları aynı işlem içinde ChangeLog'a satır ekler.
+İstemci `GET /api/sync/?since=<token>` ile sadece token'dan sonra değişen/silinen
+nesneleri alır; maliyet toplam veri miktarıyla değil değişiklik sayısıyla orantılıdır.
+
+- Satırlar ilgili kullanıcılara yazılır (recipient_id): görevlerde oluşturan, sorumlu ve
+  değişiklikten önceki sorumlu; yorum/eklerde görevin oluşturanı ve sorumlusu; bildirimlerde
+  alıcı. `tasks.view_all` yetkisi olmayan kullanıcı sadece kendi satırlarını okur. Böylece
+  görünmeyen nesnelerin id'leri silinmiş (tombstone) olarak sızmaz ve okuma maliyeti
+  kullanıcının kendi değişiklikleriyle orantılıdır. Artık görülemeyen (örn. başkasına
+  atanan) nesneler, önceden görebilenlere silinmiş olarak döner.
+
+- Token opak ve imzalıdır (konum + verilme zamanı). RETENTION'dan eski token'lar ve
+  token'sız istekler `reset: true` alır: istemci verisini REST API'den baştan yükler.
+- Sequence boşlukları: id'si küçük ama daha geç commit edilen bir satır atlanmasın diye
+  son SETTLE saniyede yazılmış satırlar bir sonraki senkronizasyona bırakılır.
+- Aynı nesnenin eski satırları ve RETENTION'dan eski satırlar
+  `manage.py compact_change_log` ile silinir.
+
+Ayarlar: settings.SYNC = {'PAGE_SIZE': ..., 'SETTLE_SECONDS': ..., 'RETENTION_DAYS': ...}
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import ChangeLog
+
+_DEFAULTS = {
+    'PAGE_SIZE': 500,       # Tek yanıtta işlenecek en fazla günlük satırı
+    'SETTLE_SECONDS': 5,    # Bu kadar yeni satırlar henüz commit edilmemiş işlemleri bekler
+    'RETENTION_DAYS': 30,   # Günlüğün ve token'ların ömrü
+}
+TOKEN_SALT = 'operations.sync'
+
+Kind = ChangeLog.Kind
+
+
+def _conf(name):
+    return getattr(settings, 'SYNC', {}).get(name, _DEFAULTS[name])
+
+
+# -- Günlüğe yazma --------------------------------------------------------------
+def log_changes(kind, object_ids, deleted=False, recipient_ids=None):
+    """
+    Birden çok nesne için tek INSERT. recipient_ids: object_ids ile aynı sırada; her eleman
+    bir kullanıcı id'si veya id listesidir (her kullanıcıya bir satır, boşlar atlanır).
+    """
+    recipient_ids = recipient_ids or [None] * len(object_ids)
+    ChangeLog.objects.bulk_create([
+        ChangeLog(kind=kind, object_id=object_id, deleted=deleted, recipient_id=recipient_id)
+        for object_id, recipients in zip(object_ids, recipient_ids)
+        for recipient_id in _recipients(recipients)
+    ])
+
+
+def log_change(kind, object_id, deleted=False, recipient_id=None):
+    log_changes(kind, [object_id], deleted, [recipient_id])
+
+
+def _recipients(recipients):
+    if recipients is None or isinstance(recipients, int):
+        return [recipients]
+    # Alıcısı olmayan satırı sadece tüm görevleri görenler okur
+    return [user_id for user_id in dict.fromkeys(recipients) if user_id is not None] or [None]
+
+
+# -- Token ----------------------------------------------------------------------
+class InvalidSyncToken(Exception):
+    pass
+
+
+def encode_token(position):
+    return signing.dumps({'p': position}, salt=TOKEN_SALT)
+
+
+def decode_token(token):
+    """ Konumu döndürür; süresi dolmuşsa None (yeniden yükleme gerekir). """
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=timedelta(days=_conf('RETENTION_DAYS')))['p']
+    except signing.SignatureExpired:
+        return None
+    except (signing.BadSignature, KeyError, TypeError):
+        raise InvalidSyncToken
+
+
+# -- Senkronizasyon -------------------------------------------------------------
+def _settled_before():
+    return timezone.now() - timedelta(seconds=_conf('SETTLE_SECONDS'))
+
+
+def current_position():
+    """ Commit edilmiş sayılabilecek en son günlük satırı. """
+    return ChangeLog.objects.filter(created_at__lte=_settled_before())\
+                            .order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def read_changes(user, since, sees_all=False):
+    """
+    `since` sonrasındaki günlük satırlarını okur; `sees_all`: kullanıcı tüm görevleri görür.
+    (değişen nesneler {kind: [id]}, silinen nesneler {kind: [id]}, yeni konum, devamı var mı)
+    """
+    page_size = _conf('PAGE_SIZE')
+    settled = _settled_before()
+    rows = Q(recipient_id=user.pk)
+    if sees_all:
+        rows |= ~Q(kind__in=[Kind.NOTIFICATION, Kind.NOTIFICATIONS_READ])
+    rows = ChangeLog.objects.filter(rows, id__gt=since)\
+                            .order_by('id')\
+                            .values_list('id', 'kind', 'object_id', 'deleted', 'created_at')[:page_size + 1]
+
+    latest = {}
+    position, has_more = since, False
+    for index, (row_id, kind, object_id, deleted, created_at) in enumerate(rows):
+        if index == page_size:
+            has_more = True
+            break
+        if created_at > settled:
+            # Bundan sonrası henüz oturmadı; bir sonraki senkronizasyonda
+            break
+        # Aynı nesne birden çok kez değiştiyse sadece son durum önemlidir
+        latest.pop((kind, object_id), None)
+        latest[(kind, object_id)] = deleted
+        position = row_id
+
+    changed, deleted = {}, {}
+    for (kind, object_id), is_deleted in latest.items():
+        (deleted if is_deleted else changed).setdefault(kind, []).append(object_id)
+    return changed, deleted, position, has_more
+
+
+def compact_change_log():
+    """ Yerini daha yeni bir satıra bırakmış ve RETENTION'dan eski satırları siler. """
+    superseded, _ = ChangeLog.objects.filter(Exists(
+        ChangeLog.objects.filter(kind=OuterRef('kind'), object_id=OuterRef('object_id'),
+                                 recipient_id=OuterRef('recipient_id'), id__gt=OuterRef('id'))
+    )).delete()
+    expired, _ = ChangeLog.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=_conf('RETENTION_DAYS'))
+    ).delete()
+    return superseded, expired
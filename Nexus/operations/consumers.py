@@ -1,30 +1,102 @@
 # operations/consumers.py (Bu dosyayı biz oluşturuyoruz)
 import json
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from .broadcast import task_group_name
+from .deltas import replay_task_deltas
+from .views import visible_tasks
 
 class TaskConsumer(AsyncWebsocketConsumer):
+    """
+    Göreve özel oda (ws/tasks/<id>/?token=<JWT>&since=<version>).
+
+    İstemciye tipli delta'lar gönderilir (bkz. operations/deltas.py). Yeniden bağlanırken
+    `since` ile son uygulanan sürüm verilirse kaçırılan delta'lar `task.replay` ile
+    gönderilir; tampon yetmezse `task.resync` gelir ve görev REST API'den yeniden çekilmelidir.
+    Yayınlar ile yeniden oynatma çakışabilir: istemci version'ı elindekinden büyük
+    olmayan delta'ları yok saymalıdır.
+    """
     async def connect(self):
-        self.task_id = self.scope['url_route']['kwargs']['task_id']
-        self.task_group_name = f'task_{self.task_id}'
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        try:
+            self.task_id = int(self.scope['url_route']['kwargs']['task_id'])
+        except ValueError:
+            await self.close(code=4404)
+            return
+        self.task_group_name = task_group_name(self.task_id)
 
-        # Kullanıcıyı göreve özel "oda"ya (grup) dahil et
+        # Kullanıcıyı göreve özel "oda"ya (grup) dahil et. Sürüm gruba katıldıktan SONRA
+        # okunur; böylece arada yayınlanan hiçbir delta kaybolmaz.
         await self.channel_layer.group_add(
             self.task_group_name,
             self.channel_name
         )
+        version = await self._current_version(user)
+        if version is None:
+            # Görev yok veya kullanıcı göremiyor
+            await self.channel_layer.group_discard(self.task_group_name, self.channel_name)
+            await self.close(code=4403)
+            return
         await self.accept()
 
+        since = self._parse_version(self.scope.get('query_string', b'').decode())
+        if since is None:
+            await self.send(text_data=json.dumps({'type': 'task.version', 'version': version}))
+        else:
+            await self._replay(since, version)
+
     async def disconnect(self, close_code):
         # Kullanıcıyı odadan çıkar
-        await self.channel_layer.group_discard(
-            self.task_group_name,
-            self.channel_name
-        )
+        if hasattr(self, 'task_group_name'):
+            await self.channel_layer.group_discard(
+                self.task_group_name,
+                self.channel_name
+            )
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # {"type": "resume", "version": N}: bağlantıyı kapatmadan kaçırılanları iste
+        try:
+            message = json.loads(text_data or '')
+            since = int(message['version']) if message.get('type') == 'resume' else None
+        except (ValueError, TypeError, KeyError, AttributeError):
+            since = None
+        if since is None:
+            return
+        version = await self._current_version(self.scope['user'])
+        if version is not None:
+            await self._replay(since, version)
 
     # Gruptan bir mesaj alındığında bu metod çalışır
     async def task_update(self, event):
-        # Mesajı WebSocket üzerinden istemciye (Flutter'a) gönder
+        # Birleştirilmiş delta'ları WebSocket üzerinden istemciye (Flutter'a) gönder
         await self.send(text_data=json.dumps({
             'type': 'task.update',
-            'message': event['message'],
-        }))
\ No newline at end of file
+            'changes': event['changes'],
+            'truncated': event.get('truncated', False),
+        }))
+
+    # -- Yardımcılar --------------------------------------------------------------
+    async def _replay(self, since, version):
+        changes = await database_sync_to_async(replay_task_deltas)(self.task_id, since, version)
+        if changes is None:
+            await self.send(text_data=json.dumps({'type': 'task.resync', 'version': version}))
+        else:
+            await self.send(text_data=json.dumps({
+                'type': 'task.replay', 'version': version, 'changes': changes,
+            }))
+
+    @staticmethod
+    def _parse_version(query_string):
+        value = parse_qs(query_string).get('since', [None])[0]
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+
+    @database_sync_to_async
+    def _current_version(self, user):
+        return visible_tasks(user).filter(pk=self.task_id).values_list('version', flat=True).first()
@@ -0,0 +1,330 @@
+# operations/deadlines.py
+"""
+Son teslim tarihi hatırlatmaları ve SLA yükseltmeleri.
+
+Açık görevlerin sorumlusuna son teslim tarihinden REMIND_BEFORE önce hatırlatma gider.
+Tarih ESCALATE_AFTER kadar aşılırsa görevi oluşturana ve sorumlusuna yükseltme
+bildirimi gider. Zamanlayıcılar `manage.py run_deadline_scheduler` worker'ının
+belleğindeki bir yığındadır (heap):
+
+- Sadece önümüzdeki HORIZON içinde zamanı gelecek son teslim tarihleri yüklenir.
+  Yükleme due_date indeksinde bir aralık sorgusudur ve pencere ilerledikçe sadece yeni
+  dilim okunur; Task tablosu periyodik olarak taranmaz.
+- Son teslim tarihi değişen görevler (kayıt sinyali, toplu güncelleme) commit sonrası
+  kanal katmanı üzerinden worker'a bildirilir (DEADLINE_GROUP). Bu olaylar görev
+  yayınlarının birleştirici/hız sınırlayıcısından geçmez; commit başına bir olaydır ve
+  kırpılmaz, worker'ın pencereyi baştan yüklemesi gerekmez.
+- Ekleme ve sıradaki zamanlayıcıyı alma O(log n)'dir. Eskiyen girdiler yığından
+  çıkarılırken atlanır (tembel silme).
+- Zamanı gelen zamanlayıcılar BATCH_SIZE'lık gruplar halinde işlenir. Görev hâlâ
+  açıksa ve tarih hâlâ zamanındaysa gönderildi işareti koşullu UPDATE ile konur,
+  bildirimler tek batch'te giden kutusuna bırakılır. İşaretler (reminder_sent_for,
+  escalation_sent_for) hangi son teslim tarihi için gönderildiğini tutar. Worker yeniden
+  başlasa da aynı tarih için ikinci bildirim gitmez; tarih değişince yeniden gönderilir.
+  Başka bir worker'ın kilitlediği için atlanan zamanlayıcılar RETRY_AFTER sonra yeniden
+  denenir; yığından çıkmış olsalar da kaybolmazlar.
+
+Ayarlar: settings.TASK_DEADLINES = {'REMIND_BEFORE': ..., 'ESCALATE_AFTER': ..., ...}
+"""
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from communications.outbox import enqueue_notifications
+from .broadcast import background
+from .models import OPEN_STATUSES, Task
+
+logger = logging.getLogger(__name__)
+
+_DEFAULTS = {
+    'REMIND_BEFORE': 24 * 60 * 60,   # Son teslim tarihinden ne kadar önce hatırlatılır (sn)
+    'ESCALATE_AFTER': 0,             # Son teslim tarihi ne kadar aşılınca yükseltilir (sn)
+    'HORIZON': 6 * 60 * 60,          # Belleğe yüklenen zaman penceresi (sn)
+    'CATCH_UP': 24 * 60 * 60,        # Worker kapalıyken kaçırılanlardan en fazla bu kadar eskisi gönderilir (sn)
+    'BATCH_SIZE': 500,               # Tek seferde işlenen en fazla zamanlayıcı
+    'BATCH_WINDOW': 1.0,             # Birkaç saniye içinde zamanı gelecekler aynı batch'e alınır (sn)
+    'RETRY_AFTER': 5.0,              # Kilitli olduğu için atlanan zamanlayıcılar bu kadar sonra yeniden denenir (sn)
+}
+
+# Worker'ın dinlediği grup; sinyaller değişiklikleri buraya yayınlar
+DEADLINE_GROUP = 'task_deadlines'
+DEADLINE_EVENT = 'deadline.changes'
+
+REMINDER = 'reminder'
+ESCALATION = 'escalation'
+# Tür -> (gönderildi işareti, bildirim fiili)
+KINDS = {
+    REMINDER: ('reminder_sent_for', 'görevinin son teslim tarihi yaklaşıyor:'),
+    ESCALATION: ('escalation_sent_for', 'görevinin son teslim tarihi geçti:'),
+}
+
+
+def _conf(name):
+    return getattr(settings, 'TASK_DEADLINES', {}).get(name, _DEFAULTS[name])
+
+
+def publish_deadlines(deadlines):
+    """ (task_id, due_date) çiftlerini commit sonrası zamanlayıcı worker'ına iletir. """
+    changes = [
+        {'id': task_id, 'due_date': due_date.isoformat() if hasattr(due_date, 'isoformat') else due_date}
+        for task_id, due_date in deadlines
+    ]
+    if changes:
+        # Görev yayınlarından ayrı: birleştirilmez, kırpılmaz, sırası korunur
+        transaction.on_commit(
+            lambda: background.send(DEADLINE_GROUP, {'type': DEADLINE_EVENT, 'changes': changes})
+        )
+
+
+class DeadlineScheduler:
+    """
+    Zamanlayıcı yığını. Her görevin bellekte sadece güncel son teslim tarihi tutulur;
+    yığında bu tarihe ait olmayan girdiler eskimiştir ve atlanır.
+    Zamanlar epoch saniyesidir.
+    """
+
+    def __init__(self, remind_before, escalate_after):
+        self.remind_before = remind_before
+        self.escalate_after = escalate_after
+        self._heap = []        # (zaman, task_id, tür, son teslim tarihi)
+        self._deadlines = {}   # task_id -> son teslim tarihi
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def set_deadline(self, task_id, due, sent=()):
+        """ `due` None ise görevin zamanlayıcıları kaldırılır; `sent`: bu tarih için gönderilmiş türler. """
+        if due is None or len(sent) == len(KINDS):
+            self._deadlines.pop(task_id, None)
+            return
+        if self._deadlines.get(task_id) == due:
+            return
+        self._deadlines[task_id] = due
+        if REMINDER not in sent:
+            heapq.heappush(self._heap, (due - self.remind_before, task_id, REMINDER, due))
+        if ESCALATION not in sent:
+            heapq.heappush(self._heap, (due + self.escalate_after, task_id, ESCALATION, due))
+
+    def retry(self, task_id, kind, due, at):
+        """ Yığından çıkmış ama işlenemeyen zamanlayıcıyı `at` zamanına yeniden kurar. """
+        current = self._deadlines.get(task_id)
+        if current is not None and current != due:
+            # Tarih değişmiş; yeni tarihin zamanlayıcıları değişiklik olayıyla kurulur
+            return
+        self._deadlines[task_id] = due
+        heapq.heappush(self._heap, (at, task_id, kind, due))
+
+    def next_at(self):
+        """ Sıradaki zamanlayıcının zamanı (yoksa None). """
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, until, limit):
+        """ Zamanı `until`'e kadar gelmiş en fazla `limit` zamanlayıcı: [(task_id, tür), ...] """
+        timers = []
+        while len(timers) < limit:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > until:
+                break
+            _, task_id, kind, _ = heapq.heappop(self._heap)
+            timers.append((task_id, kind))
+            if kind == ESCALATION:
+                # Son zamanlayıcı; görev artık izlenmez
+                del self._deadlines[task_id]
+        return timers
+
+    def _discard_stale(self):
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+
+
+def _due(kind, now):
+    """ `kind` bildirimi şu an gönderilmesi gereken görevler. """
+    queryset = Task.objects.filter(status__in=OPEN_STATUSES)
+    if kind == REMINDER:
+        queryset = queryset.filter(due_date__gt=now, due_date__lte=now + timedelta(seconds=_conf('REMIND_BEFORE')))
+    else:
+        queryset = queryset.filter(due_date__lte=now - timedelta(seconds=_conf('ESCALATE_AFTER')))
+    return queryset.exclude(**{KINDS[kind][0]: F('due_date')})
+
+
+def fire_timers(timers, now=None):
+    """
+    Zamanlayıcıları işler: (gönderilen bildirim sayısı, kilitli olduğu için atlananlar).
+    Atlananlar [(task_id, tür, son teslim tarihi), ...] olarak döner; hâlâ zamanındadırlar
+    ve yeniden denenmeleri gerekir. Sorgu sayısı zamanlayıcı sayısından bağımsızdır
+    (tür başına okuma + UPDATE, atlanan varsa bir okuma daha).
+    """
+    now = now or timezone.now()
+    content_type_id = ContentType.objects.get_for_model(Task).pk
+    sent = 0
+    locked = []
+    for kind, (field, verb) in KINDS.items():
+        ids = [task_id for task_id, timer_kind in timers if timer_kind == kind]
+        if not ids:
+            continue
+        with transaction.atomic():
+            # Başka bir worker'ın işlediği satırlar atlanır
+            rows = list(
+                _due(kind, now).filter(pk__in=ids)
+                               .select_for_update(skip_locked=True)
+                               .values_list('id', 'assignee_id', 'creator_id')
+            )
+            missing = set(ids) - {task_id for task_id, _, _ in rows}
+            if missing:
+                # Bulunamayanlardan hâlâ zamanında olanlar kilitliydi (kilitsiz okuma beklemez)
+                locked.extend(
+                    (task_id, kind, due_date)
+                    for task_id, due_date in _due(kind, now).filter(pk__in=missing).values_list('id', 'due_date')
+                )
+            if not rows:
+                continue
+            Task.objects.filter(pk__in=[task_id for task_id, _, _ in rows]).update(**{field: F('due_date')})
+            notifications = []
+            for task_id, assignee_id, creator_id in rows:
+                # Hatırlatma sorumluya (yoksa oluşturana), yükseltme oluşturana ve sorumluya gider
+                if kind == REMINDER:
+                    recipients, actor_id = [assignee_id or creator_id], creator_id
+                else:
+                    recipients, actor_id = sorted({creator_id, assignee_id} - {None}), assignee_id or creator_id
+                notifications.extend(
+                    dict(recipient_id=recipient_id, actor_id=actor_id, verb=verb,
+                         content_type_id=content_type_id, object_id=task_id)
+                    for recipient_id in recipients
+                )
+            enqueue_notifications(notifications)
+            sent += len(notifications)
+    return sent, locked
+
+
+def _epoch(value):
+    return value.timestamp() if value is not None else None
+
+
+class DeadlineWorker:
+    """ Zamanlayıcıları yükler, kanal katmanından gelen değişiklikleri uygular ve zamanı gelenleri işler. """
+
+    def __init__(self, channel_layer=None):
+        self.channel_layer = channel_layer
+        self.reset()
+
+    def reset(self):
+        """ Bellekteki zamanlayıcıları atar; bir sonraki yükleme pencereyi baştan okur. """
+        self.scheduler = DeadlineScheduler(_conf('REMIND_BEFORE'), _conf('ESCALATE_AFTER'))
+        self.loaded_until = None
+        self.next_load_at = None
+
+    def load(self, now=None):
+        """ Pencerenin henüz yüklenmemiş dilimindeki açık görevleri yükler; yüklenen sayısını döndürür. """
+        now = time.time() if now is None else now
+        start = self.loaded_until
+        if start is None:
+            start = now - _conf('ESCALATE_AFTER') - _conf('CATCH_UP')
+        until = now + _conf('HORIZON') + _conf('REMIND_BEFORE')
+        rows = Task.objects.filter(
+            status__in=OPEN_STATUSES,
+            due_date__gte=datetime.fromtimestamp(start, dt_timezone.utc),
+            due_date__lt=datetime.fromtimestamp(until, dt_timezone.utc),
+        ).values_list('id', 'due_date', 'reminder_sent_for', 'escalation_sent_for')
+        count = 0
+        for task_id, due_date, reminded_for, escalated_for in rows.iterator():
+            sent = [kind for kind, sent_for in ((REMINDER, reminded_for), (ESCALATION, escalated_for))
+                    if sent_for == due_date]
+            self.scheduler.set_deadline(task_id, due_date.timestamp(), sent)
+            count += 1
+        self.loaded_until = until
+        self.next_load_at = now + _conf('HORIZON') / 2
+        return count
+
+    def apply(self, message):
+        """ DEADLINE_GROUP olayını uygular (bkz. publish_deadlines). """
+        for change in message.get('changes', []):
+            due = _epoch(parse_datetime(change['due_date'])) if change.get('due_date') else None
+            # Pencerenin dışındakiler pencere ilerleyince yüklenir
+            if due is not None and self.loaded_until is not None and due >= self.loaded_until:
+                due = None
+            self.scheduler.set_deadline(change['id'], due)
+
+    def fire_due(self, now=None):
+        """ Zamanı gelen zamanlayıcıları BATCH_SIZE'lık gruplarla işler; gönderilen bildirim sayısı. """
+        now = time.time() if now is None else now
+        until = now + _conf('BATCH_WINDOW')
+        sent = 0
+        while timers := self.scheduler.pop_due(until, _conf('BATCH_SIZE')):
+            fired, locked = fire_timers(timers, datetime.fromtimestamp(until, dt_timezone.utc))
+            sent += fired
+            # Yeniden deneme bu turun dışında kalır; döngü kilitli satırlarda dönmez
+            for task_id, kind, due_date in locked:
+                self.scheduler.retry(task_id, kind, due_date.timestamp(), until + _conf('RETRY_AFTER'))
+        return sent
+
+    def wait_time(self, now=None):
+        """ Bir sonraki iş (zamanlayıcı veya pencere yüklemesi) için beklenecek süre (sn). """
+        now = time.time() if now is None else now
+        if self.next_load_at is None:
+            return 0
+        candidates = [self.next_load_at]
+        next_at = self.scheduler.next_at()
+        if next_at is not None:
+            candidates.append(next_at - _conf('BATCH_WINDOW'))
+        return max(min(candidates) - now, 0)
+
+    async def run(self, stop=None):
+        """ Worker döngüsü; `stop` (asyncio.Event) verilirse kurulunca döngüden çıkılır. """
+        layer = self.channel_layer or get_channel_layer()
+        channel = await layer.new_channel()
+        receiver = None
+        try:
+            while stop is None or not stop.is_set():
+                try:
+                    await self._tick(layer, channel)
+                except Exception:
+                    # İşlenemeyen zamanlayıcılar kaybolmasın: pencere baştan yüklenir
+                    logger.exception('Son teslim tarihi zamanlayıcıları işlenemedi.')
+                    self.reset()
+
+                if receiver is None:
+                    receiver = asyncio.ensure_future(layer.receive(channel))
+                waiters = {receiver} if stop is None else {receiver, asyncio.ensure_future(stop.wait())}
+                done, pending = await asyncio.wait(
+                    waiters, timeout=self.wait_time(), return_when=asyncio.FIRST_COMPLETED,
+                )
+                for waiter in pending - {receiver}:
+                    waiter.cancel()
+                if receiver in done:
+                    message, receiver = receiver.result(), None
+                    self.apply(message)
+        finally:
+            if receiver is not None:
+                receiver.cancel()
+            await layer.group_discard(DEADLINE_GROUP, channel)
+
+    async def _tick(self, layer, channel):
+        if self.next_load_at is None or time.time() >= self.next_load_at:
+            # Grup üyeliğinin süresi dolmasın diye her yüklemede yenilenir
+            await layer.group_add(DEADLINE_GROUP, channel)
+            count = await sync_to_async(self._with_connection)(self.load)
+            logger.info('%s son teslim tarihi yüklendi (%s görev izleniyor).', count, len(self.scheduler))
+        sent = await sync_to_async(self._with_connection)(self.fire_due)
+        if sent:
+            logger.info('%s son teslim tarihi bildirimi gönderildi.', sent)
+
+    @staticmethod
+    def _with_connection(func, *args):
+        # Uzun süre çalışan süreçte kopmuş/eskimiş veritabanı bağlantıları yenilenir
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
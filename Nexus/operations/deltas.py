@@ -0,0 +1,133 @@
+# operations/deltas.py
+"""
+Görev odaları için tipli delta olayları.
+
+Her delta göreve ait, monoton artan bir `version` taşır (Task.version). İstemci
+elindeki görevi delta'ları sırayla uygulayarak günceller; REST API'ye tekrar gitmez.
+
+    {'type': 'comment_added',    'task_id': 7, 'version': 12, 'data': {...yorum...}}
+    {'type': 'attachment_added', 'task_id': 7, 'version': 13, 'data': {...ek...}}
+    {'type': 'status_changed',   'task_id': 7, 'version': 14, 'data': {'from': 'NEW', 'to': 'IN_PROGRESS', ...}}
+    {'type': 'field_patch',      'task_id': 7, 'version': 15, 'data': {'title': '...', 'updated_at': '...'}}
+
+Son REPLAY_SIZE delta önbellekte (delta başına bir anahtar) TIMEOUT süresince tutulur.
+Yeniden bağlanan istemci `since=<version>` ile kaçırdıklarını isteyebilir; aradaki
+delta'lardan biri bile eksikse `None` döner ve istemci görevi yeniden çekmelidir.
+
+Ayarlar: settings.TASK_DELTAS = {'REPLAY_SIZE': ..., 'TIMEOUT': ...}
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+
+from .broadcast import broadcast_task_change
+
+_DEFAULTS = {
+    'REPLAY_SIZE': 200,   # Yeniden oynatılabilecek en fazla delta sayısı (görev başına)
+    'TIMEOUT': 60 * 60,   # Delta'ların önbellekte kalma süresi (sn)
+}
+
+COMMENT_ADDED = 'comment_added'
+ATTACHMENT_ADDED = 'attachment_added'
+STATUS_CHANGED = 'status_changed'
+FIELD_PATCH = 'field_patch'
+
+# field_patch ile gönderilen alanlar (model alanı -> TaskSerializer'daki adı)
+PATCH_FIELDS = {
+    'title': 'title',
+    'description': 'description',
+    'priority': 'priority',
+    'due_date': 'due_date',
+    'assignee_id': 'assignee',
+    'department_id': 'department',
+}
+
+
+def _conf(name):
+    return getattr(settings, 'TASK_DELTAS', {}).get(name, _DEFAULTS[name])
+
+
+def _delta_key(task_id, version):
+    return f'tasks:{task_id}:delta:{version}'
+
+
+def bump_task_version(task_id):
+    """ Görevin sürümünü atomik olarak bir artırır ve yeni değeri döndürür. """
+    from .models import Task
+
+    if connection.vendor == 'postgresql':
+        # Tek sorgu: UPDATE ... RETURNING
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Task._meta.db_table} SET version = version + 1 WHERE id = %s RETURNING version',
+                [task_id],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+    # Diğer veritabanlarında UPDATE satırı işlem sonuna kadar kilitler; okuma tutarlıdır
+    Task.objects.filter(pk=task_id).update(version=F('version') + 1)
+    return Task.objects.filter(pk=task_id).values_list('version', flat=True).first()
+
+
+def record_task_delta(task_id, delta_type, data, task=None):
+    """
+    Sürümü artırır, delta'yı commit sonrası yeniden oynatma tamponuna yazar ve
+    görev odasına yayınlar. `task` verilirse bellekteki version alanı da güncellenir.
+    """
+    version = bump_task_version(task_id)
+    if version is None:
+        return None
+    if task is not None:
+        task.version = version
+
+    delta = {'type': delta_type, 'task_id': task_id, 'version': version, 'data': data}
+    publish_task_deltas([delta])
+    return delta
+
+
+def publish_task_deltas(deltas):
+    """ Sürümü atanmış delta'ları commit sonrası tampona yazar ve yayınlar. """
+    if not deltas:
+        return
+    entries = {_delta_key(delta['task_id'], delta['version']): delta for delta in deltas}
+    transaction.on_commit(lambda: cache.set_many(entries, _conf('TIMEOUT')))
+    for delta in deltas:
+        broadcast_task_change(delta['task_id'], delta)
+
+
+def replay_task_deltas(task_id, since, current):
+    """
+    `since` sürümünden sonraki delta'ları sırayla döndürür.
+    Tampon yetmiyorsa (çok eski sürüm veya düşmüş kayıt) None döner.
+    """
+    if since >= current:
+        return []
+    if since < 0 or current - since > _conf('REPLAY_SIZE'):
+        return None
+    keys = [_delta_key(task_id, version) for version in range(since + 1, current + 1)]
+    found = cache.get_many(keys)
+    if len(found) != len(keys):
+        return None
+    return [found[key] for key in keys]
+
+
+def task_serializer_fields():
+    from .serializers import TaskSerializer
+
+    return TaskSerializer().fields
+
+
+def task_patch(task, fields, serializer_fields=None):
+    """
+    Değişen alanların TaskSerializer ile aynı biçimdeki değerleri.
+    Çok sayıda görev için `task_serializer_fields()` bir kez oluşturulup geçilebilir.
+    """
+    if serializer_fields is None:
+        serializer_fields = task_serializer_fields()
+    data = {}
+    for name in [*fields, 'updated_at']:
+        field = serializer_fields[name]
+        value = field.get_attribute(task)
+        data[name] = None if value is None else field.to_representation(value)
+    return data
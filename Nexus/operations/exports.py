@@ -0,0 +1,243 @@
+# operations/exports.py
+"""
+Görev listesinin CSV / NDJSON / XLSX olarak akışla dışa aktarılması.
+
+Satırlar model örneği ve TaskSerializer yerine `values_list` + `.iterator(chunk_size=...)`
+ile okunur; PostgreSQL'de sunucu taraflı cursor kullanılır. Çıktı BUFFER_SIZE'lık
+parçalar halinde üretilir, yani bellek kullanımı görev sayısından bağımsızdır ve ilk
+bayt ilk parça dolar dolmaz gönderilir.
+
+XLSX için ek bağımlılık yoktur: çalışma kitabı, sayfa verisi akışla yazılan bir zip
+(zip64, veri tanımlayıcılı) olarak üretilir; hücreler satır içi metin veya sayıdır.
+
+Başlık ve e-posta gibi alanlar kullanıcıdan gelir. CSV'de `=`, `+`, `-`, `@` (ve sekme/CR)
+ile başlayan metinlerin başına `'` eklenir; Excel bunları formül olarak çalıştırmaz.
+XLSX'te metinler her zaman satır içi metin hücresidir (formül <f> öğesi hiç yazılmaz).
+
+ASGI altında Django senkron iteratörleri önce listeye çevirir (tüm çıktı bellekte
+toplanır); bu yüzden ASGI isteklerinde parçalar `sync_to_async` ile tek tek çekilir.
+Aynı thread'de çalıştıkları için veritabanı cursor'ı parçalar arasında korunur.
+
+Ayarlar: settings.TASK_EXPORT = {'CHUNK_SIZE': ..., 'BUFFER_SIZE': ...}
+"""
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import datetime
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+_DEFAULTS = {
+    'CHUNK_SIZE': 2000,         # Veritabanından tek seferde okunan satır sayısı
+    'BUFFER_SIZE': 64 * 1024,   # İstemciye gönderilen parçaların yaklaşık boyutu (bayt)
+}
+
+# (başlık, values_list alanı)
+COLUMNS = [
+    ('ID', 'id'),
+    ('Başlık', 'title'),
+    ('Durum', 'status'),
+    ('Öncelik', 'priority'),
+    ('Oluşturan', 'creator__email'),
+    ('Atanan', 'assignee__email'),
+    ('Departman', 'department__name'),
+    ('Son Teslim Tarihi', 'due_date'),
+    ('Oluşturulma', 'created_at'),
+    ('Tamamlanma', 'completed_at'),
+]
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+HEADERS = [header for header, _ in COLUMNS]
+# XML 1.0'da izin verilmeyen kontrol karakterleri
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Elektronik tablolarda formül başlatan karakterler (CSV/formül enjeksiyonu)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _conf(name):
+    return getattr(settings, 'TASK_EXPORT', {}).get(name, _DEFAULTS[name])
+
+
+def _rows(queryset):
+    """ Ham satırlar; tarihler ISO 8601 metne çevrilir. """
+    for row in queryset.order_by('id').values_list(*(field for _, field in COLUMNS))\
+                       .iterator(chunk_size=_conf('CHUNK_SIZE')):
+        yield [
+            timezone.localtime(value).isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ]
+
+
+def export_tasks(request, queryset, file_format):
+    """ `queryset`'i (filtrelenmiş ve görünürlüğü kısıtlanmış) akışla dışa aktaran yanıt. """
+    chunks = _WRITERS[file_format](_rows(queryset))
+    response = StreamingHttpResponse(
+        # DRF Request'in altındaki HttpRequest'e bakılır
+        _async_chunks(chunks) if isinstance(getattr(request, '_request', request), ASGIRequest) else chunks,
+        content_type=FORMATS[file_format],
+    )
+    filename = f"gorevler-{timezone.localdate():%Y%m%d}.{file_format}"
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Cache-Control'] = 'private, no-store'
+    # nginx arkasında parçalar tamponlanmadan iletilsin
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _async_chunks(chunks):
+    sentinel = object()
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, sentinel)) is not sentinel:
+        yield chunk
+
+
+# -- Biçimler -----------------------------------------------------------------------
+def _buffered(lines):
+    """ Küçük parçaları BUFFER_SIZE'a ulaşana kadar biriktirir. """
+    buffer, size, limit = [], 0, _conf('BUFFER_SIZE')
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= limit:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv(rows):
+    def lines():
+        line = io.StringIO()
+        writer = csv.writer(line)
+        # BOM: Excel UTF-8 dosyayı Türkçe karakterleri bozmadan açsın
+        yield '\ufeff'.encode()
+        for values in chain([HEADERS], rows):
+            writer.writerow([_csv_cell(value) for value in values])
+            yield line.getvalue().encode()
+            line.seek(0)
+            line.truncate()
+    return _buffered(lines())
+
+
+def _ndjson(rows):
+    names = [field.replace('__', '_') for _, field in COLUMNS]
+    return _buffered(
+        (json.dumps(dict(zip(names, values)), ensure_ascii=False) + '\n').encode() for values in rows
+    )
+
+
+def _xlsx(rows):
+    return _XlsxWriter().stream(rows)
+
+
+_WRITERS = {'csv': _csv, 'ndjson': _ndjson, 'xlsx': _xlsx}
+
+
+# -- Akışla XLSX ----------------------------------------------------------------------
+class _Sink:
+    """ zipfile'ın yazdığı baytları toplayan, konumlanamayan (unseekable) hedef. """
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class _XlsxWriter:
+    CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    )
+    ROOT_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    )
+    WORKBOOK = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Görevler" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+    WORKBOOK_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    )
+    SHEET_START = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+    )
+    SHEET_END = '</sheetData></worksheet>'
+
+    def stream(self, rows):
+        sink = _Sink()
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('[Content_Types].xml', self.CONTENT_TYPES)
+            archive.writestr('_rels/.rels', self.ROOT_RELS)
+            archive.writestr('xl/workbook.xml', self.WORKBOOK)
+            archive.writestr('xl/_rels/workbook.xml.rels', self.WORKBOOK_RELS)
+            # Boyut baştan bilinmediği için zip64 zorunlu (4 GB üstü sayfalar)
+            with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+                sheet.write(self.SHEET_START.encode())
+                for block in _buffered(self._row(values) for values in chain([HEADERS], rows)):
+                    sheet.write(block)
+                    # Sıkıştırıcı kendi tamponunu doldurana kadar boş dönebilir
+                    if data := sink.take():
+                        yield data
+                sheet.write(self.SHEET_END.encode())
+        yield sink.take()
+
+    @staticmethod
+    def _row(values):
+        cells = []
+        for value in values:
+            if value is None:
+                cells.append('<c/>')
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c><v>{value}</v></c>')
+            else:
+                # inlineStr hücresi her zaman metindir; "=..." ile başlasa da hesaplanmaz
+                text = escape(_XML_ILLEGAL.sub('', str(value)))
+                cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        return f'<row>{"".join(cells)}</row>'.encode()
@@ -0,0 +1,80 @@
+# operations/filters.py
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Task
+
+
+def _split(raw):
+    return [value.strip() for value in raw.split(',') if value.strip()]
+
+
+def _parse_choices(name, raw, choices):
+    values = _split(raw)
+    invalid = [value for value in values if value not in choices]
+    if invalid:
+        raise ValidationError({name: f'Geçersiz değer(ler): {", ".join(invalid)}'})
+    return values
+
+
+def _parse_ids(name, raw):
+    try:
+        return [int(value) for value in _split(raw)]
+    except ValueError:
+        raise ValidationError({name: 'Virgülle ayrılmış sayısal id listesi bekleniyor.'})
+
+
+def _parse_moment(name, raw, end_of_day=False):
+    """ ISO tarih-saat (2025-09-01T12:00:00Z) veya yalnızca tarih (2025-09-01) kabul eder. """
+    try:
+        moment = parse_datetime(raw)
+        day = None if moment else parse_date(raw)
+    except ValueError:
+        moment = day = None
+    if moment is None:
+        if day is None:
+            raise ValidationError({name: 'Geçersiz tarih. ISO 8601 formatı bekleniyor.'})
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Görev listesi için sunucu tarafı filtreler. Hepsi indeksli kolonlar üzerindedir.
+
+      ?status=NEW,ASSIGNED      ?priority=HIGH,URGENT
+      ?assignee=3,5             ?assignee=none  (atanmamış görevler)
+      ?department=2             ?due_after=2025-09-01&due_before=2025-09-30
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        if params.get('status'):
+            queryset = queryset.filter(
+                status__in=_parse_choices('status', params['status'], Task.Status.values)
+            )
+        if params.get('priority'):
+            queryset = queryset.filter(
+                priority__in=_parse_choices('priority', params['priority'], Task.Priority.values)
+            )
+        if params.get('assignee'):
+            if params['assignee'] == 'none':
+                queryset = queryset.filter(assignee__isnull=True)
+            else:
+                queryset = queryset.filter(assignee_id__in=_parse_ids('assignee', params['assignee']))
+        if params.get('department'):
+            queryset = queryset.filter(department_id__in=_parse_ids('department', params['department']))
+        if params.get('due_after'):
+            queryset = queryset.filter(due_date__gte=_parse_moment('due_after', params['due_after']))
+        if params.get('due_before'):
+            queryset = queryset.filter(
+                due_date__lte=_parse_moment('due_before', params['due_before'], end_of_day=True)
+            )
+        return queryset
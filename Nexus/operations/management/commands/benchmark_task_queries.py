@@ -0,0 +1,197 @@
+# operations/management/commands/benchmark_task_queries.py
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from operations.models import Task, Department, OPEN_STATUSES
+from operations.rollups import rebuild_task_rollups
+from operations.views import TaskViewSet, ReportingDataView
+from users.models import User
+from users.permission_cache import EffectivePermissions
+
+BENCH_PREFIX = '[bench]'
+BENCH_EMAIL_DOMAIN = 'bench.nexus.local'
+
+
+@contextmanager
+def _manual_timestamps():
+    """ Tohumlama sırasında created_at/updated_at değerlerini elle verebilmek için. """
+    fields = [Task._meta.get_field('created_at'), Task._meta.get_field('updated_at')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "N adet test görevi oluşturur ve TaskViewSet / ReportingDataView sorgularının "
+        "EXPLAIN çıktısını ve çalışma sürelerini yazdırır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000, help='Oluşturulacak görev sayısı (0: tohumlama yok)')
+        parser.add_argument('--users', type=int, default=200, help='Görevlerin dağıtılacağı kullanıcı sayısı')
+        parser.add_argument('--departments', type=int, default=20, help='Departman sayısı')
+        parser.add_argument('--repeat', type=int, default=5, help='Her sorgunun kaç kez çalıştırılacağı')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--analyze', action='store_true', help='PostgreSQL üzerinde EXPLAIN ANALYZE kullan')
+        parser.add_argument('--no-explain', action='store_true', help='Sadece süreleri yazdır')
+        parser.add_argument('--cleanup', action='store_true', help='Önceki çalışmadan kalan test verilerini sil ve çık')
+        parser.add_argument('--seed', type=int, default=42, help='Rastgele sayı üreteci tohumu')
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            self._cleanup()
+            return
+
+        rng = random.Random(options['seed'])
+        users, departments = self._ensure_fixtures(options['users'], options['departments'])
+        if options['tasks']:
+            self._seed_tasks(rng, options['tasks'], users, departments, options['batch_size'])
+
+        total = Task.objects.count()
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{connection.vendor} üzerinde {total} görev ile ölçüm (her sorgu {options['repeat']} kez)\n"
+        ))
+
+        for name, queryset in self._benchmark_queries(rng, users):
+            self._run(name, queryset, options)
+
+    # -- Veri hazırlama ---------------------------------------------------------
+    def _ensure_fixtures(self, user_count, department_count):
+        existing = User.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').count()
+        User.objects.bulk_create([
+            User(email=f'bench{i}@{BENCH_EMAIL_DOMAIN}', first_name='Bench', last_name=str(i))
+            for i in range(existing, user_count)
+        ])
+        Department.objects.bulk_create([
+            Department(name=f'{BENCH_PREFIX} Departman {i}') for i in range(department_count)
+        ], ignore_conflicts=True)
+        users = list(User.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').values_list('pk', flat=True))
+        departments = list(Department.objects.filter(name__startswith=BENCH_PREFIX).values_list('pk', flat=True))
+        return users, departments
+
+    def _seed_tasks(self, rng, count, users, departments, batch_size):
+        now = timezone.now()
+        statuses = Task.Status.values
+        priorities = Task.Priority.values
+        started = time.perf_counter()
+
+        with _manual_timestamps(), transaction.atomic():
+            batch = []
+            for i in range(count):
+                created_at = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+                updated_at = min(now, created_at + timedelta(minutes=rng.randint(0, 30 * 24 * 60)))
+                status = rng.choice(statuses)
+                batch.append(Task(
+                    title=f'{BENCH_PREFIX} Görev {i}',
+                    status=status,
+                    priority=rng.choice(priorities),
+                    creator_id=rng.choice(users),
+                    assignee_id=rng.choice(users) if rng.random() < 0.9 else None,
+                    department_id=rng.choice(departments) if departments and rng.random() < 0.95 else None,
+                    created_at=created_at,
+                    updated_at=updated_at,
+                    completed_at=updated_at if status == Task.Status.COMPLETED else None,
+                    due_date=created_at + timedelta(days=rng.randint(1, 60)) if rng.random() < 0.7 else None,
+                ))
+                if len(batch) >= batch_size:
+                    Task.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                Task.objects.bulk_create(batch)
+
+        # bulk_create sinyal tetiklemez; raporlama sayaçlarını yeniden hesapla
+        rebuild_task_rollups()
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Task._meta.db_table}')
+
+        self.stdout.write(f'{count} görev {time.perf_counter() - started:.1f} sn içinde oluşturuldu.')
+
+    def _cleanup(self):
+        deleted, _ = Task.objects.filter(title__startswith=BENCH_PREFIX).delete()
+        Department.objects.filter(name__startswith=BENCH_PREFIX).delete()
+        User.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').delete()
+        rebuild_task_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Test verileri silindi ({deleted} kayıt).'))
+
+    # -- Ölçülecek sorgular -----------------------------------------------------
+    def _task_view(self, user, action, query=''):
+        """ TaskViewSet'in kendi get_queryset/filter mantığını kullanmak için sahte istek. """
+        request = Request(APIRequestFactory().get(f'/operations/tasks/{query}'))
+        request.user = user
+        return TaskViewSet(action=action, request=request, format_kwarg=None, kwargs={})
+
+    def _benchmark_queries(self, rng, user_ids):
+        # view_all yetkisi olmayan sıradan bir kullanıcı: OR sorgusu
+        member = User.objects.get(pk=rng.choice(user_ids))
+        # Aynı kullanıcı, 'tasks.view_all' yetkisi varmış gibi (yetki önbelleğine yazmadan)
+        manager = User.objects.get(pk=member.pk)
+        manager._effective_permissions = EffectivePermissions(
+            roles=frozenset(), permissions=frozenset(['tasks.view_all'])
+        )
+        page = TaskViewSet.pagination_class.page_size + 1
+        ordering = TaskViewSet.pagination_class.ordering
+
+        view = self._task_view(member, 'list')
+        yield 'tasks.list (kendi görevleri, ilk sayfa)', \
+            view.filter_queryset(view.get_queryset()).order_by(*ordering)[:page]
+
+        view = self._task_view(member, 'list', '?status=' + ','.join(OPEN_STATUSES))
+        yield 'tasks.list (kendi açık görevleri)', \
+            view.filter_queryset(view.get_queryset()).order_by(*ordering)[:page]
+
+        view = self._task_view(manager, 'list')
+        everything = view.filter_queryset(view.get_queryset()).order_by(*ordering)
+        yield 'tasks.list (tüm görevler, ilk sayfa)', everything[:page]
+
+        # Listenin ortasındaki bir cursor: OFFSET yerine keyset ile atlama
+        middle = Task.objects.order_by(*ordering).values_list('created_at', 'id')[Task.objects.count() // 2:][:1]
+        for position in middle:
+            yield 'tasks.list (tüm görevler, derin sayfa)', \
+                everything.filter(view.paginator._seek_filter(list(position)))[:page]
+
+        view = self._task_view(member, 'list', '?priority=URGENT&due_before=' + timezone.now().date().isoformat())
+        yield 'tasks.list (acil ve süresi geçmiş)', \
+            view.filter_queryset(view.get_queryset()).order_by(*ordering)[:page]
+
+        task = Task.objects.filter(assignee=member).first()
+        if task is not None:
+            view = self._task_view(member, 'retrieve')
+            yield 'tasks.retrieve', view.get_queryset().filter(pk=task.pk)
+
+        for name, queryset in ReportingDataView().get_querysets().items():
+            yield f'reporting.{name}', queryset
+
+    # -- Ölçüm --------------------------------------------------------------------
+    def _run(self, name, queryset, options):
+        self.stdout.write(self.style.HTTP_INFO(f'--- {name}'))
+        if not options['no_explain']:
+            explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+            self.stdout.write(queryset.explain(**explain_options))
+
+        timings = []
+        for _ in range(max(1, options['repeat'])):
+            started = time.perf_counter()
+            rows = len(list(queryset.all()))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(
+            f'satır={rows}  min={min(timings):.2f} ms  medyan={statistics.median(timings):.2f} ms  '
+            f'maks={max(timings):.2f} ms\n'
+        )
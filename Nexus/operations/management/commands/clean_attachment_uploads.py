@@ -0,0 +1,15 @@
+# operations/management/commands/clean_attachment_uploads.py
+from django.core.management.base import BaseCommand
+
+from operations.uploads import clean_expired_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Süresi dolmuş (ATTACHMENT_UPLOADS['EXPIRE_HOURS']) parçalı yüklemeleri ve kaydı "
+        "kalmamış parça dizinlerini siler."
+    )
+
+    def handle(self, *args, **options):
+        removed = clean_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(f'{removed} yarım kalmış yükleme silindi.'))
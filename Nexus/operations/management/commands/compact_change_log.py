@@ -0,0 +1,21 @@
+# operations/management/commands/compact_change_log.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from operations.changelog import compact_change_log
+
+
+class Command(BaseCommand):
+    help = (
+        "Senkronizasyon günlüğünü (ChangeLog) sıkıştırır: aynı nesnenin daha yeni bir satırı "
+        "olan satırları ve SYNC['RETENTION_DAYS']'ten eski satırları siler."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        superseded, expired = compact_change_log()
+        self.stdout.write(self.style.SUCCESS(
+            f'{superseded} eskimiş satır ve {expired} süresi dolmuş satır silindi '
+            f'({time.perf_counter() - started:.1f} sn).'
+        ))
@@ -0,0 +1,36 @@
+# operations/management/commands/compact_task_rollups.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from nexus_backend.response_cache import invalidate_tags
+from operations.rollups import compact_task_rollups, rebuild_task_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "TaskRollup raporlama sayaçlarını sıkıştırır: aynı kovadaki satırları birleştirir ve "
+        "sıfırlanan kovaları siler. --rebuild ile sayaçlar Task tablosundan yeniden hesaplanır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Sayaçları baştan hesapla (toplu update/bulk_create sonrası kullanın)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['rebuild']:
+            rebuild_task_rollups()
+            invalidate_tags('tasks')
+            self.stdout.write(self.style.SUCCESS(
+                f'Sayaçlar yeniden hesaplandı ({time.perf_counter() - started:.1f} sn).'
+            ))
+            return
+
+        merged, removed = compact_task_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f'{merged} yinelenen satır birleştirildi, {removed} boş kova silindi '
+            f'({time.perf_counter() - started:.1f} sn).'
+        ))
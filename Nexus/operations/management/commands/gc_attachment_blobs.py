@@ -0,0 +1,31 @@
+# operations/management/commands/gc_attachment_blobs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from operations.blobs import adopt_legacy_attachments, collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        "İçerik adresli ek deposunu temizler: referansı kalmamış blob'ları ve hiçbir kayda ait "
+        "olmayan dosyaları siler. --adopt-legacy ile önce eski ekler blob'lara taşınır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--adopt-legacy', action='store_true',
+            help="Blob'u olmayan eski ekleri hash'leyip tekilleştir (bir kez çalıştırmak yeterli)",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['adopt_legacy']:
+            adopted = adopt_legacy_attachments()
+            self.stdout.write(f'{adopted} eski ek blob\'lara bağlandı.')
+
+        blobs, orphans = collect_garbage()
+        self.stdout.write(self.style.SUCCESS(
+            f"{blobs} kullanılmayan blob ve {orphans} yetim dosya silindi "
+            f'({time.perf_counter() - started:.1f} sn).'
+        ))
@@ -0,0 +1,31 @@
+# operations/management/commands/generate_attachment_previews.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from operations.models import AttachmentBlob
+from operations.previews import process_blob
+
+
+class Command(BaseCommand):
+    help = (
+        "İşlenmemiş ek blob'ları için meta veri ve küçük resim üretir (örn. süreç çöktükten "
+        "veya --adopt-legacy sonrası). --all ile tüm küçük resimler yeniden üretilir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='İşlenmiş blob\'ları da yeniden işle (SIZES/QUALITY değiştiyse)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        blobs = AttachmentBlob.objects.all() if options['all'] else AttachmentBlob.objects.filter(processed=False)
+        count = 0
+        for digest in blobs.values_list('pk', flat=True).iterator():
+            process_blob(digest, force=options['all'])
+            count += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} blob işlendi ({time.perf_counter() - started:.1f} sn).'
+        ))
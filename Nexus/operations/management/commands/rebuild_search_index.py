@@ -0,0 +1,20 @@
+# operations/management/commands/rebuild_search_index.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from operations.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Görev arama indeksini (başlık, açıklama, yorumlar) baştan oluşturur. İndeks normalde "
+        "sinyallerle güncel tutulur; ilk kurulumda veya TASK_SEARCH ayarları değişince çalıştırın."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} görev indekslendi ({time.perf_counter() - started:.1f} sn).'
+        ))
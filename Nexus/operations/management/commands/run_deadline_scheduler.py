@@ -0,0 +1,20 @@
+# operations/management/commands/run_deadline_scheduler.py
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from operations.deadlines import DeadlineWorker
+
+
+class Command(BaseCommand):
+    help = (
+        "Son teslim tarihi hatırlatmalarını ve SLA yükseltmelerini gönderen zamanlayıcı worker'ını "
+        "çalıştırır (bkz. operations/deadlines.py). Ayarlar: settings.TASK_DEADLINES."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Son teslim tarihi zamanlayıcısı başlatıldı.")
+        try:
+            asyncio.run(DeadlineWorker().run())
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Zamanlayıcı durduruldu."))
@@ -0,0 +1,29 @@
+# operations/mentions.py
+import re
+
+from django.contrib.auth import get_user_model
+
+MENTION_RE = re.compile(r'@(\w+)')
+
+# Tek bir yorumda dikkate alınacak en fazla farklı @mention sayısı
+MAX_MENTIONS = 50
+
+
+def extract_handles(text):
+    """ Metindeki @mention'ları sırasını koruyarak ve tekrarsız olarak döndürür. """
+    handles = dict.fromkeys(handle.lower() for handle in MENTION_RE.findall(text or ''))
+    return list(handles)[:MAX_MENTIONS]
+
+
+def resolve_mentions(text, exclude=None):
+    """
+    Metinde bahsedilen aktif kullanıcıları tek sorguda bulur (User.handle indeksli ve benzersiz).
+    `exclude`: bildirim almaması gereken kullanıcı id'leri (örn. yorumun yazarı).
+    """
+    handles = extract_handles(text)
+    if not handles:
+        return []
+    users = get_user_model().objects.filter(handle__in=handles, is_active=True)
+    if exclude:
+        users = users.exclude(pk__in=exclude)
+    return list(users)
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-17 14:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_rollups(apps, schema_editor):
+    Task = apps.get_model('operations', 'Task')
+    TaskRollup = apps.get_model('operations', 'TaskRollup')
+    # Geçmiş için en iyi tahmin: tamamlanmış görevlerin son güncellenme zamanı
+    Task.objects.filter(status='COMPLETED').update(completed_at=F('updated_at'))
+
+    from operations.rollups import rebuild_task_rollups
+    rebuild_task_rollups(Task, TaskRollup)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0004_task_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Tamamlanma Tarihi'),
+        ),
+        migrations.CreateModel(
+            name='TaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CREATED', 'Oluşturma'), ('COMPLETED', 'Tamamlanma')], max_length=10)),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('NEW', 'Yeni'), ('ASSIGNED', 'Atandı'), ('IN_PROGRESS', 'Devam Ediyor'), ('COMPLETED', 'Tamamlandı'), ('CANCELLED', 'İptal Edildi')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('assignee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='operations.department')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'day'], name='taskrollup_kind_day_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0006_task_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('task', 'Görev'), ('comment', 'Yorum'), ('attachment', 'Ek'), ('notification', 'Bildirim'), ('notifications_read', 'Bildirimler okundu')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('recipient_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'object_id'], name='changelog_object_idx'), models.Index(fields=['created_at'], name='changelog_created_idx')],
+            },
+        ),
+    ]
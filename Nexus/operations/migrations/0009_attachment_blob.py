@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:20
+
+import django.db.models.deletion
+import operations.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0008_attachment_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskattachment',
+            name='filename',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='taskattachment',
+            name='file',
+            field=models.FileField(max_length=255, upload_to=operations.models.task_attachment_path),
+        ),
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('file', models.FileField(max_length=255, upload_to=operations.models.blob_path)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('ref_count', 0)), fields=['created_at'], name='blob_unreferenced_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='operations.attachmentblob'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Görev arama indeksi (bkz. operations/search.py). Tablo veritabanına özeldir,
+# Django modeli yoktur. Mevcut görevler için: manage.py rebuild_search_index
+
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE operations_tasksearch ('
+            'task_id bigint PRIMARY KEY REFERENCES operations_task (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute('CREATE INDEX operations_tasksearch_gin ON operations_tasksearch USING gin (document)')
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE operations_tasksearch USING fts5('
+            "title, description, comments, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute('DROP TABLE IF EXISTS operations_tasksearch')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0010_attachment_previews'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
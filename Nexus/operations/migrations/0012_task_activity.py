@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:46
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0011_task_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskActivity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField()),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Oluşturuldu'), (2, 'Değiştirildi'), (3, 'Silindi')])),
+                ('fields', models.PositiveIntegerField(default=0)),
+                ('values', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('NEW', 'Yeni'), ('ASSIGNED', 'Atandı'), ('IN_PROGRESS', 'Devam Ediyor'), ('COMPLETED', 'Tamamlandı'), ('CANCELLED', 'İptal Edildi')], max_length=20)),
+                ('due_date', models.DateTimeField(null=True)),
+                ('actor', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('assignee', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='activity', to='operations.task')),
+            ],
+            options={
+                'ordering': ['timestamp', 'id'],
+                'indexes': [models.Index(fields=['task', 'timestamp', 'id'], name='taskactivity_task_idx'), models.Index(fields=['status', 'timestamp'], name='taskactivity_status_idx')],
+            },
+        ),
+    ]
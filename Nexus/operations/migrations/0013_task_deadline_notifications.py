@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0012_task_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='escalation_sent_for',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='reminder_sent_for',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
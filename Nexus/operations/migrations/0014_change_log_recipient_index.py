@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0013_task_deadline_notifications'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['recipient_id', 'id'], name='changelog_recipient_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 17:24
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0014_change_log_recipient_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_assignee_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_creator_created_idx',
+        ),
+    ]
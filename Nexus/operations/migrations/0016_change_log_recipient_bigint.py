@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 17:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0015_drop_unused_task_owner_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='changelog',
+            name='recipient_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
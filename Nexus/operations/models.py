@@ -1,10 +1,8 @@
 # operations/models.py
+import uuid
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.conf import settings
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 
 class Department(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -12,6 +10,11 @@ class Department(models.Model):
     def __str__(self):
         return self.name
 
+# Henüz kapanmamış (açık) görev durumları. Kısmi (partial) indeksler ve raporlar bunu kullanır.
+OPEN_STATUSES = ['NEW', 'ASSIGNED', 'IN_PROGRESS']
+# Tam kayıtta (save()) yazılmayan, sadece atomik UPDATE'lerle değişen Task alanları
+ATOMIC_FIELDS = ('version', 'reminder_sent_for', 'escalation_sent_for')
+
 class Task(models.Model):
     # Enum benzeri yapılar için Django'nun TextChoices'ını kullanıyoruz
     class Status(models.TextChoices):
@@ -48,12 +51,56 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateTimeField(null=True, blank=True, verbose_name="Son Teslim Tarihi")
+    # Görev COMPLETED durumuna geçtiğinde doldurulur (bkz. operations/transitions.py, operations/signals.py)
+    completed_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Tamamlanma Tarihi")
+    # Görevdeki her değişiklikte (yorum, ek, durum, alan) bir artar; WebSocket delta'ları
+    # bu sırayla numaralanır. Sadece operations.deltas.bump_task_version ile ve durum
+    # geçişlerinin UPDATE'inde (bkz. operations/transitions.py) artırılır.
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # Hatırlatma/yükseltme bildiriminin hangi son teslim tarihi için gönderildiği;
+    # sadece operations.deadlines.fire_timers yazar. Tarih değişince bildirim yeniden gider.
+    reminder_sent_for = models.DateTimeField(null=True, blank=True, editable=False)
+    escalation_sent_for = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # completed_at, status'a bağlı olarak pre_save sinyalinde ayarlanır;
+        # sadece status güncellenirken onun da yazıldığından emin ol
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'completed_at'}
+        elif update_fields is None and not self._state.adding and self.pk is not None:
+            # Tam kayıtta bellekteki (eski olabilecek) version değeri yazılmasın;
+            # aradaki atomik artışların üzerine yazmak aynı sürümü iki kez üretirdi.
+            # Bildirim işaretleri de sadece zamanlayıcı tarafından yazılır.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ATOMIC_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
-        ordering = ['-created_at']
+        # id, aynı anda oluşturulan görevler için kararlı bir sıra sağlar (keyset sayfalama)
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='task_created_id_idx'),
+            models.Index(fields=['priority'], name='task_priority_idx'),
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+            # "Bana atanan VEYA benim oluşturduğum" listesi assignee/creator FK indekslerini
+            # kullanır. BitmapOr sırayı korumadığından (assignee|creator, created_at, id)
+            # indeksleri bu sorguda kullanılmaz, sadece yazmaları yavaşlatır (0015 ile kaldırıldı).
+            # status filtreleri ve "son 30 günde tamamlananlar" (status='COMPLETED' AND updated_at >= ...)
+            models.Index(fields=['status', 'updated_at'], name='task_status_updated_idx'),
+            # Açık görevlerin departmana göre dağılımı: yalnızca açık satırları içeren
+            # kısmi indeks (PostgreSQL/SQLite), kapanan görevler büyüdükçe şişmez
+            models.Index(
+                fields=['department'],
+                condition=models.Q(status__in=OPEN_STATUSES),
+                name='task_open_department_idx',
+            ),
+        ]
 
 class TaskComment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments')
@@ -66,30 +113,202 @@ class TaskComment(models.Model):
 
     def __str__(self):
         return f'Comment by {self.author} on {self.task.title}'
+class TaskRollup(models.Model):
+    """
+    Raporlama için artımlı olarak güncellenen görev sayaçları
+    (gün x departman x durum x atanan kişi).
+
+    CREATED : görevin oluşturulduğu gün; departman/durum/atanan görevin güncel değerleridir.
+    COMPLETED: görevin tamamlandığı gün; yalnızca şu an COMPLETED olan görevler sayılır.
+
+    Sayaçlar Task sinyalleriyle güncellenir (bkz. operations/rollups.py). Aynı anahtar
+    için birden fazla satır oluşabilir; okumalar SUM ile yapıldığından sonuç değişmez,
+    `compact_task_rollups` komutu bu satırları birleştirir.
+    """
+    class Kind(models.TextChoices):
+        CREATED = 'CREATED', 'Oluşturma'
+        COMPLETED = 'COMPLETED', 'Tamamlanma'
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    day = models.DateField()
+    # Task'taki SET_NULL davranışının aynısı: departman/kişi silinirse sayaçlar "boş" kovaya geçer
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20, choices=Task.Status.choices)
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'day'], name='taskrollup_kind_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.day} {self.status}: {self.count}'
+
 # Dosyaların görev bazında klasörlenmesi için bir yardımcı fonksiyon
+# (eski ekler; yeni dosyalar AttachmentBlob altında içerik özetine göre saklanır)
 def task_attachment_path(instance, filename):
     return f'tasks/{instance.task.id}/attachments/{filename}'
 
+def blob_path(instance, filename):
+    digest = instance.sha256
+    return f'blobs/{digest[:2]}/{digest[2:4]}/{digest}'
+
+class AttachmentBlob(models.Model):
+    """
+    İçerik adresli dosya (bkz. operations/blobs.py). Aynı içerik kaç göreve eklenirse
+    eklensin bir kez saklanır; ref_count ona bağlı TaskAttachment sayısıdır.
+    Sayacı sıfıra inen blob'lar `manage.py gc_attachment_blobs` ile silinir.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(upload_to=blob_path, max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Arka planda bir kez çıkarılır (bkz. operations/previews.py); liste ekranı orijinali açmaz
+    processed = models.BooleanField(default=False)
+    content_type = models.CharField(max_length=100, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # Küçük resim boyutu (uzun kenar, str) -> depolama adı; dosyalar orijinalin yanındadır
+    thumbnails = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            # Çöp toplama sadece sayacı sıfır olanları tarar
+            models.Index(fields=['created_at'], condition=models.Q(ref_count=0), name='blob_unreferenced_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.sha256[:12]} ({self.size} bayt, {self.ref_count} referans)'
+
 class TaskAttachment(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='attachments')
     uploader = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attachments')
-    file = models.FileField(upload_to=task_attachment_path)
+    # Yeni eklerde blob.file ile aynı depolama adını gösterir
+    file = models.FileField(upload_to=task_attachment_path, max_length=255)
+    # Eski ekler için boş; `gc_attachment_blobs --adopt-legacy` doldurur
+    blob = models.ForeignKey(AttachmentBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='attachments')
+    # Kullanıcının yüklediği dosya adı (depolama adı içerik özetidir)
+    filename = models.CharField(max_length=255, blank=True)
     description = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f'File for {self.task.title} uploaded by {self.uploader}'
 
-@receiver(post_save, sender=TaskComment)
-def comment_post_save(sender, instance, created, **kwargs):
-    if created:
-        channel_layer = get_channel_layer()
-        group_name = f'task_{instance.task.id}'
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                'type': 'task.update', # consumer'daki metodun adı
-                'message': f'Yeni bir yorum eklendi: "{instance.content[:30]}..."'
-            }
-        )
 
+class AttachmentUpload(models.Model):
+    """
+    Parça parça, kaldığı yerden devam ettirilebilen ek yüklemesi (bkz. operations/uploads.py).
+    Parçalar diskte tutulur; hangilerinin geldiği dosya sisteminden okunur. Tamamlanınca
+    parçalar birleştirilip TaskAttachment oluşturulur ve bu kayıt silinir.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='uploads')
+    uploader = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attachment_uploads')
+    filename = models.CharField(max_length=255)
+    description = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def chunk_count(self):
+        return max(1, -(-self.size // self.chunk_size))
+
+    def chunk_length(self, index):
+        """ Son parça hariç tüm parçalar chunk_size uzunluğundadır. """
+        if index < self.chunk_count - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.chunk_count - 1)
+
+    def __str__(self):
+        return f'{self.filename} ({self.size} bayt) -> {self.task_id}'
+
+
+class ChangeLog(models.Model):
+    """
+    Çevrimdışı istemcilerin senkronizasyonu için sıkıştırılmış değişiklik günlüğü
+    (bkz. operations/changelog.py). Her satır "şu nesne değişti/silindi" der; nesnenin
+    kendisi senkronizasyon anında güncel haliyle okunur.
+    """
+    class Kind(models.TextChoices):
+        TASK = 'task', 'Görev'
+        COMMENT = 'comment', 'Yorum'
+        ATTACHMENT = 'attachment', 'Ek'
+        NOTIFICATION = 'notification', 'Bildirim'
+        # Kullanıcının tüm bildirimleri okundu olarak işaretlendi (object_id = kullanıcı)
+        NOTIFICATIONS_READ = 'notifications_read', 'Bildirimler okundu'
+
+    # Senkronizasyon token'ındaki konum bu sıraya göredir
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField()
+    # Satırı okuyabilen kullanıcı (bildirim alıcısı; görev, yorum ve eklerde görevin
+    # oluşturanı/sorumlusu). Günlük yazımı ucuz kalsın diye FK değil; User.pk (BigAutoField)
+    # ile aynı genişlikte
+    recipient_id = models.PositiveBigIntegerField(null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Sıkıştırma: aynı nesnenin eski satırlarını bulmak için
+            models.Index(fields=['kind', 'object_id'], name='changelog_object_idx'),
+            models.Index(fields=['created_at'], name='changelog_created_idx'),
+            # Kullanıcının kendi satırları: token'dan sonrası id sırasında
+            models.Index(fields=['recipient_id', 'id'], name='changelog_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}{" (silindi)" if self.deleted else ""}'
+
+
+class TaskActivity(models.Model):
+    """
+    Görevlerin yalnızca eklenen (append-only) geçmişi: kim, ne zaman, neyi değiştirdi
+    (bkz. operations/activity.py). Analizlerde kullanılan durum, sorumlu ve son teslim
+    tarihi olaydan sonraki değerleriyle ayrı sütunlardadır; alan farkları `fields` bit
+    maskesi ve `values` dizisi ([eski, yeni] çiftleri) olarak sıkıştırılır.
+    Görev silinse de geçmiş kalır: FK kısıtları yoktur.
+    """
+    class Kind(models.IntegerChoices):
+        CREATED = 1, 'Oluşturuldu'
+        CHANGED = 2, 'Değiştirildi'
+        DELETED = 3, 'Silindi'
+
+    id = models.BigAutoField(primary_key=True)
+    task = models.ForeignKey(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='activity',
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+        null=True, related_name='+',
+    )
+    timestamp = models.DateTimeField()
+    kind = models.PositiveSmallIntegerField(choices=Kind.choices)
+    # operations.activity.LOGGED_FIELDS içindeki sıraya göre değişen alanların bitleri
+    fields = models.PositiveIntegerField(default=0)
+    values = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    # Olaydan sonraki değerler (geçmişi Task tablosuna bakmadan sorgulamak için)
+    status = models.CharField(max_length=20, choices=Task.Status.choices)
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+        null=True, related_name='+',
+    )
+    due_date = models.DateTimeField(null=True)
+
+    class Meta:
+        ordering = ['timestamp', 'id']
+        indexes = [
+            # Görev zaman çizelgesi
+            models.Index(fields=['task', 'timestamp', 'id'], name='taskactivity_task_idx'),
+            # Zaman aralığındaki tamamlanma/gecikme analizleri
+            models.Index(fields=['status', 'timestamp'], name='taskactivity_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id}: {self.get_kind_display()} ({self.timestamp:%Y-%m-%d %H:%M})'
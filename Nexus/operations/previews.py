@@ -0,0 +1,161 @@
+# operations/previews.py
+"""
+Görev eki görselleri için küçük resimler ve meta veriler.
+
+Yeni bir blob commit edildiğinde (bkz. operations/blobs.py) işi bir worker havuzuna
+bırakılır. Worker orijinali bir kez açar:
+- boyut/MIME tipi AttachmentBlob'a yazılır; liste ekranı orijinali hiç çözmez,
+- SIZES'taki her uzun kenar için küçük resim üretilir ve orijinalin yanına
+  (`blobs/ab/cd/<özet>-<boyut>.webp`) kaydedilir. Blob içerik adresli olduğundan
+  aynı görsel kaç göreve eklenirse eklensin küçük resimler bir kez üretilir.
+
+JPEG'ler `draft` ile en büyük küçük resme yakın ölçekte çözülür; her boyut bir
+öncekinden küçültülür. MAX_PIXELS'ten büyük görseller (decompression bomb) işlenmez.
+
+Modlar (settings.ATTACHMENT_PREVIEWS['MODE']):
+  'async': worker havuzu (varsayılan)
+  'sync' : commit anında aynı thread'de (testler ve yönetim komutları için)
+
+Kuyruk bellektedir; süreç çökerse işlenmemiş blob'lar `manage.py generate_attachment_previews`
+ile tamamlanır. Pillow kurulu değilse sadece `processed` işaretlenir.
+"""
+import atexit
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from .models import AttachmentBlob
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # pragma: no cover - Pillow opsiyonel
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+_DEFAULTS = {
+    'MODE': 'async',
+    'WORKERS': 2,                 # Eşzamanlı işlenecek görsel sayısı (süreç başına)
+    'SIZES': [128, 512, 1024],    # Küçük resimlerin uzun kenarı (px)
+    'QUALITY': 80,                # WebP kalitesi
+    'MAX_PIXELS': 50_000_000,     # Bundan büyük görseller işlenmez
+}
+ORIENTATION_TAG = 0x0112
+
+
+def _conf(name):
+    return getattr(settings, 'ATTACHMENT_PREVIEWS', {}).get(name, _DEFAULTS[name])
+
+
+def thumbnail_name(blob, size):
+    return f'{blob.file.name}-{size}.webp'
+
+
+def process_blob(digest, force=False):
+    """ Blob'un meta verisini çıkarır ve küçük resimlerini üretir. """
+    blob = AttachmentBlob.objects.filter(pk=digest).first()
+    if blob is None or (blob.processed and not force):
+        return
+    fields = {'processed': True, 'content_type': '', 'width': None, 'height': None, 'thumbnails': {}}
+    if Image is not None:
+        try:
+            with default_storage.open(blob.file.name, 'rb') as content:
+                fields.update(_render(blob, content))
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            # Görsel değil veya bozuk: sadece işlendi olarak işaretlenir
+            pass
+    AttachmentBlob.objects.filter(pk=digest).update(**fields)
+
+
+def _render(blob, content):
+    image = Image.open(content)
+    width, height = image.size
+    if image.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+        # 90° döndürülmüş: ekranda görünen boyutlar
+        width, height = height, width
+    fields = {'content_type': Image.MIME.get(image.format, ''), 'width': width, 'height': height}
+    if width * height > _conf('MAX_PIXELS'):
+        return fields
+
+    sizes = sorted((size for size in _conf('SIZES') if size < max(image.size)), reverse=True)
+    if sizes:
+        # JPEG'i gereken en büyük boyuta yakın ölçekte çöz (tam çözünürlüğü belleğe alma)
+        image.draft('RGB', (sizes[0], sizes[0]))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    thumbnails = {}
+    for size in sizes:
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=_conf('QUALITY'), method=4)
+        name = thumbnail_name(blob, size)
+        default_storage.delete(name)
+        thumbnails[str(size)] = default_storage.save(name, ContentFile(buffer.getvalue()))
+    fields['thumbnails'] = thumbnails
+    return fields
+
+
+def delete_thumbnails(blob):
+    for name in blob.thumbnails.values():
+        default_storage.delete(name)
+
+
+class PreviewPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._futures = set()
+
+    def enqueue(self, digest):
+        """ Blob'u commit sonrası işlenmek üzere kuyruğa ekler. """
+        transaction.on_commit(lambda: self._submit(digest))
+
+    def flush(self, timeout=30.0):
+        """ Kuyruktaki işler bitene kadar bekler (kapanışta ve testlerde kullanışlı). """
+        _, pending = wait(list(self._futures), timeout=timeout)
+        return not pending
+
+    # -- İç işleyiş -----------------------------------------------------------------
+    def _submit(self, digest):
+        if _conf('MODE') == 'sync':
+            process_blob(digest)
+            return
+        future = self._ensure_executor().submit(self._run, digest)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+
+    def _ensure_executor(self):
+        with self._lock:
+            # fork edilen worker süreçlerinde thread'ler kopyalanmaz, yeniden başlat
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._futures = set()
+                self._executor = ThreadPoolExecutor(max_workers=_conf('WORKERS'), thread_name_prefix='attachment-preview')
+            return self._executor
+
+    @staticmethod
+    def _run(digest):
+        try:
+            close_old_connections()
+            process_blob(digest)
+        except Exception:
+            logger.exception('Ek önizlemesi üretilemedi (blob=%s)', digest)
+        finally:
+            close_old_connections()
+
+
+pool = PreviewPool()
+
+# Süreç kapanırken bekleyen işleri bitirmeye çalış
+atexit.register(pool.flush)
@@ -0,0 +1,129 @@
+# operations/rollups.py
+"""
+TaskRollup sayaçlarının bakımı.
+
+Her görev, durumuna göre bir veya iki kovaya (bucket) sayılır. Bir görev
+kaydedildiğinde eski ve yeni kova kümeleri karşılaştırılır ve yalnızca farklar
+`count = count +/- 1` şeklinde atomik UPDATE ile uygulanır.
+
+Not: QuerySet.update() ve bulk_create() sinyal tetiklemez. Bu yollarla yapılan
+toplu değişikliklerden sonra `manage.py compact_task_rollups --rebuild` çalıştırılmalı
+veya değişiklik apply_task_change ile elle bildirilmelidir.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# Sinyallerin karşılaştırma için okuduğu alanlar
+TRACKED_FIELDS = ('status', 'department_id', 'assignee_id', 'created_at', 'completed_at')
+
+
+def task_state(task):
+    """ Bir Task örneğinin rollup açısından önemli alanlarını döndürür. """
+    return {field: getattr(task, field) for field in TRACKED_FIELDS}
+
+
+def _buckets(state):
+    from .models import Task, TaskRollup
+
+    if not state:
+        return []
+    keys = [(
+        TaskRollup.Kind.CREATED, timezone.localdate(state['created_at']),
+        state['department_id'], state['status'], state['assignee_id'],
+    )]
+    if state['status'] == Task.Status.COMPLETED and state['completed_at']:
+        keys.append((
+            TaskRollup.Kind.COMPLETED, timezone.localdate(state['completed_at']),
+            state['department_id'], state['status'], state['assignee_id'],
+        ))
+    return keys
+
+
+def _bump(key, delta):
+    from .models import TaskRollup
+
+    kind, day, department_id, status, assignee_id = key
+    lookup = dict(kind=kind, day=day, department_id=department_id, status=status, assignee_id=assignee_id)
+    # Önce var olan satırı artır; yoksa oluştur. Eşzamanlı iki oluşturma aynı anahtarda
+    # iki satır bırakabilir, okumalar SUM ile yapıldığından bu sonucu değiştirmez.
+    updated = TaskRollup.objects.filter(**lookup).update(count=F('count') + delta)
+    if not updated:
+        TaskRollup.objects.create(count=delta, **lookup)
+
+
+def apply_task_change(old_state, new_state):
+    """
+    Eski ve yeni durum arasındaki farkı sayaçlara yansıtır.
+    old_state=None -> yeni görev, new_state=None -> silinen görev.
+    """
+    apply_task_changes([(old_state, new_state)])
+
+
+def apply_task_changes(changes):
+    """
+    Birden çok görevin (eski, yeni) durum çiftini tek seferde uygular.
+    Farklar önce toplanır; sorgu sayısı görev sayısıyla değil, değişen kova sayısıyla büyür.
+    """
+    delta = Counter()
+    for old_state, new_state in changes:
+        delta.update(_buckets(new_state))
+        delta.subtract(_buckets(old_state))
+    for key, change in delta.items():
+        if change:
+            _bump(key, change)
+
+
+def rebuild_task_rollups(task_model=None, rollup_model=None):
+    """
+    Tüm sayaçları Task tablosundan baştan hesaplar (tek GROUP BY sorgusu / tür).
+    Migration'lar tarihsel modelleri parametre olarak geçebilir.
+    """
+    if task_model is None or rollup_model is None:
+        from .models import Task as task_model, TaskRollup as rollup_model
+
+    def grouped(queryset, date_field, kind):
+        rows = queryset.annotate(day=TruncDate(date_field))\
+                       .values('day', 'department_id', 'status', 'assignee_id')\
+                       .annotate(total=Count('id'))\
+                       .order_by()
+        return (
+            rollup_model(kind=kind, day=row['day'], department_id=row['department_id'],
+                         status=row['status'], assignee_id=row['assignee_id'], count=row['total'])
+            for row in rows.iterator(chunk_size=2000)
+        )
+
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        rollup_model.objects.bulk_create(
+            grouped(task_model.objects.all(), 'created_at', 'CREATED'), batch_size=2000
+        )
+        rollup_model.objects.bulk_create(
+            grouped(task_model.objects.filter(status='COMPLETED', completed_at__isnull=False),
+                    'completed_at', 'COMPLETED'),
+            batch_size=2000,
+        )
+
+
+def compact_task_rollups():
+    """ Aynı anahtara sahip satırları birleştirir ve sıfırlanan kovaları siler. """
+    from .models import TaskRollup
+
+    key_fields = ('kind', 'day', 'department_id', 'status', 'assignee_id')
+    merged = 0
+    with transaction.atomic():
+        duplicates = TaskRollup.objects.values(*key_fields)\
+                                       .annotate(rows=Count('id'), total=Sum('count'))\
+                                       .filter(rows__gt=1)\
+                                       .order_by()
+        for row in list(duplicates):
+            lookup = {field: row[field] for field in key_fields}
+            TaskRollup.objects.filter(**lookup).delete()
+            TaskRollup.objects.create(count=row['total'], **lookup)
+            merged += row['rows'] - 1
+        removed, _ = TaskRollup.objects.filter(count=0).delete()
+    return merged, removed
+
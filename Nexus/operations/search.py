@@ -0,0 +1,203 @@
+# operations/search.py
+"""
+Görevler ve yorumları üzerinde tam metin arama.
+
+İndeks veritabanına göre seçilir (tablo 0011_task_search migration'ında oluşturulur):
+- PostgreSQL: `operations_tasksearch(task_id, document tsvector)` + GIN indeksi.
+  Başlık A, açıklama B, yorumlar C ağırlığıyla; sıralama `ts_rank`.
+- SQLite:     FTS5 sanal tablosu (title, description, comments), rowid = görev id'si.
+  Sıralama `bm25` (yerel geliştirme ve testler için).
+Diğer veritabanlarında indeks tutulmaz; arama başlıkta basit `icontains`'e düşer.
+
+Türkçe normalleştirme hem indekslenen metne hem sorguya aynı şekilde uygulanır:
+'İ'/'I' Türkçe kurala göre küçültülür ve aksanlar katlanır ("İŞ GÜVENLİĞİ" -> "is guvenligi");
+klavyesinde Türkçe karakter olmayan kullanıcı da bulur. Ekler için her terim önek olarak
+aranır ("gorev" -> "görevler", "görevin"); iki veritabanında da aynı sonuç çıkar.
+
+İndeks sinyallerle, değişiklikle aynı işlem içinde güncellenir (bkz. operations/signals.py):
+görev başlığı/açıklaması değişince o görevin satırı yeniden yazılır, yeni yorum satıra
+eklenir. Mevcut veriler için: `manage.py rebuild_search_index`.
+
+Ayarlar: settings.TASK_SEARCH = {'PG_CONFIG': ..., 'MAX_TERMS': ...}
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Task, TaskComment
+
+_DEFAULTS = {
+    'PG_CONFIG': 'simple',   # Metin zaten normalleştirildiği için kök bulma yapılmaz
+    'MAX_TERMS': 8,          # Sorgudaki en fazla terim
+}
+TABLE = 'operations_tasksearch'
+TERM_RE = re.compile(r'\w+')
+
+# Türkçe'de 'I' -> 'ı', 'İ' -> 'i'; sonrasında aksanlar katlanır
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_FOLD = str.maketrans({'ı': 'i'})
+
+
+def _conf(name):
+    return getattr(settings, 'TASK_SEARCH', {}).get(name, _DEFAULTS[name])
+
+
+def normalize(text):
+    text = (text or '').translate(_TURKISH_UPPER).lower().translate(_FOLD)
+    return ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+
+
+def query_terms(query):
+    return TERM_RE.findall(normalize(query))[:_conf('MAX_TERMS')]
+
+
+# -- Veritabanına özel indeksler -------------------------------------------------------
+class _PostgresIndex:
+    DOCUMENT = (
+        "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+        "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+        "setweight(to_tsvector(%s::regconfig, %s), 'C')"
+    )
+
+    def write(self, cursor, rows):
+        config = _conf('PG_CONFIG')
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (task_id, document) VALUES (%s, {self.DOCUMENT}) '
+            f'ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document',
+            [(task_id, config, title, config, description, config, comments)
+             for task_id, title, description, comments in rows],
+        )
+
+    def append_comment(self, cursor, task_id, text):
+        cursor.execute(
+            f"UPDATE {TABLE} SET document = document || setweight(to_tsvector(%s::regconfig, %s), 'C') "
+            f'WHERE task_id = %s',
+            [_conf('PG_CONFIG'), text, task_id],
+        )
+        return cursor.rowcount
+
+    def delete(self, cursor, task_ids):
+        cursor.execute(f'DELETE FROM {TABLE} WHERE task_id = ANY(%s)', [list(task_ids)])
+
+    def match(self, terms):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        params = [_conf('PG_CONFIG'), tsquery]
+        return (
+            RawSQL(f'SELECT task_id FROM {TABLE} WHERE document @@ to_tsquery(%s::regconfig, %s)', params),
+            RawSQL(
+                f'SELECT ts_rank(document, to_tsquery(%s::regconfig, %s)) FROM {TABLE} '
+                f'WHERE task_id = {Task._meta.db_table}.id', params,
+            ),
+        )
+
+
+class _SqliteIndex:
+    # bm25 sütun ağırlıkları: başlık, açıklama, yorumlar
+    WEIGHTS = '10.0, 4.0, 1.0'
+
+    def write(self, cursor, rows):
+        self.delete(cursor, [row[0] for row in rows])
+        cursor.executemany(f'INSERT INTO {TABLE} (rowid, title, description, comments) VALUES (%s, %s, %s, %s)', rows)
+
+    def append_comment(self, cursor, task_id, text):
+        cursor.execute(f"UPDATE {TABLE} SET comments = comments || ' ' || %s WHERE rowid = %s", [text, task_id])
+        return cursor.rowcount
+
+    def delete(self, cursor, task_ids):
+        task_ids = list(task_ids)
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid IN ({", ".join(["%s"] * len(task_ids))})', task_ids)
+
+    def match(self, terms):
+        # Terimler \w+ olduğundan tırnak içinde güvenli; yan yana terimler VE ile bağlanır
+        params = [' '.join(f'"{term}"*' for term in terms)]
+        return (
+            RawSQL(f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s', params),
+            RawSQL(
+                f'SELECT -bm25({TABLE}, {self.WEIGHTS}) FROM {TABLE} '
+                f'WHERE {TABLE} MATCH %s AND rowid = {Task._meta.db_table}.id', params,
+            ),
+        )
+
+
+_INDEXES = {'postgresql': _PostgresIndex(), 'sqlite': _SqliteIndex()}
+
+
+def _index():
+    return _INDEXES.get(connection.vendor)
+
+
+# -- İndeksin güncellenmesi ---------------------------------------------------------
+def reindex_tasks(task_ids):
+    """ Görevlerin satırlarını yeniden yazar; artık olmayan görevleri siler. """
+    index, task_ids = _index(), set(task_ids)
+    if index is None or not task_ids:
+        return
+    comments = defaultdict(list)
+    for task_id, content in TaskComment.objects.filter(task_id__in=task_ids)\
+                                               .order_by('id').values_list('task_id', 'content'):
+        comments[task_id].append(content)
+    rows = [
+        (task_id, normalize(title), normalize(description), normalize(' '.join(comments[task_id])))
+        for task_id, title, description in Task.objects.filter(pk__in=task_ids)
+                                                       .values_list('id', 'title', 'description')
+    ]
+    with connection.cursor() as cursor:
+        missing = task_ids - {row[0] for row in rows}
+        if missing:
+            index.delete(cursor, missing)
+        if rows:
+            index.write(cursor, rows)
+
+
+def index_comment(task_id, content):
+    """ Yeni yorumu görevin satırına ekler (tek sorgu); satır yoksa görevi baştan indeksler. """
+    index = _index()
+    if index is None:
+        return
+    with connection.cursor() as cursor:
+        updated = index.append_comment(cursor, task_id, normalize(content))
+    if not updated:
+        reindex_tasks([task_id])
+
+
+def remove_tasks(task_ids):
+    index = _index()
+    if index is not None and task_ids:
+        with connection.cursor() as cursor:
+            index.delete(cursor, task_ids)
+
+
+def rebuild_index(batch_size=500):
+    """ Tüm görevleri yeniden indeksler; indekslenen görev sayısını döndürür. """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+    ids = list(Task.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), batch_size):
+        reindex_tasks(ids[start:start + batch_size])
+    return len(ids)
+
+
+# -- Arama --------------------------------------------------------------------------
+def search_tasks(queryset, query):
+    """
+    `queryset`'i (örn. visible_tasks) sorguyla eşleşenlere daraltır, `search_rank` ekler ve
+    en alakalıdan başlayarak sıralar. Sorguda kelime yoksa None döner.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return None
+    index = _index()
+    if index is None:
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term)
+        return queryset.filter(condition).order_by('-created_at', '-id')
+    matches, rank = index.match(terms)
+    return queryset.filter(id__in=matches)\
+                   .annotate(search_rank=rank)\
+                   .order_by('-search_rank', '-created_at', '-id')
@@ -1,14 +1,104 @@
 # operations/serializers.py
 from rest_framework import serializers
-from .models import Task, Department, TaskComment, TaskAttachment
+import os
+from django.urls import reverse
+from django.utils.text import get_valid_filename
+from .models import Task, Department, TaskComment, TaskAttachment, TaskActivity, AttachmentUpload
+from .activity import decode_changes
+from .uploads import received_chunks
+from users.models import User
 from users.serializers import UserSerializer # Kullanıcı bilgilerini göstermek için
+from nexus_backend.sparse_fields import SparseFieldsetMixin
 
 class DepartmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Department
         fields = '__all__'
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskCommentSerializer(serializers.ModelSerializer):
+    author = UserSerializer(read_only=True)
+    class Meta:
+        model = TaskComment
+        fields = ['id', 'author', 'content', 'created_at']
+
+class AttachmentFileField(serializers.FileField):
+    """ Yüklemede normal FileField; okumada yetki kontrollü indirme adresini döner. """
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = reverse('task-attachment-download', kwargs={'pk': value.instance.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class TaskAttachmentSerializer(serializers.ModelSerializer):
+    """
+    Boyut, tip ve görsel ölçüleri blob'da saklıdır (bkz. operations/previews.py);
+    listelerde orijinal dosya açılmaz. `thumbnails`: uzun kenar -> küçük resim adresi.
+    Queryset blob'u select_related ile getirmelidir.
+    """
+    uploader = UserSerializer(read_only=True)
+    file = AttachmentFileField()
+    size = serializers.IntegerField(source='blob.size', read_only=True)
+    content_type = serializers.CharField(source='blob.content_type', read_only=True)
+    width = serializers.IntegerField(source='blob.width', read_only=True)
+    height = serializers.IntegerField(source='blob.height', read_only=True)
+    thumbnails = serializers.SerializerMethodField()
+    class Meta:
+        model = TaskAttachment
+        fields = ['id', 'uploader', 'file', 'filename', 'description', 'uploaded_at',
+                  'size', 'content_type', 'width', 'height', 'thumbnails']
+        read_only_fields = ['filename']
+
+    def get_thumbnails(self, attachment):
+        if attachment.blob is None:
+            return {}
+        request = self.context.get('request')
+        thumbnails = {}
+        for size in attachment.blob.thumbnails:
+            url = reverse('task-attachment-thumbnail', kwargs={'pk': attachment.pk, 'size': int(size)})
+            thumbnails[size] = request.build_absolute_uri(url) if request else url
+        return thumbnails
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    """ Parçalı yükleme oturumu (bkz. operations/uploads.py). """
+    task = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all())
+    chunk_count = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+    # İçerik zaten saklanıyorsa parça gönderilmeden ek oluşturulur (bkz. operations/blobs.py)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', write_only=True, required=False)
+
+    class Meta:
+        model = AttachmentUpload
+        fields = ['id', 'task', 'filename', 'description', 'size', 'sha256', 'chunk_size', 'chunk_count',
+                  'received_chunks', 'created_at']
+        read_only_fields = ['chunk_size', 'created_at']
+
+    def get_received_chunks(self, upload):
+        return received_chunks(upload)
+
+    def validate_filename(self, value):
+        name = get_valid_filename(os.path.basename(value.replace('\\', '/')))
+        if not name:
+            raise serializers.ValidationError('Geçersiz dosya adı.')
+        return name
+
+class SyncTaskCommentSerializer(TaskCommentSerializer):
+    """ Senkronizasyonda yorumlar görevden bağımsız gelir; ait olduğu görev de döner. """
+    class Meta(TaskCommentSerializer.Meta):
+        fields = TaskCommentSerializer.Meta.fields + ['task']
+        read_only_fields = ['task']
+
+class SyncTaskAttachmentSerializer(TaskAttachmentSerializer):
+    class Meta(TaskAttachmentSerializer.Meta):
+        fields = TaskAttachmentSerializer.Meta.fields + ['task']
+        read_only_fields = ['task']
+
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Görev detay serileştiricisi (retrieve/create/update).
+    Yorumlar ve ekler iç içe döner; sorgu sayısının sabit kalması için
+    queryset'in TaskViewSet.get_queryset içindeki Prefetch'lerle gelmesi gerekir.
+    """
     # İlişkili modellerin sadece ID'si yerine detaylarını göstermek için
     # read_only=True -> Bu alanlar sadece okunabilir, görev oluştururken gönderilmez
     creator = UserSerializer(read_only=True)
@@ -16,8 +106,8 @@ class TaskSerializer(serializers.ModelSerializer):
     department = DepartmentSerializer(read_only=True)
 
     comments = TaskCommentSerializer(many=True, read_only=True)
-    attachments = TaskAttachmentSerializer(many=True, read_only=True)    
-    
+    attachments = TaskAttachmentSerializer(many=True, read_only=True)
+
     # Görev oluştururken/güncellerken ID gönderebilmek için
     assignee_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     department_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
@@ -26,42 +116,127 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'id', 'title', 'description', 'status', 'priority', 'due_date',
-            'creator', 'assignee', 'department', 'created_at', 'updated_at',
-            'assignee_id', 'department_id', 'comments', 'attachments'
+            'creator', 'assignee', 'department', 'created_at', 'updated_at', 'completed_at',
+            'version', 'assignee_id', 'department_id', 'comments', 'attachments'
         ]
-        read_only_fields = ['id', 'creator', 'created_at', 'updated_at']
+        # version: WebSocket delta'larının (bkz. operations/deltas.py) hangi sürümden devam edeceği
+        read_only_fields = ['id', 'creator', 'created_at', 'updated_at', 'completed_at', 'version']
 
     # Görevi oluşturan kişiyi otomatik olarak isteği yapan kullanıcı olarak ayarla
     def create(self, validated_data):
         validated_data['creator'] = self.context['request'].user
         return super().create(validated_data)
 
-class TaskCommentSerializer(serializers.ModelSerializer):
-    author = UserSerializer(read_only=True)
-    class Meta:
-        model = TaskComment
-        fields = ['id', 'author', 'content', 'created_at']
+    def validate_status(self, value):
+        # Durum sadece geçiş kurallarıyla değişir (bkz. operations/transitions.py)
+        if self.instance is not None and value != self.instance.status:
+            raise serializers.ValidationError('Durum değiştirmek için change-status endpoint\'ini kullanın.')
+        return value
 
-class TaskAttachmentSerializer(serializers.ModelSerializer):
-    uploader = UserSerializer(read_only=True)
-    class Meta:
-        model = TaskAttachment
-        fields = ['id', 'uploader', 'file', 'description', 'uploaded_at']
+    def validate(self, attrs):
+        # Yeni görev NEW, sorumlusu verilmişse ASSIGNED başlar; diğer durumlara sadece
+        # geçişlerle varılır (completed_at ve task_transitioned bu yoldan gelir)
+        if self.instance is None:
+            status = attrs.get('status', Task.Status.NEW)
+            if status not in (Task.Status.NEW, Task.Status.ASSIGNED):
+                raise serializers.ValidationError({'status': 'Yeni görev sadece NEW veya ASSIGNED durumunda oluşturulabilir.'})
+            if status == Task.Status.ASSIGNED and attrs.get('assignee_id') is None:
+                raise serializers.ValidationError({'status': 'Görevin bir sorumlusu olmalı.'})
+        return attrs
 
-class PermissionSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Permission
-        fields = ['name']
+class TaskListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Görev listesi için hafif serileştirici.
+    Yorum/ek listeleri yerine sayılarını ve son aktivite zamanını döndürür.
+    Bu alanlar TaskViewSet.get_queryset içinde annotate edilir.
+    """
+    creator = UserSerializer(read_only=True)
+    assignee = UserSerializer(read_only=True)
+    department = DepartmentSerializer(read_only=True)
+
+    comment_count = serializers.IntegerField(read_only=True)
+    attachment_count = serializers.IntegerField(read_only=True)
+    last_activity_at = serializers.SerializerMethodField()
 
-class RoleSerializer(serializers.ModelSerializer):
-    permissions = PermissionSerializer(many=True, read_only=True)
     class Meta:
-        model = Role
-        fields = ['name', 'permissions']
+        model = Task
+        fields = [
+            'id', 'title', 'status', 'priority', 'due_date',
+            'creator', 'assignee', 'department', 'created_at', 'updated_at',
+            'comment_count', 'attachment_count', 'last_activity_at'
+        ]
+        read_only_fields = fields
+
+    def get_last_activity_at(self, obj):
+        # Görevin kendisi, son yorum ve son ek arasından en yenisi
+        candidates = [
+            obj.updated_at,
+            getattr(obj, 'last_comment_at', None),
+            getattr(obj, 'last_attachment_at', None),
+        ]
+        latest = max((value for value in candidates if value is not None), default=None)
+        return serializers.DateTimeField().to_representation(latest) if latest else None
+
+class TaskActivitySerializer(serializers.ModelSerializer):
+    """
+    Zaman çizelgesi satırı. Sıkıştırılmış farklar açılır:
+        "changes": {"status": {"from": "NEW", "to": "ASSIGNED"}, "assignee": {"from": null, "to": 5}}
+    Değeri saklanmayan alanlarda (açıklama) from/to boştur.
+    """
+    actor = UserSerializer(read_only=True)
+    kind = serializers.SerializerMethodField()
+    changes = serializers.SerializerMethodField()
 
-class UserSerializer(serializers.ModelSerializer):
-    roles = RoleSerializer(many=True, read_only=True)
     class Meta:
-        # ...
-        fields = ['id', 'email', 'first_name', 'last_name', 'roles']
+        model = TaskActivity
+        fields = ['id', 'timestamp', 'kind', 'actor', 'changes']
+        read_only_fields = fields
+
+    def get_kind(self, obj):
+        return TaskActivity.Kind(obj.kind).name.lower()
+
+    def get_changes(self, obj):
+        return {
+            field.removesuffix('_id'): {'from': old, 'to': new}
+            for field, (old, new) in decode_changes(obj).items()
+        }
+
+class TaskBulkUpdateSerializer(serializers.Serializer):
+    """
+    Toplu güncelleme isteği:
+        {"ids": [1, 2, 3], "changes": {"status": "COMPLETED", "assignee_id": 5, "priority": "HIGH"}}
+    """
+    MAX_TASKS = 500
+    CHANGE_FIELDS = ['status', 'priority', 'due_date', 'assignee', 'department']
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_TASKS
+    )
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, required=False)
+    due_date = serializers.DateTimeField(required=False, allow_null=True)
+    assignee = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(is_active=True), required=False, allow_null=True
+    )
+    department = serializers.PrimaryKeyRelatedField(
+        queryset=Department.objects.all(), required=False, allow_null=True
+    )
+
+    def to_internal_value(self, data):
+        # Alan değişiklikleri "changes" altında gelir; *_id adları da kabul edilir
+        changes = data.get('changes') if hasattr(data, 'get') else None
+        if not isinstance(changes, dict):
+            raise serializers.ValidationError({'changes': 'Değiştirilecek alanlar bir nesne olarak gönderilmeli.'})
+        flat = {'ids': data.get('ids')}
+        for name, value in changes.items():
+            flat[name.removesuffix('_id')] = value
+        unknown = set(flat) - {'ids', *self.CHANGE_FIELDS}
+        if unknown:
+            raise serializers.ValidationError({'changes': f'Toplu olarak değiştirilemeyen alanlar: {", ".join(sorted(unknown))}'})
+        return super().to_internal_value(flat)
 
+    def validate(self, attrs):
+        changes = {name: attrs[name] for name in self.CHANGE_FIELDS if name in attrs}
+        if not changes:
+            raise serializers.ValidationError({'changes': 'En az bir alan değiştirilmeli.'})
+        return {'ids': attrs['ids'], 'changes': changes}
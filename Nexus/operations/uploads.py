@@ -0,0 +1,182 @@
+# operations/uploads.py
+"""
+Parça parça (chunked), kaldığı yerden devam ettirilebilen ek yüklemeleri.
+
+    POST   /operations/attachment-uploads/                       {task, filename, size, description, sha256?}
+    PUT    /operations/attachment-uploads/<id>/chunks/<n>/       ham gövde + X-Chunk-SHA256
+    GET    /operations/attachment-uploads/<id>/                  gelen parçalar (devam etmek için)
+    POST   /operations/attachment-uploads/<id>/complete/         {sha256?} -> TaskAttachment
+    DELETE /operations/attachment-uploads/<id>/
+
+- Parça gövdesi istekten küçük bloklar halinde okunup doğrudan diske yazılır; bellekte
+  tutulmaz. SHA-256 tutmayan parça yazılmaz (istemci aynı parçayı tekrar gönderir).
+- Parça önce geçici adla yazılır, doğrulanınca atomik olarak yeniden adlandırılır; yani
+  diskte görünen her parça eksiksizdir ve durum için ayrı bir veritabanı yazımı gerekmez.
+- Tamamlamada parçalar tek dosyada birleştirilir ve içerik adresli blob olarak saklanır
+  (bkz. operations/blobs.py; FileSystemStorage'da kopyalanmadan taşınır). İçerik zaten
+  varsa birleştirilen dosya atılır.
+- Oluştururken `sha256` verilir ve içerik kullanıcının görebildiği bir göreve zaten ekliyse
+  hiç parça gönderilmez (bkz. operations/blobs.attach_existing).
+- Yarım kalan yüklemeler `manage.py clean_attachment_uploads` ile silinir.
+
+Parça dizini tüm worker'lar tarafından paylaşılmalıdır (MEDIA_ROOT gibi).
+Ayarlar: settings.ATTACHMENT_UPLOADS = {'CHUNK_SIZE': ..., 'MAX_SIZE': ..., 'TEMP_DIR': ..., 'EXPIRE_HOURS': ...}
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .blobs import attach_file
+from .models import AttachmentUpload
+
+_DEFAULTS = {
+    'CHUNK_SIZE': 5 * 1024 * 1024,          # Parça boyutu (son parça hariç)
+    'MAX_SIZE': 1024 * 1024 * 1024,         # Tek ekin en büyük boyutu
+    'TEMP_DIR': None,                       # None: MEDIA_ROOT/attachment_uploads
+    'EXPIRE_HOURS': 24,                     # Yarım kalan yüklemelerin ömrü
+}
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+def _conf(name):
+    return getattr(settings, 'ATTACHMENT_UPLOADS', {}).get(name, _DEFAULTS[name])
+
+
+def _temp_root():
+    return _conf('TEMP_DIR') or os.path.join(settings.MEDIA_ROOT, 'attachment_uploads')
+
+
+def upload_dir(upload):
+    return os.path.join(_temp_root(), str(upload.id))
+
+
+def _chunk_path(upload, index):
+    return os.path.join(upload_dir(upload), f'{index:06d}.part')
+
+
+def received_chunks(upload):
+    """ Diske eksiksiz yazılmış parçaların sıra numaraları. """
+    try:
+        names = os.listdir(upload_dir(upload))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith('.part'))
+
+
+def start_upload(task, uploader, filename, size, description=''):
+    if size > _conf('MAX_SIZE'):
+        raise UploadError(f"Dosya en fazla {_conf('MAX_SIZE')} bayt olabilir.")
+    return AttachmentUpload.objects.create(
+        task=task, uploader=uploader, filename=filename, size=size,
+        description=description, chunk_size=_conf('CHUNK_SIZE'),
+    )
+
+
+def write_chunk(upload, index, stream, checksum):
+    """
+    `stream`'den parçayı okuyup diske yazar. `checksum`: parçanın SHA-256 hex özeti.
+    Aynı parça tekrar gönderilirse üzerine yazılır (istemci yeniden deneyebilir).
+    """
+    if not 0 <= index < upload.chunk_count:
+        raise UploadError('Geçersiz parça numarası.')
+    if not checksum:
+        raise UploadError('X-Chunk-SHA256 başlığı gerekli.')
+    expected = upload.chunk_length(index)
+
+    directory = upload_dir(upload)
+    os.makedirs(directory, exist_ok=True)
+    digest, length = hashlib.sha256(), 0
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as target:
+        try:
+            while stream is not None:
+                block = stream.read(min(BLOCK_SIZE, expected - length + 1))
+                if not block:
+                    break
+                length += len(block)
+                if length > expected:
+                    raise UploadError(f'Parça {expected} bayttan uzun.')
+                digest.update(block)
+                target.write(block)
+            if length != expected:
+                raise UploadError(f'Parça {expected} bayt olmalı, {length} bayt geldi.')
+            if digest.hexdigest() != checksum.strip().lower():
+                raise UploadError('Parça SHA-256 özeti tutmuyor.')
+        except BaseException:
+            target.close()
+            os.unlink(target.name)
+            raise
+    os.replace(target.name, _chunk_path(upload, index))
+
+
+class _AssembledFile(File):
+    # FileSystemStorage geçici dosya yolu olan içeriği kopyalamak yerine taşır
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def complete_upload(upload, checksum=None):
+    """ Parçaları birleştirir, TaskAttachment oluşturur ve yükleme kaydını siler. """
+    missing = sorted(set(range(upload.chunk_count)) - set(received_chunks(upload)))
+    if missing:
+        raise UploadError(f'Eksik parçalar: {missing[:20]}')
+
+    directory = upload_dir(upload)
+    digest = hashlib.sha256()
+    assembled = tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False)
+    try:
+        with assembled:
+            for index in range(upload.chunk_count):
+                with open(_chunk_path(upload, index), 'rb') as chunk:
+                    while block := chunk.read(BLOCK_SIZE):
+                        digest.update(block)
+                        assembled.write(block)
+        if checksum and digest.hexdigest() != checksum.strip().lower():
+            raise UploadError('Dosyanın SHA-256 özeti tutmuyor.')
+
+        with transaction.atomic():
+            with open(assembled.name, 'rb') as content:
+                attachment = attach_file(
+                    upload.task, upload.uploader, _AssembledFile(content), upload.filename,
+                    upload.description, digest=digest.hexdigest(),
+                )
+            upload.delete()
+    finally:
+        if os.path.exists(assembled.name):
+            os.unlink(assembled.name)
+    transaction.on_commit(lambda: shutil.rmtree(directory, ignore_errors=True))
+    return attachment
+
+
+def abort_upload(upload):
+    directory = upload_dir(upload)
+    upload.delete()
+    transaction.on_commit(lambda: shutil.rmtree(directory, ignore_errors=True))
+
+
+def clean_expired_uploads():
+    """ Süresi dolmuş yüklemeleri ve kaydı olmayan parça dizinlerini siler. """
+    expired = AttachmentUpload.objects.filter(
+        created_at__lt=timezone.now() - timedelta(hours=_conf('EXPIRE_HOURS'))
+    )
+    removed, _ = expired.delete()
+
+    root = _temp_root()
+    try:
+        names = set(os.listdir(root))
+    except FileNotFoundError:
+        return removed
+    active = {str(pk) for pk in AttachmentUpload.objects.values_list('id', flat=True)}
+    for name in names - active:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return removed
@@ -1,11 +1,13 @@
 # operations/urls.py
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet, DepartmentViewSet, DashboardSummaryView, TaskCommentCreateView, TaskAttachmentCreateView
+from .views import TaskViewSet, DepartmentViewSet, DashboardSummaryView, TaskCommentCreateView, TaskAttachmentCreateView, ReportingDataView
+from .views import AttachmentUploadViewSet, TaskAttachmentDownloadView, TaskAttachmentThumbnailView
 from django.urls import path, include
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='task')
 router.register(r'departments', DepartmentViewSet, basename='department')
+router.register(r'attachment-uploads', AttachmentUploadViewSet, basename='attachment-upload')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -13,5 +15,7 @@ urlpatterns = [
     # Yeni URL'ler
     path('tasks/<int:task_pk>/comments/', TaskCommentCreateView.as_view(), name='task-comment-create'),
     path('tasks/<int:task_pk>/attachments/', TaskAttachmentCreateView.as_view(), name='task-attachment-create'),
+    path('attachments/<int:pk>/download/', TaskAttachmentDownloadView.as_view(), name='task-attachment-download'),
+    path('attachments/<int:pk>/thumbnails/<int:size>/', TaskAttachmentThumbnailView.as_view(), name='task-attachment-thumbnail'),
     path('reporting/summary/', ReportingDataView.as_view(), name='reporting-summary'),    
 ]
@@ -1,29 +1,95 @@
 # operations/views.py
-from rest_framework import viewsets, status
+import hashlib
+import os
+from functools import partial
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from .models import Task, Department
-from .serializers import TaskSerializer, DepartmentSerializer
+from .models import Task, Department, TaskComment, TaskAttachment, TaskActivity, TaskRollup, ChangeLog, AttachmentUpload, OPEN_STATUSES
+from .serializers import TaskSerializer, TaskListSerializer, TaskBulkUpdateSerializer, DepartmentSerializer
+from .serializers import SyncTaskCommentSerializer, SyncTaskAttachmentSerializer, TaskActivitySerializer
+from .changelog import InvalidSyncToken, current_position, decode_token, encode_token, read_changes
+from communications.serializers import NotificationSerializer, target_prefetch
 from rest_framework import generics
-from .serializers import TaskCommentSerializer, TaskAttachmentSerializer
-from django.db.models import Count, Q, Avg
-from django.db.models.functions import TruncMonth
+from .serializers import TaskCommentSerializer, TaskAttachmentSerializer, AttachmentUploadSerializer
+from .uploads import UploadError, abort_upload, complete_upload, start_upload, write_chunk
+from .blobs import attach_existing, attach_file
+from django.shortcuts import get_object_or_404
+from nexus_backend.file_serving import serve_file
+from django.db.models import Count, F, Q, Avg, Max, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db import transaction
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from datetime import date, timedelta
 from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from .models import Task
 from django.contrib.auth import get_user_model
 from nexus_backend.permissions import HasPermission, IsTaskOwnerOrAdmin
+from nexus_backend.pagination import KeysetCursorPagination
+from nexus_backend.sparse_fields import get_requested_fields
+from .filters import TaskFilterBackend
+from .bulk import NOT_FOUND, UPDATED, bulk_update_tasks
+from .transitions import INVALID_TRANSITION, transition_error, transition_tasks
+from .search import search_tasks
+from .exports import export_tasks
+from nexus_backend.response_cache import cached_response
+from users.permission_cache import get_effective_permissions, user_has_permissions
+
+User = get_user_model()
+
+
+def _child_aggregate(model, aggregate):
+    """ Görev başına tek değer döndüren ilişkili (correlated) alt sorgu. """
+    return Subquery(
+        model.objects.filter(task=OuterRef('pk'))
+                     .order_by()
+                     .values('task')
+                     .annotate(value=aggregate)
+                     .values('value')[:1]
+    )
+
+def visible_tasks(user):
+    """ Kullanıcının görebileceği görevler (liste, dashboard ve diğer endpoint'ler için ortak kural). """
+    # Eğer kullanıcı 'tasks.view_all' yetkisine sahipse, tüm görevleri göster
+    # (yetki seti önbellekten okunur, ek sorgu atılmaz)
+    if user_has_permissions(user, ['tasks.view_all']):
+        return Task.objects.all()
+    # Aksi halde, sadece kendisine atanmış veya kendisinin oluşturduğu görevleri göster
+    return Task.objects.filter(Q(assignee=user) | Q(creator=user))
+
+def annotate_task_list(queryset, wanted=lambda *names: True):
+    """ TaskListSerializer alanları: yorum/ek satırlarını çekmek yerine sayıları tek sorguda hesapla. """
+    annotations = {}
+    if wanted('comment_count'):
+        annotations['comment_count'] = Coalesce(_child_aggregate(TaskComment, Count('id')), 0)
+    if wanted('attachment_count'):
+        annotations['attachment_count'] = Coalesce(_child_aggregate(TaskAttachment, Count('id')), 0)
+    if wanted('last_activity_at'):
+        annotations['last_comment_at'] = _child_aggregate(TaskComment, Max('created_at'))
+        annotations['last_attachment_at'] = _child_aggregate(TaskAttachment, Max('uploaded_at'))
+    return queryset.annotate(**annotations)
+
+# Arama sonuçları sayfa boyutu (?limit=)
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+
+def _etag(*parts):
+    return '"%s"' % hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
 
-user = get_user_model()
+class TaskActivityPagination(KeysetCursorPagination):
+    # TaskActivity.Meta.ordering ve taskactivity_task_idx ile aynı sırada
+    ordering = ('timestamp', 'id')
 
 class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all().select_related('creator', 'assignee', 'department')
     serializer_class = TaskSerializer
     # permission_classes = [IsAuthenticated] # Eski satırı değiştiriyoruz
+    # Task.Meta.ordering ile aynı sırada (created_at, id) keyset sayfalama
+    pagination_class = KeysetCursorPagination
+    filter_backends = [TaskFilterBackend]
 
     def get_permissions(self):
         """ Her action (list, create, retrieve vb.) için farklı yetki belirle. """
@@ -36,23 +102,128 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Diğer tüm durumlar için (list, retrieve) sadece giriş yapmış olması yeterli
         return [IsAuthenticated()]
 
+    def get_serializer_class(self):
+        """ Liste için hafif, diğer action'lar için detaylı serileştirici. """
+        if self.action in ('list', 'search'):
+            return TaskListSerializer
+        return TaskSerializer
+
     def get_queryset(self):
         """ Kullanıcıları sadece ilgili görevleri görecek şekilde filtrele. """
-        user = self.request.user
-        
-        # Eğer kullanıcı 'tasks.view_all' yetkisine sahipse, tüm görevleri göster
-        if user.roles.filter(permissions__name='tasks.view_all').exists():
-            return Task.objects.all().select_related('creator', 'assignee', 'department')
-        
-        # Aksi halde, sadece kendisine atanmış veya kendisinin oluşturduğu görevleri göster
-        return Task.objects.filter(Q(assignee=user) | Q(creator=user))\
-                           .select_related('creator', 'assignee', 'department')
+        queryset = visible_tasks(self.request.user)
+
+        # ?fields= verilmişse sadece istenen alanlar için JOIN/alt sorgu ekle
+        requested = get_requested_fields(self.request, self.get_serializer_class().Meta.fields)
+
+        def wanted(*names):
+            return requested is None or any(name in requested for name in names)
+
+        related = [name for name in ('creator', 'assignee', 'department') if wanted(name)]
+        if related:
+            queryset = queryset.select_related(*related)
+
+        if self.action in ('list', 'search'):
+            return annotate_task_list(queryset, wanted)
+
+        # Detay: yorumlar ve ekler, yazarlarıyla birlikte toplam 2 ek sorguda gelir
+        prefetches = []
+        if wanted('comments'):
+            prefetches.append(Prefetch('comments', queryset=TaskComment.objects.select_related('author')))
+        if wanted('attachments'):
+            prefetches.append(Prefetch('attachments', queryset=TaskAttachment.objects.select_related('uploader', 'blob')))
+        return queryset.prefetch_related(*prefetches)
+
+    # -- Koşullu istekler (ETag / Last-Modified, If-None-Match / If-Match) ----------
+    # Doğrulayıcılar tam serileştirme yapılmadan hesaplanır: detayda ucuz bir sorguyla,
+    # listede gövde için zaten okunan sayfa satırlarından.
+    # Task.version her yorum/ek/durum/alan değişikliğinde artar (bkz. operations/deltas.py).
+
+    def _detail_validators(self, pk, lock=False):
+        """ (etag, last_modified) veya görev yoksa/görünmüyorsa (None, None). """
+        queryset = visible_tasks(self.request.user).filter(pk=pk)
+        if lock:
+            queryset = queryset.select_for_update()
+        try:
+            row = queryset.annotate(
+                comment_count=Coalesce(_child_aggregate(TaskComment, Count('id')), 0),
+                attachment_count=Coalesce(_child_aggregate(TaskAttachment, Count('id')), 0),
+                last_comment_at=_child_aggregate(TaskComment, Max('created_at')),
+                last_attachment_at=_child_aggregate(TaskAttachment, Max('uploaded_at')),
+            ).values(
+                'pk', 'version', 'updated_at', 'comment_count', 'attachment_count',
+                'last_comment_at', 'last_attachment_at',
+            ).order_by().first()
+        except (TypeError, ValueError):
+            return None, None
+        if row is None:
+            return None, None
+        etag = _etag(row['pk'], row['version'], row['updated_at'].isoformat(),
+                     row['comment_count'], row['attachment_count'])
+        last_modified = max(
+            value for value in (row['updated_at'], row['last_comment_at'], row['last_attachment_at'])
+            if value is not None
+        )
+        return etag, int(last_modified.timestamp())
+
+    @staticmethod
+    def _with_validators(response, etag, last_modified=None):
+        if etag is not None:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # İstemci önbellekte tutabilir ama her seferinde doğrulamalı
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def _conditional_write(self, request, pk, write):
+        """
+        If-Match / If-Unmodified-Since başlıkları varsa, görev okunduktan sonra değiştiyse
+        412 döner (kaybolan güncelleme). Kontrol ve yazma aynı işlem içinde, satır kilitliyken yapılır.
+        """
+        with transaction.atomic():
+            if 'HTTP_IF_MATCH' in request.META or 'HTTP_IF_UNMODIFIED_SINCE' in request.META:
+                etag, last_modified = self._detail_validators(pk, lock=True)
+                if etag is not None and get_conditional_response(
+                        request, etag=etag, last_modified=last_modified) is not None:
+                    return self._with_validators(Response(
+                        {'detail': 'Görev siz okuduktan sonra değiştirildi. Lütfen yeniden yükleyin.'},
+                        status=status.HTTP_412_PRECONDITION_FAILED,
+                    ), etag, last_modified)
+            response = write()
+        if status.is_success(response.status_code):
+            response = self._with_validators(response, *self._detail_validators(pk))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        # Sayfa tek sorguyla okunur; ETag gövde için okunan satırların (id, version, updated_at)
+        # değerlerinden hesaplanır. Değişmemişse sadece serileştirme atlanır.
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        etag = _etag(request.META.get('QUERY_STRING', ''), *((task.pk, task.version, task.updated_at) for task in page))
+        if get_conditional_response(request, etag=etag) is not None:
+            return self._with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        return self._with_validators(self.get_paginated_response(self.get_serializer(page, many=True).data), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self._detail_validators(kwargs['pk'])
+        if etag is not None:
+            if get_conditional_response(request, etag=etag, last_modified=last_modified) is not None:
+                return self._with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+        return self._with_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def update(self, request, *args, **kwargs):
+        # PATCH de (partial_update) buradan geçer
+        return self._conditional_write(request, kwargs['pk'], partial(super().update, request, *args, **kwargs))
 
     # Yeni eklenen özel action
     @action(detail=True, methods=['post'], url_path='change-status')
     def change_status(self, request, pk=None):
-        """Bir görevin durumunu değiştirmek için özel endpoint."""
-        task = self.get_object()
+        """
+        Bir görevin durumunu değiştirmek için özel endpoint.
+        Geçiş kuralları operations/transitions.py'dedir; geçersiz geçiş 409 döner.
+        """
+        return self._conditional_write(request, pk, partial(self._change_status, request, pk))
+
+    def _change_status(self, request, pk):
         new_status = request.data.get('status')
 
         # Gönderilen status'un geçerli bir seçenek olup olmadığını kontrol et
@@ -62,12 +233,90 @@ class TaskViewSet(viewsets.ModelViewSet):
                 {'error': 'Geçersiz bir durum (status) değeri gönderildi.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        try:
+            task_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound
 
-        task.status = new_status
-        task.save()
-        serializer = self.get_serializer(task)
+        # Kilit yok: UPDATE ... WHERE status = <kaynak>; eşzamanlı geçişlerden biri kazanır
+        result = transition_tasks(request.user, [task_id], new_status)[task_id]
+        if result == NOT_FOUND:
+            raise NotFound
+        if result == INVALID_TRANSITION:
+            current = Task.objects.filter(pk=task_id).values_list('status', 'assignee_id').first()
+            if current is None:
+                raise NotFound
+            return Response(
+                {'error': transition_error(current[0], new_status, {'assignee_id': current[1]})
+                          or 'Görevin durumu bu sırada değişti. Lütfen yeniden yükleyin.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Görevin değişiklik geçmişi, eskiden yeniye (bkz. operations/activity.py).
+        Satırlar (task, timestamp, id) indeksinden cursor ile sayfalanarak okunur.
+        """
+        try:
+            task_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound
+        if not visible_tasks(request.user).filter(pk=task_id).exists():
+            raise NotFound
+        paginator = TaskActivityPagination()
+        page = paginator.paginate_queryset(
+            TaskActivity.objects.filter(task_id=task_id).select_related('actor'), request, view=self,
+        )
+        return paginator.get_paginated_response(TaskActivitySerializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Başlık, açıklama ve yorumlarda tam metin arama (bkz. operations/search.py).
+        ?q=<sorgu>&limit=20&offset=0 — liste filtreleri (?status=, ?assignee= ...) de geçerlidir.
+        Sonuçlar alaka sırasıyla döner; görünürlük kuralları listeyle aynıdır.
+        """
+        queryset = search_tasks(self.filter_queryset(self.get_queryset()), request.query_params.get('q', ''))
+        if queryset is None:
+            return Response({'q': 'Aranacak en az bir kelime girin.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', SEARCH_PAGE_SIZE)), 1), SEARCH_MAX_PAGE_SIZE)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({'error': 'limit ve offset sayı olmalı.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Bir fazlası okunur: COUNT sorgusu olmadan devamı olup olmadığı anlaşılır
+        page = list(queryset[offset:offset + limit + 1])
+        return Response({
+            'results': self.get_serializer(page[:limit], many=True).data,
+            'next_offset': offset + limit if len(page) > limit else None,
+        })
+
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<file_format>csv|ndjson|xlsx)')
+    def export(self, request, file_format):
+        """
+        Filtrelenmiş görev listesini akışla dışa aktarır (bkz. operations/exports.py).
+        /api/operations/tasks/export/csv/?status=NEW — liste filtreleri ve görünürlük kuralları geçerlidir.
+        """
+        return export_tasks(request, self.filter_queryset(visible_tasks(request.user)), file_format)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_update(self, request):
+        """
+        Çok sayıda göreve aynı değişikliği uygular (bkz. operations/bulk.py).
+        Yetki her görev için ayrı ayrı raporlanır; yetkisiz görevler isteği düşürmez.
+        """
+        serializer = TaskBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_update_tasks(request.user, **serializer.validated_data)
+        return Response({
+            'updated': sum(1 for item in results if item['result'] == UPDATED),
+            'results': results,
+        })
+
     # Yetkilendirme: Kullanıcılar sadece kendi departmanlarındaki görevleri görsün gibi
     # kuralları buraya ekleyeceğiz. Şimdilik herkes her şeyi görüyor.
     # def get_queryset(self):
@@ -85,7 +334,7 @@ class TaskCommentCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        task = Task.objects.get(pk=self.kwargs['task_pk'])
+        task = get_object_or_404(visible_tasks(self.request.user), pk=self.kwargs['task_pk'])
         serializer.save(author=self.request.user, task=task)
 
 class TaskAttachmentCreateView(generics.CreateAPIView):
@@ -94,46 +343,300 @@ class TaskAttachmentCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        task = Task.objects.get(pk=self.kwargs['task_pk'])
-        serializer.save(uploader=self.request.user, task=task)
+        # Görünmeyen veya olmayan görev 404; yükleme yolu (AttachmentUploadViewSet) ile aynı kural
+        task = get_object_or_404(visible_tasks(self.request.user), pk=self.kwargs['task_pk'])
+        upload = serializer.validated_data['file']
+        # İçerik adresli saklama: aynı dosya ikinci kez yazılmaz (bkz. operations/blobs.py)
+        serializer.instance = attach_file(
+            task, self.request.user, upload, os.path.basename(upload.name),
+            serializer.validated_data.get('description', ''),
+        )
+
+# Küçük resimlerin istemci önbelleğindeki ömrü (sn)
+THUMBNAIL_MAX_AGE = 30 * 24 * 60 * 60
+
+class AttachmentUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                              mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Büyük ekler için parçalı, kaldığı yerden devam ettirilebilen yükleme
+    (bkz. operations/uploads.py). Her kullanıcı sadece kendi yüklemelerini görür.
+    """
+    serializer_class = AttachmentUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return AttachmentUpload.objects.filter(uploader=self.request.user).select_related('task')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        digest = data.pop('sha256', None)
+        if not visible_tasks(request.user).filter(pk=data['task'].pk).exists():
+            raise NotFound('Görev bulunamadı.')
+
+        if digest:
+            # İçerik kullanıcının görebildiği bir görevde zaten varsa parça beklemeden ek oluşur;
+            # yoksa normal yükleme başlar ve özet tamamlamada doğrulanır
+            attachment = attach_existing(
+                data['task'], request.user, digest, data['filename'], visible_tasks(request.user),
+                data.get('description', ''),
+            )
+            if attachment is not None:
+                return Response(
+                    {'attachment': TaskAttachmentSerializer(attachment, context=self.get_serializer_context()).data},
+                    status=status.HTTP_201_CREATED,
+                )
+        try:
+            serializer.instance = start_upload(uploader=request.user, **data)
+        except UploadError as exc:
+            raise ValidationError({'size': str(exc)})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        abort_upload(instance)
+
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<index>\d+)')
+    def chunk(self, request, pk=None, index=None):
+        """ Ham gövde tek parçadır; `X-Chunk-SHA256` başlığı parçanın SHA-256 özetidir. """
+        upload = self.get_object()
+        try:
+            write_chunk(upload, int(index), request.stream, request.headers.get('X-Chunk-SHA256'))
+        except UploadError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """ Parçaları birleştirip eki oluşturur. İsteğe bağlı `sha256` tüm dosyanın özetidir. """
+        upload = self.get_object()
+        try:
+            attachment = complete_upload(upload, request.data.get('sha256'))
+        except UploadError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            TaskAttachmentSerializer(attachment, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+class TaskAttachmentDownloadView(APIView):
+    """
+    Yetki kontrollü ek indirme; `Range` destekler (bkz. nexus_backend/file_serving.py).
+    `?download=1` tarayıcıda açmak yerine indirmeyi zorlar.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        attachment = get_object_or_404(
+            TaskAttachment.objects.filter(task__in=visible_tasks(request.user).values('pk')), pk=pk,
+        )
+        return serve_file(request, attachment.file.name, attachment.file.storage, filename=attachment.filename or None,
+                          as_attachment=request.query_params.get('download') == '1')
+
+class TaskAttachmentThumbnailView(APIView):
+    """
+    Görsel ekin küçük resmi (bkz. operations/previews.py). Dosyalar içerik adreslidir,
+    yani hiç değişmez; istemci kendi önbelleğinde uzun süre tutabilir.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, size):
+        attachment = get_object_or_404(
+            TaskAttachment.objects.filter(task__in=visible_tasks(request.user).values('pk')).select_related('blob'),
+            pk=pk,
+        )
+        name = attachment.blob.thumbnails.get(str(size)) if attachment.blob else None
+        if not name:
+            raise NotFound('Küçük resim yok.')
+        return serve_file(request, name, max_age=THUMBNAIL_MAX_AGE)
+
+DASHBOARD_CACHE_TIMEOUT = 60 # Gecikmiş görev sayısı zamanla değişir; en fazla bu kadar eskir (sn)
+
+def _dashboard_scope(request):
+    """
+    Özet, görev verisinin yanında kullanıcının adını ve rollerini de içerir; bunlar kapsam
+    anahtarına katılır, böylece ad veya rol değişikliği TTL beklenmeden yeni bir kayıt açar.
+    """
+    user = request.user
+    identity = '|'.join([user.first_name, user.email, *sorted(get_effective_permissions(user).roles)])
+    return f'user:{user.pk}:{hashlib.sha1(identity.encode()).hexdigest()[:12]}'
+
+class DashboardSummaryView(APIView):
+    """ Ana sayfa özeti: kullanıcıya özel sayaçlar ve son görevler. """
+    permission_classes = [IsAuthenticated]
+
+    @cached_response(tags=['tasks'], scope=_dashboard_scope, timeout=DASHBOARD_CACHE_TIMEOUT)
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        now = timezone.now()
+        tasks = visible_tasks(user)
+        open_tasks = Q(status__in=OPEN_STATUSES)
+
+        # Tüm sayaçlar tek bir sorguda
+        stats = tasks.aggregate(
+            my_open_tasks=Count('id', filter=open_tasks & Q(assignee=user)),
+            team_overdue_tasks=Count('id', filter=open_tasks & Q(due_date__lt=now)),
+            high_priority_alerts=Count(
+                'id', filter=open_tasks & Q(assignee=user, priority__in=['HIGH', 'URGENT'])
+            ),
+        )
+        recent_tasks = tasks.order_by('-created_at', '-id')\
+                            .values('id', 'title', 'priority', 'status')[:5]
+
+        roles = sorted(get_effective_permissions(user).roles)
+        return Response({
+            'welcome_message': f'Hoş geldiniz, {user.first_name or user.email}!',
+            'user_role': roles[0] if roles else 'Kullanıcı',
+            'stats': stats,
+            'recent_tasks': list(recent_tasks),
+            'announcements': [], # Duyuru modeli henüz yok
+        })
 
 class ReportingDataView(APIView):
     permission_classes = [HasPermission(required_permissions=['reporting.view'])]
 
-    def get(self, request, *args, **kwargs):       
+    def get_querysets(self):
+        """
+        Raporu oluşturan sorgular. `benchmark_task_queries` komutu da EXPLAIN ve
+        süre ölçümü için bu metodu kullanır.
 
+        Task tablosu yerine artımlı tutulan TaskRollup sayaçları okunur; maliyet
+        görev sayısıyla değil kova (gün x departman x durum x kişi) sayısıyla orantılıdır.
+        """
+        today = timezone.localdate()
         # Son 30 gün için bir zaman aralığı belirleyelim
-        last_30_days = timezone.now() - timedelta(days=30)
+        last_30_days = today - timedelta(days=30)
+        # Son 6 ay (bu ay dahil): 5 ay önceki ayın ilk günü
+        month_index = today.year * 12 + today.month - 1 - 5
+        six_months_ago = date(month_index // 12, month_index % 12 + 1, 1)
+
+        created = TaskRollup.objects.filter(kind=TaskRollup.Kind.CREATED)
+        completed = TaskRollup.objects.filter(kind=TaskRollup.Kind.COMPLETED)
 
         # 1. Görev Durumlarına Göre Dağılım (Tüm Zamanlar)
-        task_status_distribution = Task.objects.values('status').annotate(count=Count('id')).order_by('status')
+        task_status_distribution = created.values('status')\
+                                          .annotate(count=Sum('count'))\
+                                          .filter(count__gt=0)\
+                                          .order_by('status')
 
         # 2. Departmanlara Göre Açık Görev Sayısı
-        tasks_by_department = Task.objects.filter(status__in=['NEW', 'ASSIGNED', 'IN_PROGRESS'])\
-                                          .values('department__name')\
-                                          .annotate(count=Count('id'))\
-                                          .order_by('-count')
+        tasks_by_department = created.filter(status__in=OPEN_STATUSES)\
+                                     .values('department__name')\
+                                     .annotate(count=Sum('count'))\
+                                     .filter(count__gt=0)\
+                                     .order_by('-count')
 
         # 3. Personel Performansı (Son 30 günde en çok görev kapatanlar)
-        user_performance = User.objects.filter(assigned_tasks__status='COMPLETED', assigned_tasks__updated_at__gte=last_30_days)\
-                                       .annotate(completed_tasks=Count('assigned_tasks'))\
-                                       .values('first_name', 'last_name', 'completed_tasks')\
-                                       .order_by('-completed_tasks')[:5] # İlk 5 kişiyi alalım
+        user_performance = completed.filter(day__gte=last_30_days, assignee__isnull=False)\
+                                    .values('assignee')\
+                                    .annotate(completed_tasks=Sum('count'),
+                                              first_name=F('assignee__first_name'),
+                                              last_name=F('assignee__last_name'))\
+                                    .filter(completed_tasks__gt=0)\
+                                    .values('first_name', 'last_name', 'completed_tasks')\
+                                    .order_by('-completed_tasks')[:5] # İlk 5 kişiyi alalım
 
         # 4. Aylık Görev Oluşturma Trendi (Son 6 Ay)
-        monthly_trend = Task.objects.annotate(month=TruncMonth('created_at'))\
-                                    .values('month')\
-                                    .annotate(count=Count('id'))\
-                                    .order_by('month')
+        monthly_trend = created.filter(day__gte=six_months_ago)\
+                               .annotate(month=TruncMonth('day'))\
+                               .values('month')\
+                               .annotate(count=Sum('count'))\
+                               .order_by('month')
 
-        # Tüm verileri tek bir JSON nesnesinde toplayalım
-        data = {
-            'task_status_distribution': list(task_status_distribution),
-            'open_tasks_by_department': list(tasks_by_department),
-            'top_performers': list(user_performance),
-            'monthly_creation_trend': list(monthly_trend),
+        return {
+            'task_status_distribution': task_status_distribution,
+            'open_tasks_by_department': tasks_by_department,
+            'top_performers': user_performance,
+            'monthly_creation_trend': monthly_trend,
         }
-        
+
+    # Yetkisi olan herkes aynı veriyi görür: kapsam ortak, görev/departman yazımlarında geçersiz olur
+    @cached_response(tags=['tasks', 'departments'])
+    def get(self, request, *args, **kwargs):
+        # Tüm verileri tek bir JSON nesnesinde toplayalım
+        data = {name: list(queryset) for name, queryset in self.get_querysets().items()}
         return Response(data)
 
 
+class SyncView(APIView):
+    """
+    Çevrimdışı istemciler için delta senkronizasyonu (bkz. operations/changelog.py).
+
+    GET /api/sync/?since=<token>
+    {
+      "token": "...",            # Bir sonraki istekte `since` olarak gönderilir
+      "reset": false,            # true: yerel veriyi at, REST API'den baştan yükle
+      "has_more": false,         # true: hemen yeni token ile tekrar çağır
+      "tasks": [...], "comments": [...], "attachments": [...], "notifications": [...],
+      "deleted": {"tasks": [id], "comments": [id], "attachments": [id], "notifications": [id]},
+      "notifications_read": false  # true: önce tüm yerel bildirimleri okundu yap, sonra listeyi uygula
+    }
+    Artık görülemeyen görevler (örn. başkasına atanan) önceden görebilenlere `deleted` içinde
+    döner; kullanıcının hiç görmediği nesneler yanıtta yer almaz.
+    """
+    permission_classes = [IsAuthenticated]
+    # Günlük türü -> yanıttaki anahtar
+    KEYS = {
+        ChangeLog.Kind.TASK: 'tasks',
+        ChangeLog.Kind.COMMENT: 'comments',
+        ChangeLog.Kind.ATTACHMENT: 'attachments',
+        ChangeLog.Kind.NOTIFICATION: 'notifications',
+    }
+
+    def get(self, request, *args, **kwargs):
+        token = request.query_params.get('since')
+        position = None
+        if token:
+            try:
+                position = decode_token(token)
+            except InvalidSyncToken:
+                return Response({'error': 'Geçersiz senkronizasyon token\'ı.'}, status=status.HTTP_400_BAD_REQUEST)
+        if position is None:
+            return Response(self._payload(encode_token(current_position()), reset=True))
+
+        sees_all = user_has_permissions(request.user, ['tasks.view_all'])
+        changed, deleted, position, has_more = read_changes(request.user, position, sees_all)
+        payload = self._payload(encode_token(position), has_more=has_more)
+        for kind in deleted:
+            payload['deleted'][self.KEYS[kind]].extend(deleted[kind])
+        payload['notifications_read'] = ChangeLog.Kind.NOTIFICATIONS_READ in changed
+
+        visible = visible_tasks(request.user)
+        sources = {
+            ChangeLog.Kind.TASK: (
+                annotate_task_list(visible.select_related('creator', 'assignee', 'department')),
+                TaskListSerializer,
+            ),
+            ChangeLog.Kind.COMMENT: (
+                TaskComment.objects.filter(task__in=visible.values('pk')).select_related('author'),
+                SyncTaskCommentSerializer,
+            ),
+            ChangeLog.Kind.ATTACHMENT: (
+                TaskAttachment.objects.filter(task__in=visible.values('pk')).select_related('uploader', 'blob'),
+                SyncTaskAttachmentSerializer,
+            ),
+            ChangeLog.Kind.NOTIFICATION: (
+                request.user.notifications.select_related('actor').prefetch_related(target_prefetch()),
+                NotificationSerializer,
+            ),
+        }
+        for kind, (queryset, serializer_class) in sources.items():
+            ids = changed.get(kind)
+            if not ids:
+                continue
+            objects = list(queryset.filter(pk__in=ids))
+            payload[self.KEYS[kind]] = serializer_class(objects, many=True, context={'request': request}).data
+            # Silinmiş veya artık görülemeyen nesneler
+            found = {obj.pk for obj in objects}
+            payload['deleted'][self.KEYS[kind]].extend(pk for pk in ids if pk not in found)
+        return Response(payload)
+
+    def _payload(self, token, reset=False, has_more=False):
+        return {
+            'token': token,
+            'reset': reset,
+            'has_more': has_more,
+            **{key: [] for key in self.KEYS.values()},
+            'deleted': {key: [] for key in self.KEYS.values()},
+            'notifications_read': False,
+        }
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-17 14:59
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_handles(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    taken = set()
+    for user in User.objects.order_by('pk').only('pk', 'email').iterator():
+        base = re.sub(r'\W', '_', user.email.split('@', 1)[0]).lower()[:140] or 'kullanici'
+        handle, suffix = base, 2
+        while handle in taken:
+            handle, suffix = f'{base}{suffix}', suffix + 1
+        taken.add(handle)
+        User.objects.filter(pk=user.pk).update(handle=handle)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_permission_alter_user_options_alter_user_email_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='handle',
+            field=models.CharField(blank=True, help_text='@mention için kullanılır, örn: ahmet_yilmaz', max_length=150, null=True, unique=True, verbose_name='Kullanıcı Kısa Adı'),
+        ),
+        migrations.RunPython(backfill_handles, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 # users/models.py
 
-from django.db import models
+import re
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -102,6 +103,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     bu modeli kullanıyoruz.
     """
     email = models.EmailField(max_length=255, unique=True, verbose_name="Email Adresi")
+    # Yorumlardaki @mention'lar için kısa ad (email'in @'den önceki kısmından türetilir)
+    handle = models.CharField(
+        max_length=150, unique=True, null=True, blank=True,
+        verbose_name="Kullanıcı Kısa Adı",
+        help_text="@mention için kullanılır, örn: ahmet_yilmaz"
+    )
     first_name = models.CharField(max_length=255, verbose_name="Ad")
     last_name = models.CharField(max_length=255, verbose_name="Soyad")
     
@@ -128,6 +135,43 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    # Eşzamanlı kayıtlar aynı kısa adı seçerse en fazla bu kadar yeniden denenir
+    HANDLE_ATTEMPTS = 5
+
+    def save(self, *args, **kwargs):
+        if self.handle or not self.email:
+            return super().save(*args, **kwargs)
+        for attempt in range(self.HANDLE_ATTEMPTS):
+            self.handle = self.generate_handle(self.email, exclude_pk=self.pk)
+            try:
+                # Savepoint: benzersizlik hatası dıştaki işlemi bozmadan geri alınır
+                with transaction.atomic(using=kwargs.get('using')):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Kısa ad boş seçilip kaydedilene kadar başka biri almış olabilir; diğer
+                # hatalar (örn. aynı email) olduğu gibi yükseltilir
+                taken = type(self)._default_manager.filter(handle=self.handle).exclude(pk=self.pk).exists()
+                self.handle = None
+                if not taken or attempt == self.HANDLE_ATTEMPTS - 1:
+                    raise
+
+    @classmethod
+    def generate_handle(cls, email, exclude_pk=None):
+        """
+        Email'in yerel kısmından (@ öncesi) benzersiz bir kısa ad üretir.
+        Harf, rakam ve '_' dışındaki karakterler '_' olur; çakışmada sonuna sayı eklenir (ali, ali2, ...).
+        """
+        base = re.sub(r'\W', '_', email.split('@', 1)[0]).lower()[:140] or 'kullanici'
+        taken = set(
+            cls.objects.filter(handle__startswith=base)
+                       .exclude(pk=exclude_pk)
+                       .values_list('handle', flat=True)
+        )
+        handle, suffix = base, 2
+        while handle in taken:
+            handle, suffix = f'{base}{suffix}', suffix + 1
+        return handle
+
     @property
     def full_name(self):
         """Kullanıcının tam adını döndüren bir property."""
@@ -0,0 +1,234 @@
+# users/permission_cache.py
+"""
+Kullanıcının etkin (rollerinden gelen) yetki setini hesaplayan ve önbellekleyen
+çözümleyici.
+
+İki katmanlı önbellek kullanılır:
+  1. Süreç içi (in-process) LRU: aynı worker'daki istekler hiç ağa çıkmaz.
+  2. Paylaşılan önbellek (Django cache framework, prod'da Redis): worker'lar
+     arasında paylaşılır, böylece her worker veritabanına ayrı ayrı gitmez.
+
+Geçersiz kılma `users/signals.py` içindeki sinyallerle, işlem commit edildikten sonra yapılır.
+Süreç içi kopyalar kısa bir TTL ile tutulur; başka bir worker'da yapılan
+değişiklik en geç bu süre sonunda görünür hale gelir.
+
+Aynı katmanlarda JWT ile doğrulanan istekler için kullanıcı anlık görüntüsü
+(snapshot) da tutulur (bkz. nexus_backend/authentication.py): id, email, ad,
+aktiflik ve yetki seti sürümü. Görüntü, sadece bu alanları yüklenmiş (diğerleri
+ertelenmiş) gerçek bir User örneğidir; FK atamaları çalışır, başka bir alana
+erişilirse o an veritabanından yüklenir. Yetki setleri sürümle birlikte saklanır;
+görüntü yenilendiğinde (kullanıcı veya rolleri değişince) eski sürümle tutulan
+süreç içi kopyalar TTL beklenmeden yeniden okunur.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+
+# Tek sorguda çözülen etkin yetki görüntüsü
+EffectivePermissions = namedtuple('EffectivePermissions', ['roles', 'permissions'])
+
+EMPTY = EffectivePermissions(roles=frozenset(), permissions=frozenset())
+
+ADMIN_ROLE_NAME = 'Yönetici'
+
+_DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'LOCAL_MAXSIZE': 2048,   # Süreç içi LRU'da tutulacak en fazla kullanıcı
+    'LOCAL_TTL': 5,          # Süreç içi kopyanın geçerlilik süresi (sn)
+    'SHARED_TTL': 300,       # Paylaşılan önbellekteki kopyanın süresi (sn)
+    'KEY_PREFIX': 'users:perms',
+    'SNAPSHOT_KEY_PREFIX': 'users:snapshot',
+}
+
+# Kullanıcı anlık görüntüsünde yüklenen alanlar (User.from_db için model alan sırasıyla)
+SNAPSHOT_FIELDS = ('id', 'email', 'handle', 'first_name', 'last_name', 'is_active')
+
+
+def _conf(name):
+    return getattr(settings, 'PERMISSION_CACHE', {}).get(name, _DEFAULTS[name])
+
+
+class _LocalLRU:
+    """ Thread-safe, boyut ve süre sınırlı basit bir LRU. """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + _conf('LOCAL_TTL'), value)
+            self._data.move_to_end(key)
+            while len(self._data) > _conf('LOCAL_MAXSIZE'):
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local = _LocalLRU()
+_snapshots = _LocalLRU()
+
+
+def _shared():
+    return caches[_conf('CACHE_ALIAS')]
+
+
+def _shared_key(user_id):
+    return f"{_conf('KEY_PREFIX')}:{user_id}"
+
+
+def _snapshot_key(user_id):
+    return f"{_conf('SNAPSHOT_KEY_PREFIX')}:{user_id}"
+
+
+def _load(user_id):
+    """ Rolleri ve yetkileri tek bir JOIN sorgusuyla getirir. """
+    from .models import User
+
+    rows = User.roles.through.objects.filter(user_id=user_id)\
+                                     .values_list('role__name', 'role__permissions__name')
+    roles, permissions = set(), set()
+    for role_name, perm_name in rows:
+        roles.add(role_name)
+        if perm_name is not None:
+            permissions.add(perm_name)
+    return EffectivePermissions(roles=frozenset(roles), permissions=frozenset(permissions))
+
+
+def get_effective_permissions(user):
+    """
+    Kullanıcının rol adlarını ve yetki adlarını döndürür.
+    Sıra: süreç içi LRU -> paylaşılan önbellek -> veritabanı (tek sorgu).
+    Kullanıcı bir anlık görüntüyse sadece onun sürümüyle saklanmış kopyalar kullanılır.
+    """
+    if not user or not user.is_authenticated:
+        return EMPTY
+
+    # Aynı istek içinde tekrar tekrar çözmemek için nesnenin üzerinde de tut
+    cached = getattr(user, '_effective_permissions', None)
+    if cached is not None:
+        return cached
+
+    user_id = user.pk
+    version = getattr(user, 'permissions_version', None)
+    entry = _local.get(user_id)
+    if entry is not None and _current(entry, version):
+        value = entry[1]
+    else:
+        shared = _shared()
+        stored = shared.get(_shared_key(user_id))
+        if stored is not None and len(stored) == 3 and _current(stored, version):
+            value = EffectivePermissions(frozenset(stored[1]), frozenset(stored[2]))
+        else:
+            value = _load(user_id)
+            shared.set(
+                _shared_key(user_id),
+                (version, sorted(value.roles), sorted(value.permissions)),
+                _conf('SHARED_TTL'),
+            )
+        _local.set(user_id, (version, value))
+
+    user._effective_permissions = value
+    return value
+
+
+def _current(entry, version):
+    """ Sürümü bilinmeyen (örn. oturumla gelen) kullanıcılar her kopyayı kabul eder. """
+    return version is None or entry[0] == version
+
+
+def get_user_permissions(user):
+    """ Kullanıcının etkin yetki adlarını frozenset olarak döndürür. """
+    return get_effective_permissions(user).permissions
+
+
+def user_has_permissions(user, required_permissions):
+    """ Gerekli tüm yetkiler kullanıcıda var mı? """
+    return set(required_permissions) <= get_user_permissions(user)
+
+
+def user_is_admin(user):
+    """ Kullanıcı 'Yönetici' rolüne sahip mi? """
+    return ADMIN_ROLE_NAME in get_effective_permissions(user).roles
+
+
+def invalidate_user_permissions(user_ids):
+    """
+    Verilen kullanıcıların önbellekteki yetki setlerini siler. Anlık görüntüleri de
+    silinir; yeniden oluşturulan görüntü yeni bir yetki sürümü taşır.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    _local.delete_many(user_ids)
+    _shared().delete_many([_shared_key(user_id) for user_id in user_ids])
+    invalidate_user_snapshots(user_ids)
+
+
+# -- Kullanıcı anlık görüntüsü --------------------------------------------------------
+def get_user_snapshot(user_id):
+    """
+    Kullanıcının önbellekteki anlık görüntüsünü döndürür; kullanıcı yoksa None.
+    Sıra: süreç içi LRU -> paylaşılan önbellek -> veritabanı (tek sorgu).
+    """
+    from .models import User
+
+    # Token'daki id metin olabilir; geçersiz kılma model pk'siyle yapılır
+    user_id = User._meta.pk.to_python(user_id)
+    values = _snapshots.get(user_id)
+    if values is None:
+        shared = _shared()
+        values = shared.get(_snapshot_key(user_id))
+        if values is None:
+            row = User.objects.filter(pk=user_id).values_list(*SNAPSHOT_FIELDS).first()
+            if row is None:
+                return None
+            # Sürüm sadece eşitlikle karşılaştırılır; her yeniden oluşturmada farklıdır
+            values = (*row, time.time_ns())
+            shared.set(_snapshot_key(user_id), values, _conf('SHARED_TTL'))
+        _snapshots.set(user_id, values)
+
+    *fields, version = values
+    # Her istek kendi örneğini alır (üzerine yazılan _effective_permissions gibi
+    # değerler istekler arasında paylaşılmaz)
+    user = User.from_db(router.db_for_read(User), SNAPSHOT_FIELDS, fields)
+    user.permissions_version = version
+    return user
+
+
+def invalidate_user_snapshots(user_ids):
+    """ Verilen kullanıcıların anlık görüntülerini siler. """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    _snapshots.delete_many(user_ids)
+    _shared().delete_many([_snapshot_key(user_id) for user_id in user_ids])
+
+
+def clear_local_cache():
+    """ Süreç içi LRU'ları tamamen boşaltır (testler ve toplu değişiklikler için). """
+    _local.clear()
+    _snapshots.clear()
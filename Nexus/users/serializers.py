@@ -1,8 +1,20 @@
 from rest_framework import serializers
-from .models import User
+from .models import User, Role, Permission
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'email', 'first_name', 'last_name']
-        # Şifre gibi hassas bilgileri asla API'da göstermeyiz.
\ No newline at end of file
+        fields = ['id', 'email', 'first_name', 'last_name', 'handle']
+        read_only_fields = ['handle'] # @mention kısa adı email'den türetilir
+        # Şifre gibi hassas bilgileri asla API'da göstermeyiz.
+
+class PermissionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Permission
+        fields = ['name']
+
+class RoleSerializer(serializers.ModelSerializer):
+    permissions = PermissionSerializer(many=True, read_only=True)
+    class Meta:
+        model = Role
+        fields = ['name', 'permissions']
@@ -0,0 +1,87 @@
+# users/signals.py
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import User, Role, Permission
+from .permission_cache import invalidate_user_permissions, invalidate_user_snapshots
+
+
+def _on_commit(invalidate, user_ids):
+    """
+    Önbelleği commit sonrası siler. Commit'ten önce silinirse araya giren bir istek eski
+    satırdan yeni bir kopya oluşturup SHARED_TTL boyunca paylaşılan önbellekte tutabilir.
+    """
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(partial(invalidate, user_ids))
+
+
+def _user_ids_for_roles(role_ids):
+    return User.roles.through.objects.filter(role_id__in=list(role_ids))\
+                                     .values_list('user_id', flat=True)
+
+
+def _user_ids_for_permissions(permission_ids):
+    return User.roles.through.objects.filter(role__permissions__in=list(permission_ids))\
+                                     .values_list('user_id', flat=True).distinct()
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def user_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Kullanıcı <-> Rol ilişkisi değiştiğinde ilgili kullanıcıların önbelleğini sil. """
+    if not reverse:
+        # user.roles.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _on_commit(invalidate_user_permissions, [instance.pk])
+        return
+
+    # role.user_set.add/remove/clear(...): pk_set kullanıcı id'leridir
+    if action == 'pre_clear':
+        instance._affected_user_ids = list(_user_ids_for_roles([instance.pk]))
+    elif action == 'post_clear':
+        _on_commit(invalidate_user_permissions, getattr(instance, '_affected_user_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        _on_commit(invalidate_user_permissions, pk_set or [])
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def role_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Rol <-> Yetki ilişkisi değiştiğinde o rollere sahip kullanıcıları geçersiz kıl. """
+    if action == 'pre_clear':
+        # clear() sonrası hangi satırların silindiğini bilemeyiz, önceden topla
+        if reverse:
+            role_ids = list(instance.role_set.values_list('pk', flat=True))
+        else:
+            role_ids = [instance.pk]
+        instance._affected_user_ids = list(_user_ids_for_roles(role_ids))
+    elif action == 'post_clear':
+        _on_commit(invalidate_user_permissions, getattr(instance, '_affected_user_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        role_ids = (pk_set or []) if reverse else [instance.pk]
+        _on_commit(invalidate_user_permissions, _user_ids_for_roles(role_ids))
+
+
+@receiver(post_save, sender=Role)
+@receiver(pre_delete, sender=Role)
+def role_changed(sender, instance, **kwargs):
+    """ Rol adı değişirse (örn. 'Yönetici') veya rol silinirse. """
+    if instance.pk:
+        _on_commit(invalidate_user_permissions, _user_ids_for_roles([instance.pk]))
+
+
+@receiver(post_save, sender=Permission)
+@receiver(pre_delete, sender=Permission)
+def permission_changed(sender, instance, **kwargs):
+    """ Yetki adı değişirse veya yetki silinirse. """
+    if instance.pk:
+        _on_commit(invalidate_user_permissions, _user_ids_for_permissions([instance.pk]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """ Email, ad veya aktiflik değişirse JWT isteklerinin kullandığı anlık görüntüyü sil. """
+    _on_commit(invalidate_user_snapshots, [instance.pk])
@@ -1,3 +1,199 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from nexus_backend.permissions import HasPermission
+from operations.models import Task
+from .models import User, Role, Permission
+from .permission_cache import (
+    _shared_key, _snapshot_key, clear_local_cache, get_user_snapshot, user_has_permissions, user_is_admin,
+)
+from .views import ManageUserView
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """ JWT istekleri kullanıcıyı ve yetkilerini önbellekteki anlık görüntüden alır. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.permission = Permission.objects.create(name='tasks.view_all')
+        cls.role = Role.objects.create(name='Müdür')
+        cls.role.permissions.add(cls.permission)
+        cls.user = User.objects.create_user('ayse@example.com', 'pw', first_name='Ayşe', last_name='Kaya')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+        self.factory = APIRequestFactory()
+
+    def _get_me(self, user=None):
+        token = AccessToken.for_user(user or self.user)
+        request = self.factory.get('/api/users/me/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return ManageUserView.as_view()(request)
+
+    def test_read_only_requests_do_not_query_for_auth(self):
+        self.assertEqual(self._get_me().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self._get_me()
+        self.assertEqual(response.data['email'], 'ayse@example.com')
+        self.assertEqual(response.data['handle'], 'ayse')
+
+        # Süreç içi kopya yoksa paylaşılan önbellekten okunur
+        clear_local_cache()
+        with self.assertNumQueries(0):
+            self._get_me()
+
+    def test_snapshot_follows_user_changes(self):
+        self._get_me()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Ayşegül'
+            self.user.save()
+        self.assertEqual(self._get_me().data['first_name'], 'Ayşegül')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save(update_fields=['is_active'])
+        self.assertEqual(self._get_me().status_code, 401)
+
+    def test_deactivation_outlives_a_concurrent_snapshot_rebuild(self):
+        self._get_me()
+        stale = cache.get(_snapshot_key(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.user.is_active = False
+            self.user.save(update_fields=['is_active'])
+            # Commit'ten önce gelen başka bir worker'daki istek eski satırı önbelleğe yazar
+            cache.set(_snapshot_key(self.user.pk), stale)
+        self.assertEqual(self._get_me().status_code, 401)
+
+    def test_permissions_follow_role_changes(self):
+        self._get_me()
+        snapshot = get_user_snapshot(self.user.pk)
+        self.assertFalse(user_has_permissions(snapshot, ['tasks.view_all']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.roles.add(self.role)
+        updated = get_user_snapshot(self.user.pk)
+        self.assertNotEqual(updated.permissions_version, snapshot.permissions_version)
+        self.assertTrue(user_has_permissions(updated, ['tasks.view_all']))
+        request = SimpleNamespace(user=get_user_snapshot(self.user.pk))
+        with self.assertNumQueries(0):
+            self.assertTrue(HasPermission(['tasks.view_all']).has_permission(request, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.remove(self.permission)
+        self.assertFalse(user_has_permissions(get_user_snapshot(self.user.pk), ['tasks.view_all']))
+
+    def test_snapshot_is_a_model_instance(self):
+        snapshot = get_user_snapshot(self.user.pk)
+        task = Task.objects.create(title='Kontrol', creator=snapshot)
+        self.assertEqual(task.creator_id, self.user.pk)
+        # Görüntüde olmayan alanlar ilk erişimde yüklenir
+        with self.assertNumQueries(1):
+            self.assertFalse(snapshot.is_staff)
+        self.assertIsNone(get_user_snapshot(0))
+
+
+class PermissionCacheTests(TestCase):
+    """ Yetki seti önbelleği: katmanlar, sorgu sayısı ve commit sonrası geçersiz kılma. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.permission = Permission.objects.create(name='tasks.view_all')
+        cls.role = Role.objects.create(name='Yönetici')
+        cls.user = User.objects.create_user('ali@example.com', 'pw')
+
+    def setUp(self):
+        cache.clear()
+        clear_local_cache()
+
+    def _fresh(self):
+        # Her istek kullanıcıyı yeniden yükler; nesne üzerindeki kopya kullanılmasın
+        return User.objects.get(pk=self.user.pk)
+
+    def _can_view_all(self):
+        return user_has_permissions(self._fresh(), ['tasks.view_all'])
+
+    def test_layers_resolve_with_at_most_one_query(self):
+        self.user.roles.add(self.role)
+        self.role.permissions.add(self.permission)
+        for layers_cleared, queries in ((False, 1), (False, 0), (True, 0)):
+            if layers_cleared:
+                clear_local_cache()   # Süreç içi kopya yok: paylaşılan önbellekten
+            user = self._fresh()
+            with self.assertNumQueries(queries):
+                self.assertTrue(user_has_permissions(user, ['tasks.view_all']))
+                self.assertTrue(user_is_admin(user))
+
+    def test_role_and_permission_changes_invalidate(self):
+        self.assertFalse(self._can_view_all())
+        changes = [
+            (lambda: self.user.roles.add(self.role), False),
+            (lambda: self.role.permissions.add(self.permission), True),
+            (lambda: self.role.permissions.clear(), False),
+            (lambda: self.permission.role_set.add(self.role), True),
+            (lambda: self.permission.role_set.clear(), False),
+            (lambda: self.role.permissions.add(self.permission), True),
+            (lambda: self.role.user_set.clear(), False),
+            (lambda: self.role.user_set.add(self.user), True),
+            (lambda: self.role.delete(), False),
+        ]
+        for change, expected in changes:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertEqual(self._can_view_all(), expected)
+
+    def test_invalidation_waits_for_commit(self):
+        self.assertFalse(self._can_view_all())
+        stale = cache.get(_shared_key(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, transaction.atomic():
+            self.user.roles.add(self.role)
+            self.role.permissions.add(self.permission)
+            # Commit'ten önce gelen başka bir worker'daki istek eski yetki setini önbelleğe yazar
+            cache.set(_shared_key(self.user.pk), stale)
+        self.assertTrue(callbacks)
+        self.assertTrue(self._can_view_all())
+
+    def test_has_permission(self):
+        permission = HasPermission(required_permissions=['tasks.view_all'])
+        self.assertIs(permission(), permission)
+        self.assertFalse(permission.has_permission(SimpleNamespace(user=AnonymousUser()), None))
+        self.assertFalse(permission.has_permission(SimpleNamespace(user=self._fresh()), None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.roles.add(self.role)
+            self.role.permissions.add(self.permission)
+        request = SimpleNamespace(user=self._fresh())
+        self.assertTrue(permission.has_permission(request, None))
+        # Aynı istekte ve sonraki isteklerde sorgu atılmaz
+        with self.assertNumQueries(0):
+            self.assertTrue(permission.has_permission(request, None))
+            self.assertTrue(HasPermission(['tasks.view_all']).has_permission(request, None))
+        next_request = SimpleNamespace(user=self._fresh())
+        with self.assertNumQueries(0):
+            self.assertTrue(permission.has_permission(next_request, None))
+
+
+class UserHandleTests(TestCase):
+    """ @mention kısa adları: email'den türetme ve eşzamanlı kayıtta çakışma. """
+
+    def test_handles_are_derived_from_email(self):
+        users = [User.objects.create_user(email, 'pw') for email in ('ali@x.com', 'ali@y.com', 'veli.can@x.com')]
+        self.assertEqual([user.handle for user in users], ['ali', 'ali2', 'veli_can'])
+
+    def test_concurrent_sign_up_retries_with_a_new_handle(self):
+        User.objects.create_user('ali@x.com', 'pw')
+        # Başka bir kayıt aynı anda 'ali'yi boş görmüş gibi: ilk deneme çakışır
+        with patch.object(User, 'generate_handle', side_effect=['ali', 'ali2']):
+            user = User.objects.create_user('ali@y.com', 'pw')
+        self.assertEqual(User.objects.get(pk=user.pk).handle, 'ali2')
 
-# Create your tests here.
+    def test_other_integrity_errors_are_raised(self):
+        User.objects.create_user('ali@x.com', 'pw')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user('ali@x.com', 'pw')